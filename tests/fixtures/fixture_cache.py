@@ -0,0 +1,13 @@
+import pytest
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    from django.core.cache import cache
+    from api.revocation import revocation_list
+    from api.throttling import TokenBucketThrottle
+    cache.clear()
+    revocation_list.reset()
+    TokenBucketThrottle.store = None
+    yield
+    cache.clear()
@@ -0,0 +1,24 @@
+import pytest
+
+
+@pytest.fixture(autouse=True)
+def media_root(settings, tmp_path):
+    from posts.images import image_queue
+    settings.MEDIA_ROOT = str(tmp_path)
+    yield tmp_path
+    image_queue.join()
+
+
+@pytest.fixture
+def jpeg_image():
+    from io import BytesIO
+
+    from PIL import Image
+
+    def make(width=800, height=600, color='red'):
+        buffer = BytesIO()
+        Image.new('RGB', (width, height), color).save(buffer, 'JPEG')
+        buffer.seek(0)
+        buffer.name = 'photo.jpg'
+        return buffer
+    return make
@@ -34,3 +34,13 @@ def user_client(token):
     client = APIClient()
     client.credentials(HTTP_AUTHORIZATION=f'Bearer {token["access"]}')
     return client
+
+
+@pytest.fixture
+def admin_client(django_user_model):
+    from rest_framework.test import APIClient
+
+    admin = django_user_model.objects.create_user(username='TestAdmin', password='1234567', is_staff=True)
+    client = APIClient()
+    client.force_authenticate(admin)
+    return client
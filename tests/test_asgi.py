@@ -0,0 +1,182 @@
+import asyncio
+import json
+
+import pytest
+from asgiref.sync import sync_to_async
+
+from posts.models import Comment, Post
+
+
+def http_scope(path, method='GET', headers=(), body=b'', host='localhost'):
+    path, _, query = path.partition('?')
+    return {
+        'type': 'http', 'method': method, 'path': path, 'root_path': '',
+        'query_string': query.encode(), 'http_version': '1.1', 'scheme': 'http',
+        'server': ('localhost', 80), 'client': ('127.0.0.1', 50000),
+        'headers': [
+            (b'host', host.encode()), (b'content-length', str(len(body)).encode()),
+            *[(name.encode(), value.encode()) for name, value in headers],
+        ],
+    }
+
+
+def asgi_request(application, path, method='GET', headers=(), body=b'', host='localhost'):
+    scope = http_scope(path, method, headers, body, host)
+    messages = []
+
+    async def receive():
+        return {'type': 'http.request', 'body': body, 'more_body': False}
+
+    async def send(message):
+        messages.append(message)
+
+    asyncio.run(application(scope, receive, send))
+    start = messages[0]
+    content = b''.join(message.get('body', b'') for message in messages[1:])
+    return start['status'], {name.decode(): value.decode() for name, value in start['headers']}, content
+
+
+class TestAsgi:
+
+    @pytest.fixture
+    def application(self, settings):
+        from api.asgi import AsyncReadApplication
+        settings.ALLOWED_HOSTS = ['localhost', 'testserver']
+        return AsyncReadApplication()
+
+    @pytest.mark.django_db(transaction=True)
+    def test_asgi_read_matches_wsgi(self, client, application, post, another_post, comment_1_post, group_1):
+        for path in ('/api/v1/posts/', f'/api/v1/posts/{post.id}/', f'/api/v1/posts/{post.id}/comments/',
+                     '/api/v1/groups/', f'/api/v1/groups/{group_1.id}/', '/api/v1/posts/?limit=1&exact_count=1'):
+            status, headers, content = asgi_request(application, path)
+            assert status == 200 and json.loads(content) == client.get(path, HTTP_HOST='localhost').json(), (
+                f'Проверьте, что ASGI-приложение на `{path}` отвечает так же, как WSGI'
+            )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_asgi_anonymous_reads_from_cache(self, application, post, user, monkeypatch):
+        rendered = []
+        render = application.render
+        monkeypatch.setattr(application, 'render', lambda environ: rendered.append(environ) or render(environ))
+
+        status, headers, first = asgi_request(application, '/api/v1/posts/')
+        assert asgi_request(application, '/api/v1/posts/')[2] == first and len(rendered) == 1, (
+            'Проверьте, что повторный анонимный запрос отдаётся из кэша без обращения к Django'
+        )
+        status, _, content = asgi_request(application, '/api/v1/posts/', headers=[('if-none-match', headers['etag'])])
+        assert status == 304 and content == b'' and len(rendered) == 1, (
+            'Проверьте, что ASGI-приложение отвечает 304 на If-None-Match из кэша'
+        )
+
+        Post.objects.create(text='Новая публикация', author=user)
+        status, _, content = asgi_request(application, '/api/v1/posts/')
+        assert len(json.loads(content)) == 2 and len(rendered) == 2, (
+            'Проверьте, что кэш ASGI-приложения сбрасывается при изменении публикаций'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_asgi_cache_per_host(self, application, post, monkeypatch):
+        rendered = []
+        render = application.render
+        monkeypatch.setattr(application, 'render', lambda environ: rendered.append(environ) or render(environ))
+
+        asgi_request(application, '/api/v1/posts/')
+        asgi_request(application, '/api/v1/posts/', host='testserver')
+        assert len(rendered) == 2 and rendered[1]['HTTP_HOST'] == 'testserver', (
+            'Проверьте, что ключ кэша ASGI-приложения учитывает хост запроса'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_asgi_closes_request_connection(self, application, post, monkeypatch):
+        import threading
+        from django.db import connections
+        rendered, closed = [], []
+        render = application.render
+        monkeypatch.setattr(application, 'render',
+                            lambda environ: rendered.append(threading.current_thread()) or render(environ))
+        monkeypatch.setattr(connections, 'close_all', lambda: closed.append(threading.current_thread()))
+
+        asgi_request(application, '/api/v1/posts/')
+        assert rendered and closed == rendered, (
+            'Проверьте, что соединения с БД потока запроса закрываются после ответа'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_asgi_writes_go_to_django(self, application, token, user):
+        status, _, content = asgi_request(
+            application, '/api/v1/posts/', method='POST', body='{"text": "Через ASGI"}'.encode(),
+            headers=[('authorization', f'Bearer {token["access"]}'), ('content-type', 'application/json')])
+        assert status == 201 and Post.objects.filter(text='Через ASGI', author=user).exists(), (
+            'Проверьте, что запросы на запись через ASGI-приложение обрабатываются Django'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_asgi_long_poll_own_thread(self, application, client, django_user_model, token):
+        django_user_model.objects.create_user(username='TestAdmin', password='1234567', is_staff=True)
+        admin = client.post('/api/v1/jwt/create/', data={'username': 'TestAdmin', 'password': '1234567'}).json()
+
+        async def request(path, access):
+            messages = []
+
+            async def receive():
+                return {'type': 'http.request', 'body': b''}
+
+            async def send(message):
+                messages.append(message)
+
+            await application(http_scope(path, headers=[('authorization', f'Bearer {access}')]), receive, send)
+            return messages[0]['status']
+
+        async def scenario():
+            poll = asyncio.ensure_future(request('/api/v1/changes/?timeout=3', admin['access']))
+            await asyncio.sleep(0.3)
+            status = await asyncio.wait_for(request('/api/v1/follow/', token['access']), 2)
+            assert status == 200 and not poll.done(), (
+                'Проверьте, что long-poll `/api/v1/changes/` не занимает общий поток обработчика Django'
+            )
+            assert await poll == 200
+
+        asyncio.run(scenario())
+
+    @pytest.mark.django_db(transaction=True)
+    def test_asgi_comments_stream(self, application, settings, post, user, comment_1_post):
+        settings.LIVE_COMMENTS_HEARTBEAT = 0.05
+
+        async def scenario():
+            incoming, outgoing = asyncio.Queue(), asyncio.Queue()
+            await incoming.put({'type': 'http.request', 'body': b''})
+            task = asyncio.ensure_future(application(
+                http_scope(f'/api/v1/posts/{post.id}/comments/stream/?last_id=0'), incoming.get, outgoing.put))
+            start = await asyncio.wait_for(outgoing.get(), 5)
+            backfilled = (await asyncio.wait_for(outgoing.get(), 5))['body']
+            heartbeat = (await asyncio.wait_for(outgoing.get(), 5))['body']
+            comment = await sync_to_async(Comment.objects.create)(text='Новый комментарий', author=user, post=post)
+            body = b''
+            while b'event: comment' not in body:
+                body = (await asyncio.wait_for(outgoing.get(), 5))['body']
+            await incoming.put({'type': 'http.disconnect'})
+            await asyncio.wait_for(task, 5)
+            return start, backfilled, heartbeat, comment, body
+
+        start, backfilled, heartbeat, comment, body = asyncio.run(scenario())
+        assert start['status'] == 200 and (b'content-type', b'text/event-stream') in start['headers'], (
+            'Проверьте, что поток комментариев отдаётся как text/event-stream'
+        )
+        assert backfilled.startswith(f'id: {comment_1_post.id}\n'.encode()), (
+            'Проверьте, что при переданном `last_id` поток начинается с пропущенных комментариев'
+        )
+        assert heartbeat.startswith(b':'), 'Проверьте, что поток периодически отправляет keep-alive'
+        assert body.startswith(f'id: {comment.id}\n'.encode()) and 'Новый комментарий'.encode() in body, (
+            'Проверьте, что новый комментарий приходит подписчикам потока'
+        )
+
+        from api.live import hub
+        assert not hub.has_subscribers(post.id), 'Проверьте, что после отключения клиента подписка снимается'
+
+    @pytest.mark.django_db(transaction=True)
+    def test_asgi_comments_stream_errors(self, application, post):
+        status, _, _ = asgi_request(application, '/api/v1/posts/100500/comments/stream/')
+        assert status == 404, 'Проверьте, что поток комментариев несуществующей публикации возвращает 404'
+        status, _, _ = asgi_request(
+            application, f'/api/v1/posts/{post.id}/comments/stream/', headers=[('last-event-id', 'abc')])
+        assert status == 400, 'Проверьте, что некорректный Last-Event-ID возвращает 400'
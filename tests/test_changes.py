@@ -0,0 +1,100 @@
+import threading
+import time
+
+import pytest
+from django.core.management import call_command
+
+from posts.models import Comment, Follow, OutboxEvent, Post
+
+
+class TestChangesAPI:
+    url = '/api/v1/changes/'
+
+    @pytest.mark.django_db(transaction=True)
+    def test_changes_not_admin(self, client, user_client):
+        assert client.get(self.url).status_code == 401, (
+            f'Проверьте, что `{self.url}` без токена возвращает статус 401'
+        )
+        assert user_client.get(self.url).status_code == 403, (
+            f'Проверьте, что `{self.url}` доступен только администраторам'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_changes_incremental(self, admin_client, user, another_user):
+        post = Post.objects.create(text='Текст', author=user)
+        comment = Comment.objects.create(text='Комментарий', author=another_user, post=post)
+        Follow.objects.create(user=another_user, following=user)
+
+        response = admin_client.get(f'{self.url}?timeout=0')
+        assert response.status_code == 200, (
+            f'Проверьте, что `{self.url}` возвращает статус 200 для администратора'
+        )
+        data = response.json()
+        assert [event['topic'] for event in data['events']] == ['post.created', 'comment.created', 'follow.created'], (
+            'Проверьте, что создание публикаций, комментариев и подписок записывается в outbox по порядку'
+        )
+        assert data['events'][1]['payload']['post_id'] == post.id and data['events'][1]['object_id'] == comment.id
+
+        post.delete()
+        data = admin_client.get(f'{self.url}?since={data["next"]}&timeout=0').json()
+        assert [event['topic'] for event in data['events']] == ['comment.deleted', 'post.deleted'], (
+            f'Проверьте, что `{self.url}?since=` возвращает только события после указанного номера'
+        )
+        assert admin_client.get(f'{self.url}?since=abc').status_code == 400
+
+    @pytest.mark.django_db(transaction=True)
+    def test_changes_wait_for_gap(self, admin_client, settings, user):
+        first, second, third = (Post.objects.create(text=f'Текст {number}', author=user) for number in range(3))
+        since = OutboxEvent.objects.get(object_id=first.id).id
+        # Событие второй публикации ещё «не зафиксировано»: его номер пропущен.
+        OutboxEvent.objects.filter(object_id=second.id).delete()
+
+        data = admin_client.get(f'{self.url}?since={since}&timeout=0').json()
+        assert data['events'] == [] and data['next'] == since, (
+            f'Проверьте, что `{self.url}` не сдвигает курсор за недавний пропуск в номерах событий'
+        )
+        settings.CHANGES_GAP_TIMEOUT = 0
+        data = admin_client.get(f'{self.url}?since={since}&timeout=0').json()
+        assert [event['object_id'] for event in data['events']] == [third.id], (
+            f'Проверьте, что `{self.url}` пропускает старые пропуски в номерах событий'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_changes_outbox_in_same_transaction(self, user, monkeypatch):
+        from posts import outbox
+
+        def broken(*args, **kwargs):
+            raise RuntimeError
+        monkeypatch.setattr(outbox.OutboxEvent.objects, 'bulk_create', broken)
+        with pytest.raises(RuntimeError):
+            Post.objects.create(text='Текст', author=user)
+        assert not Post.objects.exists(), (
+            'Проверьте, что публикация и событие outbox записываются в одной транзакции'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_changes_long_poll(self, admin_client, user):
+        def create_later():
+            time.sleep(0.3)
+            Post.objects.create(text='Позже', author=user)
+        thread = threading.Thread(target=create_later)
+        started = time.monotonic()
+        thread.start()
+        data = admin_client.get(f'{self.url}?timeout=10').json()
+        thread.join()
+        assert [event['topic'] for event in data['events']] == ['post.created'], (
+            f'Проверьте, что `{self.url}` ждёт появления новых событий'
+        )
+        assert time.monotonic() - started < 5, (
+            f'Проверьте, что `{self.url}` возвращает ответ сразу после появления события'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_relay_outbox(self, user, capsys):
+        Post.objects.create(text='Текст', author=user)
+        Post.objects.create(text='Текст', author=user)
+        call_command('relay_outbox', '--once', '--batch-size', '1')
+        lines = capsys.readouterr().out.strip().splitlines()
+        assert len(lines) == 2 and not OutboxEvent.objects.filter(relayed=False).exists(), (
+            'Проверьте, что `relay_outbox` передаёт все события пачками и отмечает их переданными'
+        )
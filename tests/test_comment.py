@@ -181,3 +181,101 @@ class TestCommentAPI:
             'Проверьте, что при DELETE запросе `/api/v1/posts/{post.id}/comments/{comment.id}/` '
             'для не своего комментария возвращаете статус 403'
         )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_comments_get_keyset_paginated(self, user_client, post, comment_1_post, comment_2_post):
+        url = f'/api/v1/posts/{post.id}/comments/?cursor=&limit=1'
+        response = user_client.get(url)
+        assert response.status_code == 200, (
+            f'Проверьте, что при GET запросе `{url}` возвращается статус 200'
+        )
+        first_page = response.json()
+        assert [item['id'] for item in first_page['results']] == [comment_1_post.id], (
+            f'Проверьте, что при GET запросе `{url}` комментарии отсортированы по дате добавления'
+        )
+
+        response = user_client.get(first_page['next'])
+        second_page = response.json()
+        assert [item['id'] for item in second_page['results']] == [comment_2_post.id], (
+            'Проверьте, что по ссылке `next` возвращается следующая страница комментариев'
+        )
+        assert second_page['next'] is None, (
+            'Проверьте, что на последней странице ссылка `next` пустая'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_comments_conditional_get(self, client, post, comment_1_post, another_user):
+        url = f'/api/v1/posts/{post.id}/comments/'
+        etag = client.get(url)['ETag']
+        assert client.get(url, HTTP_IF_NONE_MATCH=etag).status_code == 304, (
+            f'Проверьте, что `{url}` при совпадении If-None-Match возвращает 304'
+        )
+
+        detail_url = f'{url}{comment_1_post.id}/'
+        detail_etag = client.get(detail_url)['ETag']
+        assert client.get(detail_url, HTTP_IF_NONE_MATCH=detail_etag).status_code == 304, (
+            f'Проверьте, что `{detail_url}` при совпадении If-None-Match возвращает 304'
+        )
+
+        Comment.objects.create(text='Новый коммент', author=another_user, post=post)
+        assert client.get(url, HTTP_IF_NONE_MATCH=etag).status_code == 200, (
+            f'Проверьте, что ETag `{url}` меняется при добавлении комментария'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_comments_bulk_create(self, user_client, post, user):
+        url = f'/api/v1/posts/{post.id}/comments/bulk/'
+        data = [{'text': f'Коммент {number}'} for number in range(3)]
+        response = user_client.post(url, data=data, format='json')
+        assert response.status_code == 201, (
+            f'Проверьте, что при POST запросе `{url}` со списком комментариев возвращается статус 201'
+        )
+        assert all(item['post'] == post.id and item['author'] == user.username
+                   for item in response.json())
+        assert Comment.objects.filter(post=post).count() == 3
+        post.refresh_from_db()
+        assert post.comments_count == 3, (
+            f'Проверьте, что `{url}` обновляет счётчик комментариев публикации'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_comments_fast_list_identical(self, settings, client, post, comment_1_post, comment_2_post):
+        from django.core.cache import cache
+
+        url = f'/api/v1/posts/{post.id}/comments/'
+        settings.FAST_LIST_SERIALIZATION = True
+        fast = client.get(url).content
+        cache.clear()
+        settings.FAST_LIST_SERIALIZATION = False
+        assert fast == client.get(url).content, (
+            f'Проверьте, что быстрая сериализация `{url}` совпадает с CommentSerializer побайтно'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_comments_search(self, client, post, user):
+        found = Comment.objects.create(author=user, post=post, text='Отличная статья про котов')
+        Comment.objects.create(author=user, post=post, text='Про собак')
+
+        data = client.get(f'/api/v1/posts/{post.id}/comments/?search=котов').json()
+        assert [item['id'] for item in data] == [found.id], (
+            'Проверьте, что `/api/v1/posts/{post.id}/comments/?search=` находит комментарии по словам'
+        )
+        assert data[0]['highlight'] == 'Отличная статья про <mark>котов</mark>', (
+            'Проверьте, что результаты поиска комментариев содержат подсветку совпадений'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_comments_can_edit(self, settings, user_client, post, comment_1_post, comment_2_post):
+        from django.core.cache import cache
+
+        url = f'/api/v1/posts/{post.id}/comments/?can_edit=1'
+        fast = user_client.get(url).json()
+        assert {item['id']: item['can_edit'] for item in fast} == {
+            comment_1_post.id: True, comment_2_post.id: False}, (
+            f'Проверьте, что `{url}` отмечает комментарии, которые пользователь может изменять'
+        )
+        cache.clear()
+        settings.FAST_LIST_SERIALIZATION = False
+        assert user_client.get(url).json() == fast, (
+            f'Проверьте, что `can_edit` в `{url}` совпадает при обычной и быстрой сериализации'
+        )
@@ -0,0 +1,47 @@
+import json
+
+import pytest
+
+
+class TestExportAPI:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_export_not_admin(self, client, user_client):
+        url = '/api/v1/export/posts/'
+        assert client.get(url).status_code == 401, (
+            f'Проверьте, что `{url}` без токена возвращает статус 401'
+        )
+        assert user_client.get(url).status_code == 403, (
+            f'Проверьте, что `{url}` доступен только администраторам'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_export_posts(self, admin_client, post, post_2, another_post):
+        url = '/api/v1/export/posts/'
+        response = admin_client.get(url)
+        assert response.status_code == 200, (
+            f'Проверьте, что `{url}` для администратора возвращает статус 200'
+        )
+        assert response.streaming, (
+            f'Проверьте, что `{url}` отдаёт выгрузку потоком'
+        )
+        assert response['Content-Type'] == 'application/x-ndjson'
+        lines = b''.join(response.streaming_content).decode().splitlines()
+        exported = [json.loads(line) for line in lines]
+        assert [item['id'] for item in exported] == [post.id, post_2.id, another_post.id], (
+            f'Проверьте, что `{url}` выгружает все публикации по одной на строку'
+        )
+        assert exported[0] == admin_client.get(f'/api/v1/posts/{post.id}/').json(), (
+            f'Проверьте, что `{url}` выгружает публикации в формате API'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_export_command(self, tmp_path, comment_1_post, comment_2_post):
+        from django.core.management import call_command
+
+        output = tmp_path / 'comments.ndjson'
+        call_command('export_ndjson', 'comments', output=str(output), chunk_size=1)
+        exported = [json.loads(line) for line in output.read_text().splitlines()]
+        assert [item['id'] for item in exported] == [comment_1_post.id, comment_2_post.id], (
+            'Проверьте, что команда `export_ndjson` выгружает все комментарии'
+        )
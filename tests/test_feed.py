@@ -0,0 +1,65 @@
+import pytest
+
+from posts.models import FeedEntry, Follow, Post
+
+
+class TestFeedAPI:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_feed_not_auth(self, client):
+        response = client.get('/api/v1/feed/')
+        assert response.status_code == 401, (
+            'Проверьте, что `/api/v1/feed/` при GET запросе без токена возвращает статус 401'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_feed_contains_followed_posts(self, user_client, user, user_2, another_user):
+        old_post = Post.objects.create(text='Старая статья', author=another_user)
+        Follow.objects.create(user=user, following=another_user)
+        new_post = Post.objects.create(text='Новая статья', author=another_user)
+        Post.objects.create(text='Чужая статья', author=user_2)
+
+        assert FeedEntry.objects.filter(user=user).count() == 2, (
+            'Проверьте, что публикации автора попадают в ленту подписчика'
+        )
+        response = user_client.get('/api/v1/feed/')
+        assert response.status_code == 200, (
+            'Проверьте, что при GET запросе `/api/v1/feed/` с токеном авторизации возвращается статус 200'
+        )
+        assert [item['id'] for item in response.json()] == [new_post.id, old_post.id], (
+            'Проверьте, что `/api/v1/feed/` возвращает публикации авторов из подписок, от новых к старым'
+        )
+
+        Follow.objects.filter(user=user).delete()
+        assert user_client.get('/api/v1/feed/').json() == [], (
+            'Проверьте, что после отписки публикации автора пропадают из ленты'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_feed_reads_heavy_authors(self, settings, user_client, user, user_2, another_user):
+        settings.FEED_FANOUT_LIMIT = 1
+        Follow.objects.create(user=user, following=another_user)
+        Follow.objects.create(user=user_2, following=another_user)
+        post = Post.objects.create(text='Статья', author=another_user)
+
+        assert not FeedEntry.objects.exists(), (
+            'Проверьте, что публикации авторов с большим числом подписчиков не рассылаются по лентам'
+        )
+        response = user_client.get('/api/v1/feed/')
+        assert [item['id'] for item in response.json()] == [post.id], (
+            'Проверьте, что публикации авторов с большим числом подписчиков попадают в ленту при чтении'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_feed_author_no_longer_heavy(self, settings, user_client, user, user_2, another_user):
+        settings.FEED_FANOUT_LIMIT = 1
+        Follow.objects.create(user=user, following=another_user)
+        Follow.objects.create(user=user_2, following=another_user)
+        post = Post.objects.create(text='Статья', author=another_user)
+
+        Follow.objects.filter(user=user_2).delete()
+        response = user_client.get('/api/v1/feed/')
+        assert [item['id'] for item in response.json()] == [post.id], (
+            'Проверьте, что публикации автора остаются в ленте, когда подписчиков '
+            'становится не больше FEED_FANOUT_LIMIT'
+        )
@@ -111,3 +111,66 @@ class TestGroupAPI:
                 'Проверьте, что при GET запросе на `/api/v1/groups/{id}/` '
                 'возвращается информация о соответствующем сообществе'
             )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_group_posts_count(self, client, post, post_2, another_post, group_1, group_2):
+        from posts.models import Post
+
+        response = client.get(f'/api/v1/groups/{group_1.id}/')
+        assert response.json().get('posts_count') == 2, (
+            'Проверьте, что `posts_count` группы возвращает число публикаций в группе'
+        )
+
+        post_2.group = group_2
+        post_2.save()
+        Post.objects.filter(id=post.id).delete()
+        assert client.get(f'/api/v1/groups/{group_1.id}/').json().get('posts_count') == 0, (
+            'Проверьте, что `posts_count` уменьшается при удалении и переносе публикации'
+        )
+        assert client.get(f'/api/v1/groups/{group_2.id}/').json().get('posts_count') == 2, (
+            'Проверьте, что `posts_count` увеличивается при переносе публикации в группу'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_group_list_cached(self, client, group_1, django_assert_num_queries):
+        response = client.get('/api/v1/groups/')
+        etag = response['ETag']
+        assert etag, (
+            'Проверьте, что `/api/v1/groups/` возвращает заголовок ETag'
+        )
+
+        with django_assert_num_queries(0):
+            response = client.get('/api/v1/groups/')
+        assert response.json()[0]['id'] == group_1.id, (
+            'Проверьте, что повторный запрос `/api/v1/groups/` отдаётся из кэша без запросов к БД'
+        )
+
+        response = client.get('/api/v1/groups/', HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 304, (
+            'Проверьте, что при совпадении If-None-Match возвращается статус 304'
+        )
+
+        Group.objects.create(title='Группа 3', slug='group_3')
+        response = client.get('/api/v1/groups/', HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 200 and len(response.json()) == 2, (
+            'Проверьте, что кэш `/api/v1/groups/` сбрасывается при изменении групп'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_group_posts(self, client, post, post_2, another_post, group_1, another_user):
+        response = client.get(f'/api/v1/groups/{group_1.slug}/posts/')
+        assert response.status_code == 200, (
+            'Проверьте, что `/api/v1/groups/{slug}/posts/` при запросе без токена возвращает статус 200'
+        )
+        assert response.json() == client.get(f'/api/v1/posts/?group={group_1.slug}').json(), (
+            'Проверьте, что `/api/v1/groups/{slug}/posts/` возвращает публикации группы '
+            'в том же порядке, что и `/api/v1/posts/?group={slug}`'
+        )
+        assert [item['id'] for item in response.json()] == [post.id, post_2.id]
+        response = client.get(f'/api/v1/groups/{group_1.slug}/posts/?author={another_user.username}')
+        assert response.json() == [], (
+            'Проверьте, что `/api/v1/groups/{slug}/posts/` поддерживает фильтр `author`'
+        )
+        assert client.get('/api/v1/groups/unknown/posts/').status_code == 404, (
+            'Проверьте, что `/api/v1/groups/{slug}/posts/` для несуществующей группы возвращает статус 404'
+        )
@@ -181,3 +181,138 @@ class TestJWT:
             f'возвращается код {code_expected}. '
             'Валидацию должны проходить как refresh, так и access токены'
         )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_jwt_stateless_user(self, client, user, django_assert_num_queries):
+        response = client.post(self.url_create, data={'username': user.username, 'password': '1234567'})
+        access = response.json()['access']
+        refreshed = client.post(self.url_refresh, data={'refresh': response.json()['refresh']}).json()['access']
+
+        from rest_framework.test import APIClient
+        for token in (access, refreshed):
+            api_client = APIClient()
+            api_client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+            with django_assert_num_queries(1):
+                response = api_client.get('/api/v1/follow/')
+            assert response.status_code == 200, (
+                'Убедитесь, что токен из `/api/v1/jwt/create/` и `/api/v1/jwt/refresh/` '
+                'аутентифицирует пользователя без запроса к таблице пользователей'
+            )
+
+        api_client.post('/api/v1/follow/', data={'following': User.objects.create_user(username='Автор').username})
+        assert user.follower.count() == 1, (
+            'Убедитесь, что пользователь из токена может подписываться на авторов'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_jwt_user_row_cached(self, user_client, user, django_assert_num_queries):
+        user_client.get('/api/v1/follow/')
+        with django_assert_num_queries(1):
+            user_client.get('/api/v1/follow/')
+        # Единственный запрос — список подписок: строка пользователя в кэше.
+
+        user.is_active = False
+        user.save()
+        assert user_client.get('/api/v1/follow/').status_code == 401, (
+            'Убедитесь, что изменение пользователя сбрасывает его строку в кэше'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_jwt_revoke(self, client, user):
+        from rest_framework.test import APIClient
+        tokens = client.post(self.url_create, data={'username': user.username, 'password': '1234567'}).json()
+        api_client = APIClient()
+        api_client.credentials(HTTP_AUTHORIZATION=f'Bearer {tokens["access"]}')
+        response = api_client.post('/api/v1/jwt/revoke/', data={'refresh': tokens['refresh']})
+        assert response.status_code == 204, (
+            'Убедитесь, что POST запрос на `/api/v1/jwt/revoke/` возвращает статус 204'
+        )
+        assert api_client.get('/api/v1/follow/').status_code == 401, (
+            'Убедитесь, что отозванный access-токен не проходит аутентификацию'
+        )
+        response = client.post(self.url_refresh, data={'refresh': tokens['refresh']})
+        assert response.status_code == 401, (
+            'Убедитесь, что по отозванному refresh-токену нельзя получить новый access-токен'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_jwt_revoke_all(self, client, user, django_assert_num_queries):
+        from rest_framework.test import APIClient
+        from api.revocation import revocation_list
+
+        def make_client():
+            tokens = client.post(self.url_create, data={'username': user.username, 'password': '1234567'}).json()
+            api_client = APIClient()
+            api_client.credentials(HTTP_AUTHORIZATION=f'Bearer {tokens["access"]}')
+            return api_client
+
+        first, second = make_client(), make_client()
+        revocation_list.refresh()
+        with django_assert_num_queries(1):
+            first.get('/api/v1/follow/')
+        # Токен не попал в фильтр отозванных — проверка не ходит в БД.
+
+        assert first.post('/api/v1/jwt/revoke/', data={'all': True}).status_code == 204
+        for api_client in (first, second):
+            assert api_client.get('/api/v1/follow/').status_code == 401, (
+                'Убедитесь, что после отзыва всех токенов ни один ранее выданный токен не действует'
+            )
+        third = make_client()
+        with django_assert_num_queries(1):
+            response = third.get('/api/v1/follow/')
+        assert response.status_code == 200, (
+            'Убедитесь, что токены, выданные после отзыва, действуют, '
+            'а версия токенов пользователя берётся из памяти без запроса к БД'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_jwt_user_changes_revoke_tokens(self, client, user):
+        from rest_framework.test import APIClient
+
+        def make_client():
+            tokens = client.post(self.url_create, data={'username': user.username, 'password': '1234567'}).json()
+            api_client = APIClient()
+            api_client.credentials(HTTP_AUTHORIZATION=f'Bearer {tokens["access"]}')
+            return api_client, tokens['refresh']
+
+        api_client, refresh = make_client()
+        user.is_active = False
+        user.save()
+        assert api_client.get('/api/v1/follow/').status_code == 401, (
+            'Убедитесь, что токен деактивированного пользователя не проходит аутентификацию'
+        )
+        assert client.post(self.url_refresh, data={'refresh': refresh}).status_code == 401, (
+            'Убедитесь, что по refresh-токену деактивированного пользователя нельзя получить access-токен'
+        )
+
+        user.is_active = True
+        user.is_staff = True
+        user.save()
+        api_client, _ = make_client()
+        assert api_client.get('/api/v1/follow/').status_code == 200
+        user.is_staff = False
+        user.save(update_fields=('is_staff',))
+        assert api_client.get('/api/v1/follow/').status_code == 401, (
+            'Убедитесь, что после снятия прав персонала ранее выданные токены не действуют'
+        )
+        assert make_client()[0].get('/api/v1/follow/').status_code == 200, (
+            'Убедитесь, что токены, выданные после изменения пользователя, действуют'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_jwt_deleted_user_tokens_revoked(self, client, user):
+        from rest_framework.test import APIClient
+
+        tokens = client.post(self.url_create, data={'username': user.username, 'password': '1234567'}).json()
+        api_client = APIClient()
+        api_client.credentials(HTTP_AUTHORIZATION=f'Bearer {tokens["access"]}')
+        user.delete()
+        assert api_client.get('/api/v1/follow/').status_code == 401, (
+            'Убедитесь, что токен удалённого пользователя не проходит аутентификацию'
+        )
+        assert api_client.post('/api/v1/posts/', data={'text': 'Текст'}).status_code == 401, (
+            'Убедитесь, что удалённый пользователь не может создавать публикации по старому токену'
+        )
+        assert client.post(self.url_refresh, data={'refresh': tokens['refresh']}).status_code == 401, (
+            'Убедитесь, что по refresh-токену удалённого пользователя нельзя получить access-токен'
+        )
@@ -0,0 +1,94 @@
+import tracemalloc
+from datetime import timedelta
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from posts.models import Comment, Follow, Group, Post
+
+
+class TestBoundedPagination:
+
+    @pytest.fixture
+    def limits(self, settings):
+        settings.PAGINATION_LIST_LIMIT = 20
+        settings.PAGINATION_MAX_LIMIT = 50
+
+    @pytest.mark.django_db(transaction=True)
+    def test_lists_are_bounded(self, limits, user_client, user, another_user, post):
+        Comment.objects.bulk_create(
+            Comment(text=f'Комментарий {number}', author=user, post=post) for number in range(60))
+        Group.objects.bulk_create(
+            Group(title=f'Группа {number}', slug=f'group-{number}', description='') for number in range(60))
+        for url in (f'/api/v1/posts/{post.id}/comments/', '/api/v1/groups/'):
+            response = user_client.get(url)
+            assert response.status_code == 200 and len(response.json()) == 20, (
+                f'Проверьте, что `{url}` без `limit` отдаёт не больше PAGINATION_LIST_LIMIT записей'
+            )
+            assert 'limit=20' in response['Link'] and 'offset=20' in response['Link'], (
+                f'Проверьте, что урезанный список `{url}` ссылается на следующую страницу в заголовке Link'
+            )
+            second = user_client.get(f'{url}?limit=20&offset=20').json()['results']
+            assert second[0]['id'] == response.json()[-1]['id'] + 1, (
+                f'Проверьте, что ссылка Link на `{url}` продолжает список без пропусков'
+            )
+            assert len(user_client.get(f'{url}?limit=1000').json()['results']) == 50, (
+                f'Проверьте, что `limit` на `{url}` ограничен PAGINATION_MAX_LIMIT'
+            )
+
+        Follow.objects.create(user=user, following=another_user)
+        response = user_client.get('/api/v1/follow/')
+        assert len(response.json()) == 1 and not response.has_header('Link'), (
+            'Проверьте, что полный список отдаётся без заголовка Link'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_posts_ordered_and_keyset_page_size(self, limits, user_client, user):
+        posts = [Post.objects.create(text=f'Статья {number}', author=user) for number in range(25)]
+        # Дата публикации самой первой статьи позже остальных: порядок
+        # задаётся датой, а не тем, как строки лежат в таблице.
+        Post.objects.filter(pk=posts[0].pk).update(pub_date=posts[-1].pub_date + timedelta(seconds=1))
+        ordered = [post.id for post in posts[1:]] + [posts[0].id]
+
+        response = user_client.get('/api/v1/posts/')
+        second = user_client.get('/api/v1/posts/?limit=20&offset=20').json()['results']
+        assert [item['id'] for item in response.json() + second] == ordered, (
+            'Проверьте, что `/api/v1/posts/` упорядочен по дате публикации и страницы идут без пропусков'
+        )
+
+        from api.pagination import PostPagination
+        response = user_client.get('/api/v1/posts/?cursor=').json()
+        assert len(response['results']) == PostPagination.keyset_page_size, (
+            'Проверьте, что первая страница по курсору без `limit` содержит keyset_page_size записей'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_comments_memory_bounded(self, limits, user_client, user, post):
+        url = f'/api/v1/posts/{post.id}/comments/'
+
+        def measure(name):
+            # Прогрев и замер разными адресами, чтобы ответ не взялся из кэша.
+            user_client.get(f'{url}?warmup={name}')
+            tracemalloc.start()
+            with CaptureQueriesContext(connection) as context:
+                response = user_client.get(f'{url}?size={name}')
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+            return response, peak, context.captured_queries
+
+        Comment.objects.bulk_create(
+            Comment(text='Комментарий ' * 20, author=user, post=post) for _ in range(100))
+        _, small_peak, _ = measure('small')
+        Comment.objects.bulk_create(
+            Comment(text='Комментарий ' * 20, author=user, post=post) for _ in range(5000))
+        response, large_peak, queries = measure('large')
+
+        assert len(response.json()) == 20
+        selects = [query['sql'] for query in queries if 'FROM "posts_comment"' in query['sql']]
+        assert selects and all('LIMIT 21' in sql for sql in selects), (
+            'Проверьте, что список комментариев читает из БД не больше одной страницы'
+        )
+        assert large_peak < small_peak * 1.5, (
+            'Проверьте, что память на запрос списка комментариев не растёт с количеством комментариев'
+        )
@@ -1,4 +1,5 @@
 import pytest
+from django.core.files.uploadedfile import SimpleUploadedFile
 
 from posts.models import Post
 
@@ -231,3 +232,546 @@ class TestPostAPI:
         assert response.status_code == 403, (
             'Проверьте, что при DELETE запросе `/api/v1/posts/{id}/` для не своей статьи возвращаете статус 403'
         )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_posts_get_keyset_paginated(self, user_client, post, post_2, another_post):
+        url = '/api/v1/posts/?cursor=&limit=2'
+        response = user_client.get(url)
+        assert response.status_code == 200, (
+            f'Проверьте, что при GET запросе `{url}` возвращается статус 200'
+        )
+        first_page = response.json()
+        assert [item['id'] for item in first_page['results']] == [another_post.id, post_2.id], (
+            f'Проверьте, что при GET запросе `{url}` статьи отсортированы от новых к старым'
+        )
+        assert first_page['next'], (
+            f'Проверьте, что при GET запросе `{url}` возвращается ссылка на следующую страницу'
+        )
+
+        Post.objects.create(text='Новая статья', author=another_post.author)
+        response = user_client.get(first_page['next'])
+        second_page = response.json()
+        assert [item['id'] for item in second_page['results']] == [post.id], (
+            'Проверьте, что курсорная пагинация не смещается при добавлении новых статей'
+        )
+        assert second_page['next'] is None, (
+            'Проверьте, что на последней странице ссылка `next` пустая'
+        )
+
+        import base64
+        import json
+        for position in ('broken', [5, 1], [None, None], ['2020-01-01T00:00:00', {}]):
+            cursor = position if isinstance(position, str) else base64.urlsafe_b64encode(
+                json.dumps(position).encode()).decode()
+            response = user_client.get(f'/api/v1/posts/?cursor={cursor}')
+            assert response.status_code == 404, (
+                f'Проверьте, что при неверном курсоре {position} возвращается статус 404'
+            )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_posts_paginated_count_cached(self, user_client, post, another_post):
+        url = '/api/v1/posts/?limit=1'
+        response = user_client.get(url)
+        assert response.json()['count'] == 2
+        assert response['X-Count-Approximate'] == 'true', (
+            f'Проверьте, что при GET запросе `{url}` количество помечается как приблизительное'
+        )
+
+        Post.objects.create(text='Новая статья', author=post.author)
+        assert user_client.get(url).json()['count'] == 3, (
+            'Проверьте, что счётчик публикаций обновляется при создании статьи'
+        )
+        another_post.delete()
+        assert user_client.get(url).json()['count'] == 2, (
+            'Проверьте, что счётчик публикаций обновляется при удалении статьи'
+        )
+
+        Post.objects.filter(id=post.id).delete()
+        response = user_client.get(f'{url}&exact_count=1')
+        assert response.json()['count'] == 1, (
+            'Проверьте, что при `exact_count=1` количество считается по базе'
+        )
+        assert 'X-Count-Approximate' not in response, (
+            'Проверьте, что точное количество не помечается как приблизительное'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_post_counters(self, user_client, post, user, another_user, follow_4):
+        from posts.models import Comment
+
+        Comment.objects.create(text='Коммент', author=user, post=post)
+        comment = Comment.objects.create(text='Коммент 2', author=another_user, post=post)
+        test_post = user_client.get(f'/api/v1/posts/{post.id}/').json()
+        assert test_post.get('comments_count') == 2, (
+            'Проверьте, что `comments_count` публикации увеличивается при добавлении комментария'
+        )
+        assert test_post.get('author_followers_count') == 1, (
+            'Проверьте, что `author_followers_count` возвращает число подписчиков автора'
+        )
+
+        comment.delete()
+        follow_4.delete()
+        test_post = user_client.get(f'/api/v1/posts/{post.id}/').json()
+        assert test_post.get('comments_count') == 1, (
+            'Проверьте, что `comments_count` публикации уменьшается при удалении комментария'
+        )
+        assert test_post.get('author_followers_count') == 0, (
+            'Проверьте, что `author_followers_count` уменьшается при отписке'
+        )
+
+        response = user_client.patch(f'/api/v1/posts/{post.id}/', data={'comments_count': 100})
+        assert response.json().get('comments_count') == 1, (
+            'Проверьте, что `comments_count` нельзя изменить через API'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_counters_after_user_delete(self, user, user_2, another_user, follow_1, follow_2, follow_4):
+        from posts.models import UserStats
+
+        user.delete()
+        assert UserStats.objects.get(user=another_user).followers_count == 0, (
+            'Проверьте, что при удалении пользователя уменьшаются счётчики тех, на кого он подписан'
+        )
+        assert UserStats.objects.get(user=another_user).following_count == 0
+        assert UserStats.objects.get(user=user_2).following_count == 0, (
+            'Проверьте, что при удалении пользователя уменьшаются счётчики его подписчиков'
+        )
+        assert not UserStats.objects.filter(user_id=user.id).exists(), (
+            'Проверьте, что счётчики удалённого пользователя не создаются заново'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_recount_counters(self, post, comment_1_post, comment_2_post, follow_4):
+        from django.core.management import call_command
+        from posts.models import Group, UserStats
+
+        Post.objects.update(comments_count=0)
+        Group.objects.update(posts_count=0)
+        UserStats.objects.update(followers_count=7)
+        call_command('recount_counters')
+
+        post.refresh_from_db()
+        assert post.comments_count == 2, (
+            'Проверьте, что команда `recount_counters` пересчитывает комментарии публикаций'
+        )
+        assert Group.objects.get(pk=post.group_id).posts_count == 1, (
+            'Проверьте, что команда `recount_counters` пересчитывает публикации групп'
+        )
+        assert UserStats.objects.get(user=follow_4.following).followers_count == 1, (
+            'Проверьте, что команда `recount_counters` пересчитывает подписчиков'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_posts_cache_per_host(self, settings, client, user):
+        settings.ALLOWED_HOSTS = ['a.com', 'b.com']
+        post = Post.objects.create(text='С картинкой', author=user, image='posts/пример.jpg')
+        for url in ('/api/v1/posts/', f'/api/v1/posts/{post.id}/'):
+            for host in ('a.com', 'b.com'):
+                for secure in (False, True):
+                    body = client.get(url, HTTP_HOST=host, secure=secure).content.decode()
+                    scheme = 'https' if secure else 'http'
+                    assert f'{scheme}://{host}/media/' in body, (
+                        f'Проверьте, что кэш ответа `{url}` учитывает схему и хост запроса'
+                    )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_posts_list_cache_invalidated(self, client, post, another_user):
+        from posts.models import Comment
+
+        response = client.get('/api/v1/posts/')
+        etag = response['ETag']
+        assert client.get('/api/v1/posts/', HTTP_IF_NONE_MATCH=etag).status_code == 304, (
+            'Проверьте, что при совпадении If-None-Match `/api/v1/posts/` возвращает статус 304'
+        )
+
+        Comment.objects.create(text='Коммент', author=another_user, post=post)
+        response = client.get('/api/v1/posts/', HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 200, (
+            'Проверьте, что кэш `/api/v1/posts/` сбрасывается при добавлении комментария'
+        )
+        assert response.json()[0]['comments_count'] == 1
+
+    @pytest.mark.django_db(transaction=True)
+    def test_posts_cache_version_bumped_on_commit(self, post, user):
+        from django.db import transaction
+
+        from api.cache import get_versions
+
+        before = get_versions([Post])
+        with transaction.atomic():
+            Post.objects.create(text='Новая публикация', author=user)
+            # Параллельный читатель ещё видит прежние строки и кэширует
+            # ответ под текущей версией, поэтому она не должна меняться.
+            assert get_versions([Post]) == before, (
+                'Проверьте, что версия кэша ответов меняется только после фиксации транзакции'
+            )
+        assert get_versions([Post]) != before, (
+            'Проверьте, что после фиксации транзакции версия кэша ответов меняется'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_post_conditional_get(self, client, post, another_user, django_assert_num_queries):
+        url = f'/api/v1/posts/{post.id}/'
+        response = client.get(url)
+        etag = response['ETag']
+        last_modified = response['Last-Modified']
+        assert etag and last_modified, (
+            f'Проверьте, что `{url}` возвращает заголовки ETag и Last-Modified'
+        )
+
+        with django_assert_num_queries(1):
+            response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 304, (
+            f'Проверьте, что `{url}` при совпадении If-None-Match возвращает 304 одним запросом к БД'
+        )
+        response = client.get(url, HTTP_IF_MODIFIED_SINCE=last_modified)
+        assert response.status_code == 304, (
+            f'Проверьте, что `{url}` при неизменённой статье и If-Modified-Since возвращает 304'
+        )
+
+        from posts.models import Follow
+        Follow.objects.create(user=another_user, following=post.author)
+        response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 200, (
+            f'Проверьте, что ETag `{url}` меняется при изменении данных статьи'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_post_etag_changes_within_second(self, client, user_client, post, another_user):
+        from posts.models import Comment, Post
+        url = f'/api/v1/posts/{post.id}/'
+        updated = Post.objects.get(pk=post.id).updated
+        etag = client.get(url)['ETag']
+
+        Comment.objects.create(text='Комментарий', author=another_user, post=post)
+        # Last-Modified точен до секунды, а счётчик комментариев ставит
+        # время через Now(), которое в SQLite без долей секунды: имитируем
+        # запись в ту же секунду.
+        Post.objects.filter(pk=post.id).update(updated=updated)
+        response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 200 and response.json()['comments_count'] == 1, (
+            f'Проверьте, что ETag `{url}` меняется при добавлении комментария в ту же секунду'
+        )
+
+        etag = response['ETag']
+        user_client.patch(url, data={'text': 'Исправленный текст'})
+        Post.objects.filter(pk=post.id).update(updated=updated)
+        response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 200 and response.json()['text'] == 'Исправленный текст', (
+            f'Проверьте, что ETag `{url}` меняется при изменении статьи в ту же секунду'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_post_patch_changes_last_modified(self, client, user_client, post):
+        import datetime
+
+        from django.utils import timezone
+        url = f'/api/v1/posts/{post.id}/'
+        Post.objects.filter(pk=post.id).update(updated=timezone.now() - datetime.timedelta(days=1))
+        last_modified = client.get(url)['Last-Modified']
+
+        user_client.patch(url, data={'text': 'Исправленный текст'})
+        response = client.get(url, HTTP_IF_MODIFIED_SINCE=last_modified)
+        assert response.status_code == 200 and response.json()['text'] == 'Исправленный текст', (
+            f'Проверьте, что PATCH `{url}` обновляет время изменения и Last-Modified статьи'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_posts_bulk_create(self, user_client, user, group_1):
+        url = '/api/v1/posts/bulk/'
+        data = [{'text': f'Статья {number}', 'group': group_1.id} for number in range(5)]
+        response = user_client.post(url, data=data, format='json')
+        assert response.status_code == 201, (
+            f'Проверьте, что при POST запросе `{url}` со списком статей возвращается статус 201'
+        )
+        test_data = response.json()
+        assert [item['text'] for item in test_data] == [item['text'] for item in data]
+        assert all(item['author'] == user.username for item in test_data)
+        assert sorted(item['id'] for item in test_data) == sorted(
+            Post.objects.values_list('id', flat=True)), (
+            f'Проверьте, что `{url}` возвращает идентификаторы созданных статей'
+        )
+        group_1.refresh_from_db()
+        assert group_1.posts_count == 5, (
+            f'Проверьте, что `{url}` обновляет счётчик публикаций группы'
+        )
+
+        response = user_client.post(url, data=[{'text': 'Статья'}, {}], format='json')
+        assert response.status_code == 400, (
+            f'Проверьте, что `{url}` с ошибкой в одном из элементов возвращает статус 400'
+        )
+        errors = response.json()
+        assert errors[0] == {} and 'text' in errors[1], (
+            f'Проверьте, что `{url}` возвращает ошибки по каждому элементу'
+        )
+        assert Post.objects.count() == 5, (
+            f'Проверьте, что `{url}` не сохраняет часть статей при ошибке'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_posts_bulk_update(self, user_client, post, post_2, another_post, group_2):
+        url = '/api/v1/posts/bulk/'
+        data = [{'id': post.id, 'text': 'Новый текст'}, {'id': post_2.id, 'group': group_2.id}]
+        response = user_client.patch(url, data=data, format='json')
+        assert response.status_code == 200, (
+            f'Проверьте, что при PATCH запросе `{url}` возвращается статус 200'
+        )
+        post.refresh_from_db()
+        post_2.refresh_from_db()
+        assert post.text == 'Новый текст' and post_2.group_id == group_2.id, (
+            f'Проверьте, что PATCH запрос `{url}` изменяет статьи'
+        )
+        group_2.refresh_from_db()
+        assert group_2.posts_count == 2
+
+        data = [{'id': post.id, 'text': 'Текст'}, {'id': another_post.id, 'text': 'Текст'}]
+        response = user_client.patch(url, data=data, format='json')
+        assert response.status_code == 403, (
+            f'Проверьте, что PATCH запрос `{url}` с чужой статьёй возвращает статус 403'
+        )
+        response = user_client.patch(url, data=[{'id': 0, 'text': 'Текст'}], format='json')
+        assert response.status_code == 400, (
+            f'Проверьте, что PATCH запрос `{url}` с несуществующей статьёй возвращает статус 400'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_posts_bulk_update_rejects_bool_id(self, user_client, user):
+        post = Post.objects.create(id=1, text='Тестовый пост', author=user)
+        response = user_client.patch('/api/v1/posts/bulk/', data=[{'id': True, 'text': 'Текст'}], format='json')
+        post.refresh_from_db()
+        assert response.status_code == 400 and post.text != 'Текст', (
+            'Проверьте, что PATCH запрос `/api/v1/posts/bulk/` не принимает true в качестве `id`'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_posts_fast_list_identical(self, settings, client, post, another_post, user):
+        from django.core.cache import cache
+        from api.fast import FastListPlan
+        from api.serializers import PostSerializer
+
+        assert FastListPlan.build(PostSerializer(), Post) is not None, (
+            'Проверьте, что все поля PostSerializer поддерживаются быстрой сериализацией'
+        )
+        Post.objects.create(text='С картинкой', author=user, image='posts/пример 1.jpg')
+
+        for url in ('/api/v1/posts/', '/api/v1/posts/?limit=2&offset=1', '/api/v1/posts/?cursor=&limit=2'):
+            settings.FAST_LIST_SERIALIZATION = True
+            fast = client.get(url).content
+            cache.clear()
+            settings.FAST_LIST_SERIALIZATION = False
+            regular = client.get(url).content
+            cache.clear()
+            assert fast == regular, (
+                f'Проверьте, что быстрая сериализация `{url}` совпадает с PostSerializer побайтно'
+            )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_posts_filters(self, client, post, post_2, another_post, group_1, another_user):
+        response = client.get(f'/api/v1/posts/?group={group_1.slug}')
+        assert {item['id'] for item in response.json()} == {post.id, post_2.id}, (
+            'Проверьте, что `/api/v1/posts/?group=<slug>` возвращает только публикации группы'
+        )
+        response = client.get(f'/api/v1/posts/?author={another_user.username}')
+        assert [item['id'] for item in response.json()] == [another_post.id], (
+            'Проверьте, что `/api/v1/posts/?author=<username>` возвращает только публикации автора'
+        )
+        Post.objects.filter(id=post.id).update(pub_date='2000-01-01T00:00:00Z')
+        response = client.get('/api/v1/posts/?since=2010-01-01')
+        assert {item['id'] for item in response.json()} == {post_2.id, another_post.id}, (
+            'Проверьте, что `/api/v1/posts/?since=<ts>` возвращает публикации не старше указанного момента'
+        )
+        response = client.get('/api/v1/posts/?since=вчера')
+        assert response.status_code == 400, (
+            'Проверьте, что `/api/v1/posts/` с некорректным `since` возвращает статус 400'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_posts_search(self, client, user, group_1):
+        first = Post.objects.create(text='Ночной поезд уходит на север', author=user)
+        second = Post.objects.create(text='Поезд, поезд и ещё раз поезд', author=user, group=group_1)
+        Post.objects.create(text='Утренний автобус', author=user)
+
+        response = client.get('/api/v1/posts/?search=ПОЕЗД')
+        assert response.status_code == 200, (
+            'Проверьте, что `/api/v1/posts/?search=` возвращает статус 200'
+        )
+        data = response.json()
+        assert [item['id'] for item in data] == [second.id, first.id], (
+            'Проверьте, что `/api/v1/posts/?search=` находит публикации по словам '
+            'без учёта регистра, от более релевантных к менее'
+        )
+        assert '<mark>Поезд</mark>' in data[0]['highlight'] and data[0]['rank'] > data[1]['rank'], (
+            'Проверьте, что результаты поиска содержат подсветку `highlight` и релевантность `rank`'
+        )
+
+        first.text = 'Ночной самолёт'
+        first.save()
+        response = client.get(f'/api/v1/posts/?search=поезд&group={group_1.slug}&limit=1')
+        assert [item['id'] for item in response.json()['results']] == [second.id], (
+            'Проверьте, что поиск сочетается с фильтрами и пагинацией и учитывает изменения текста'
+        )
+        second.delete()
+        assert client.get('/api/v1/posts/?search=поезд').json() == [], (
+            'Проверьте, что удалённые публикации пропадают из поиска'
+        )
+        assert client.get('/api/v1/posts/?search="*').json() == [], (
+            'Проверьте, что служебные символы в строке поиска не приводят к ошибке'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_posts_search_unsupported_database(self, client, post, monkeypatch):
+        from posts import search
+        monkeypatch.setattr(search, 'SEARCH_VENDORS', ('postgresql',))
+        response = client.get('/api/v1/posts/?search=поезд')
+        assert response.status_code == 400 and 'search' in response.json(), (
+            'Проверьте, что поиск на базе без полнотекстового индекса возвращает статус 400, а не ошибку сервера'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_posts_search_highlight_escaped(self, client, user):
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+
+        Post.objects.create(text='<img src=x onerror=alert(1)> поезд & вокзал', author=user)
+        with CaptureQueriesContext(connection) as context:
+            data = client.get('/api/v1/posts/?search=поезд').json()
+        assert data[0]['highlight'] == '&lt;img src=x onerror=alert(1)&gt; <mark>поезд</mark> &amp; вокзал', (
+            'Проверьте, что подсветка результатов поиска экранирует текст публикации'
+        )
+        if connection.vendor == 'sqlite':
+            sql = next(query['sql'] for query in context.captured_queries if 'MATCH' in query['sql'])
+            assert sql.count('MATCH') == 1, (
+                'Проверьте, что полнотекстовый индекс используется в запросе поиска один раз'
+            )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_post_image_variants(self, user_client, jpeg_image, media_root):
+        from posts.images import image_queue
+
+        response = user_client.post('/api/v1/posts/', data={'text': 'Фото', 'image': jpeg_image()}, format='multipart')
+        assert response.status_code == 201, (
+            'Проверьте, что при POST запросе с изображением на `/api/v1/posts/` возвращается статус 201'
+        )
+        assert response.json()['image_srcset'] == {}, (
+            'Проверьте, что копии изображения создаются вне запроса'
+        )
+        image_queue.join()
+        srcset = user_client.get(f'/api/v1/posts/{response.json()["id"]}/').json()['image_srcset']
+        assert [item.split()[-1] for item in srcset['webp'].split(', ')] == ['320w', '640w', '800w'], (
+            'Проверьте, что для изображения создаются WebP-копии нужных ширин, но не шире оригинала'
+        )
+        assert [item.split()[-1] for item in srcset['jpeg'].split(', ')] == ['320w', '640w', '800w'], (
+            'Проверьте, что srcset в исходном формате содержит уменьшенные копии и оригинал'
+        )
+        variants = sorted(path.name for path in (media_root / 'posts').rglob('*w.*'))
+        assert len(variants) == 5, (
+            'Проверьте, что копии сохраняются рядом с оригиналом'
+        )
+
+        user_client.post('/api/v1/posts/', data={'text': 'Повтор', 'image': jpeg_image()}, format='multipart')
+        image_queue.join()
+        assert sorted(path.name for path in (media_root / 'posts').rglob('*w.*')) == variants, (
+            'Проверьте, что имена копий зависят от содержимого и одинаковые изображения не обрабатываются повторно'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_post_image_upload_deduplicated(self, user_client, jpeg_image, media_root):
+        import hashlib
+
+        first = user_client.post('/api/v1/posts/', data={'text': 'Фото', 'image': jpeg_image()}, format='multipart')
+        second = user_client.post('/api/v1/posts/', data={'text': 'Фото', 'image': jpeg_image()}, format='multipart')
+        assert first.status_code == second.status_code == 201, (
+            'Проверьте, что при POST запросе с изображением на `/api/v1/posts/` возвращается статус 201'
+        )
+        names = set(Post.objects.values_list('image', flat=True))
+        digest = hashlib.sha256(jpeg_image().getvalue()).hexdigest()
+        assert names == {f'posts/{digest[:2]}/{digest}.jpg'}, (
+            'Проверьте, что изображение сохраняется под именем из хэша содержимого '
+            'и одинаковые изображения хранятся один раз'
+        )
+        originals = [path for path in (media_root / 'posts').rglob('*.jpg') if 'w.' not in path.name]
+        assert len(originals) == 1, 'Проверьте, что одинаковые изображения не сохраняются повторно'
+
+    @pytest.mark.django_db(transaction=True)
+    def test_post_image_upload_limits(self, settings, user_client, jpeg_image):
+        settings.IMAGE_UPLOAD_MAX_PIXELS = 1000
+        response = user_client.post('/api/v1/posts/', data={'text': 'Фото', 'image': jpeg_image()}, format='multipart')
+        assert response.status_code == 400 and 'image' in response.json(), (
+            'Проверьте, что слишком большое по размерам изображение отклоняется по заголовку'
+        )
+        settings.IMAGE_UPLOAD_MAX_PIXELS = 40_000_000
+        settings.IMAGE_UPLOAD_MAX_SIZE = 1024
+        response = user_client.post('/api/v1/posts/', data={'text': 'Фото', 'image': jpeg_image()}, format='multipart')
+        assert response.status_code == 400 and 'image' in response.json(), (
+            'Проверьте, что файл больше допустимого размера отклоняется'
+        )
+        assert not Post.objects.exists()
+        response = user_client.post(
+            '/api/v1/posts/', data={'text': 'Фото', 'image': SimpleUploadedFile('a.jpg', b'not an image')},
+            format='multipart')
+        assert response.status_code == 400, 'Проверьте, что файл, не являющийся изображением, отклоняется'
+
+    @pytest.mark.django_db(transaction=True)
+    def test_post_image_upload_decompression_bomb(self, user_client):
+        import struct
+        import zlib
+
+        def chunk(kind, data):
+            return struct.pack('>I', len(data)) + kind + data + struct.pack('>I', zlib.crc32(kind + data))
+
+        # Заголовок PNG 20000×20000: Pillow откажется его открывать.
+        png = (b'\x89PNG\r\n\x1a\n' + chunk(b'IHDR', struct.pack('>IIBBBBB', 20000, 20000, 8, 2, 0, 0, 0))
+               + chunk(b'IDAT', zlib.compress(b'\0' * 64)))
+        response = user_client.post(
+            '/api/v1/posts/', data={'text': 'Фото', 'image': SimpleUploadedFile('bomb.png', png)},
+            format='multipart')
+        assert response.status_code == 400 and 'image' in response.json(), (
+            'Проверьте, что изображение, которое Pillow считает слишком большим, отклоняется по заголовку'
+        )
+        assert not Post.objects.exists()
+
+    @pytest.mark.django_db(transaction=True)
+    def test_post_image_upload_extension(self, user_client, jpeg_image, media_root):
+        from io import BytesIO
+
+        from PIL import Image
+
+        buffer = BytesIO()
+        Image.new('RGB', (10, 10), 'red').save(buffer, 'GIF')
+        response = user_client.post(
+            '/api/v1/posts/', data={'text': 'Фото', 'image': SimpleUploadedFile('evil.html', buffer.getvalue())},
+            format='multipart')
+        assert response.status_code == 400 and 'image' in response.json(), (
+            'Проверьте, что изображение с расширением не изображения отклоняется'
+        )
+        assert not list(media_root.rglob('*.html')), 'Проверьте, что отклонённый файл не сохраняется'
+
+        image = jpeg_image()
+        image.name = 'photo.png'
+        response = user_client.post('/api/v1/posts/', data={'text': 'Фото', 'image': image}, format='multipart')
+        assert response.status_code == 201 and Post.objects.get().image.name.endswith('.jpg'), (
+            'Проверьте, что расширение сохранённого файла определяется по формату изображения, а не по имени'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_posts_can_edit(self, client, user_client, post, another_post, another_user):
+        from rest_framework.test import APIClient
+
+        assert 'can_edit' not in user_client.get('/api/v1/posts/').json()[0], (
+            'Проверьте, что поле `can_edit` отдаётся только по запросу `?can_edit=1`'
+        )
+        url = '/api/v1/posts/?can_edit=1'
+        data = {item['id']: item['can_edit'] for item in user_client.get(url).json()}
+        assert data == {post.id: True, another_post.id: False}, (
+            f'Проверьте, что `{url}` отмечает публикации, которые пользователь может изменять'
+        )
+
+        another_client = APIClient()
+        another_client.force_authenticate(another_user)
+        data = {item['id']: item['can_edit'] for item in another_client.get(url).json()}
+        assert data == {post.id: False, another_post.id: True}, (
+            f'Проверьте, что ответ `{url}` не берётся из кэша другого пользователя'
+        )
+        assert not any(item['can_edit'] for item in client.get(url).json()), (
+            f'Проверьте, что для анонимного запроса `{url}` все `can_edit` ложны'
+        )
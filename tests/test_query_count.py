@@ -0,0 +1,173 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from posts.models import Comment, Follow, Post
+
+
+def count_queries(client, url):
+    with CaptureQueriesContext(connection) as context:
+        response = client.get(url)
+    assert response.status_code == 200, (
+        f'Проверьте, что при GET запросе `{url}` возвращается статус 200'
+    )
+    return len(context.captured_queries)
+
+
+class TestQueryCount:
+
+    @pytest.fixture
+    def user_client(self, user, monkeypatch):
+        from rest_framework.test import APIClient
+        from api.revocation import revocation_list
+        from api.tokens import ClaimsRefreshToken
+
+        # Список отозванных токенов дочитывается из БД периодически;
+        # в замерах он уже загружен.
+        revocation_list.refresh()
+        monkeypatch.setattr(revocation_list, 'refresh_interval', 3600)
+
+        # С claims пользователя в токене аутентификация не ходит в БД,
+        # и первый запрос не отличается от последующих.
+        client = APIClient()
+        client.credentials(
+            HTTP_AUTHORIZATION=f'Bearer {ClaimsRefreshToken.for_user(user).access_token}')
+        return client
+
+    @pytest.fixture
+    def many_authors(self, django_user_model):
+        return [
+            django_user_model.objects.create_user(
+                username=f'author_{number}', password='1234567')
+            for number in range(10)
+        ]
+
+    @pytest.mark.django_db(transaction=True)
+    def test_posts_list_constant_queries(self, user_client, many_authors, group_1):
+        for author in many_authors:
+            Post.objects.create(text='Текст', author=author, group=group_1)
+
+        small = count_queries(user_client, '/api/v1/posts/?limit=1&exact_count=1')
+        large = count_queries(user_client, '/api/v1/posts/?limit=10&exact_count=1')
+        assert small == large, (
+            'Проверьте, что количество запросов к БД на `/api/v1/posts/` '
+            'не зависит от размера страницы'
+        )
+        assert count_queries(user_client, '/api/v1/posts/') == large - 1, (
+            'Проверьте, что список `/api/v1/posts/` без пагинации '
+            'не делает отдельный запрос на каждого автора'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_comments_list_constant_queries(self, user_client, post, many_authors):
+        url = f'/api/v1/posts/{post.id}/comments/'
+        Comment.objects.create(text='Текст', author=many_authors[0], post=post)
+        few = count_queries(user_client, url)
+
+        for author in many_authors[1:]:
+            Comment.objects.create(text='Текст', author=author, post=post)
+        assert count_queries(user_client, url) == few, (
+            f'Проверьте, что количество запросов к БД на `{url}` '
+            'не зависит от количества комментариев'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_comments_single_parent_lookup(self, user_client, post):
+        url = f'/api/v1/posts/{post.id}/comments/'
+        for method, data in (('get', None), ('post', {'text': 'Комментарий'})):
+            with CaptureQueriesContext(connection) as context:
+                getattr(user_client, method)(url, data=data)
+            lookups = [query['sql'] for query in context.captured_queries
+                       if query['sql'].startswith('SELECT') and 'FROM "posts_post"' in query['sql']]
+            assert len(lookups) == 1, (
+                f'Проверьте, что {method.upper()} `{url}` ищет публикацию в БД один раз'
+            )
+            assert '"posts_post"."text"' not in lookups[0], (
+                f'Проверьте, что {method.upper()} `{url}` не загружает публикацию целиком'
+            )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_author_permission_without_user_query(self, user, another_user, post, django_assert_num_queries):
+        from rest_framework.test import APIRequestFactory
+        from api.permissions import IsAuthorOrReadOnly
+
+        request = APIRequestFactory().patch('/')
+        instance = Post.objects.only('id', 'author_id').get(pk=post.pk)
+        with django_assert_num_queries(0):
+            for request.user, allowed in ((user, True), (another_user, False)):
+                assert IsAuthorOrReadOnly().has_object_permission(request, None, instance) is allowed, (
+                    'Проверьте, что IsAuthorOrReadOnly сравнивает автора по author_id без запроса к БД'
+                )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_follow_list_constant_queries(self, user_client, user, many_authors):
+        url = '/api/v1/follow/'
+        Follow.objects.create(user=user, following=many_authors[0])
+        few = count_queries(user_client, url)
+
+        for author in many_authors[1:]:
+            Follow.objects.create(user=user, following=author)
+        assert count_queries(user_client, url) == few, (
+            f'Проверьте, что количество запросов к БД на `{url}` '
+            'не зависит от количества подписок'
+        )
+
+
+class TestQueryPlans:
+
+    def explain(self, sql):
+        with connection.cursor() as cursor:
+            cursor.execute(f'EXPLAIN QUERY PLAN {sql}')
+            return [row[-1] for row in cursor.fetchall()]
+
+    @pytest.mark.django_db(transaction=True)
+    def test_post_filters_use_indexes(self, client, post, another_post, user, group_1):
+        if connection.vendor != 'sqlite':
+            pytest.skip('Планы запросов проверяются на SQLite')
+        urls = [
+            f'/api/v1/posts/?group={group_1.slug}&limit=5&exact_count=1',
+            f'/api/v1/posts/?author={user.username}&limit=5&exact_count=1',
+            '/api/v1/posts/?since=2020-01-01&limit=5&exact_count=1',
+            f'/api/v1/posts/?group={group_1.slug}&cursor=',
+            f'/api/v1/groups/{group_1.slug}/posts/?limit=5&exact_count=1',
+        ]
+        for url in urls:
+            with CaptureQueriesContext(connection) as context:
+                assert client.get(url).status_code == 200
+            plans = [
+                self.explain(query['sql'])
+                for query in context.captured_queries
+                if 'FROM "posts_post"' in query['sql']
+            ]
+            assert plans, f'Проверьте, что `{url}` выбирает публикации из БД'
+            for plan in plans:
+                assert not any(step.startswith('SCAN posts_post') for step in plan), (
+                    f'Проверьте, что `{url}` не читает таблицу публикаций целиком: {plan}'
+                )
+                assert not any('TEMP B-TREE' in step for step in plan), (
+                    f'Проверьте, что `{url}` сортирует публикации по индексу: {plan}'
+                )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_feed_uses_index(self, user_client, user, another_user):
+        if connection.vendor != 'sqlite':
+            pytest.skip('Планы запросов проверяются на SQLite')
+        Follow.objects.create(user=user, following=another_user)
+        posts = [Post.objects.create(text=f'Статья {number}', author=another_user) for number in range(3)]
+
+        url = '/api/v1/feed/?cursor=&limit=2'
+        with CaptureQueriesContext(connection) as context:
+            response = user_client.get(url)
+        plans = [
+            self.explain(query['sql'])
+            for query in context.captured_queries
+            if 'FROM "posts_post"' in query['sql']
+        ]
+        assert plans and not any('TEMP B-TREE' in step for plan in plans for step in plan), (
+            f'Проверьте, что `{url}` сортирует ленту по индексу FeedEntry: {plans}'
+        )
+        ids = [item['id'] for item in response.json()['results']]
+        ids += [item['id'] for item in user_client.get(response.json()['next']).json()['results']]
+        assert ids == [post.id for post in reversed(posts)], (
+            'Проверьте, что курсор ленты ведёт на следующую страницу'
+        )
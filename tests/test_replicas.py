@@ -0,0 +1,89 @@
+import json
+
+import pytest
+
+from posts.models import Post
+
+
+class TestReplicas:
+
+    @pytest.fixture
+    def replica(self, settings, tmp_path):
+        from django.db import connections
+
+        connections.databases['replica'] = {
+            **connections.databases['default'], 'NAME': str(tmp_path / 'replica.sqlite3')}
+        settings.DATABASE_REPLICAS = ['replica']
+        yield 'replica'
+        connections['replica'].close()
+        delattr(connections._connections, 'replica')
+        del connections.databases['replica']
+
+    @staticmethod
+    def post_ids(client):
+        return {item['id'] for item in client.get('/api/v1/posts/').json()}
+
+    @pytest.mark.django_db(transaction=True)
+    def test_replica_reads_and_stickiness(self, replica, client, user_client, token, post):
+        from rest_framework.test import APIClient
+        from api.replicas import replicate
+
+        replicate(replica)
+        response = user_client.post('/api/v1/posts/', data={'text': 'Свежая публикация'})
+        new_id = response.json()['id']
+        assert not Post.objects.using(replica).filter(pk=new_id).exists(), (
+            'Проверьте, что запись идёт в основную базу'
+        )
+        assert self.post_ids(client) == {post.id}, (
+            'Проверьте, что GET `/api/v1/posts/` читает с реплики'
+        )
+        assert new_id in self.post_ids(user_client), (
+            'Проверьте, что после записи клиент с cookie читает с основной базы'
+        )
+        token_client = APIClient()
+        token_client.credentials(HTTP_AUTHORIZATION=f'Bearer {token["access"]}')
+        assert new_id in self.post_ids(token_client), (
+            'Проверьте, что после записи пользователь читает с основной базы и без cookie'
+        )
+
+        replicate(replica)
+        assert self.post_ids(client) == {post.id, new_id}, (
+            'Проверьте, что ответ с отстающей реплики не кэшируется'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_replica_lagging_detail_not_cached(self, replica, client, settings, post):
+        from api.asgi import AsyncReadApplication
+        from api.replicas import replicate
+        from tests.test_asgi import asgi_request
+
+        settings.ALLOWED_HOSTS = ['localhost', 'testserver']
+        application = AsyncReadApplication()
+        path = f'/api/v1/posts/{post.id}/'
+        replicate(replica)
+        post.text = 'Исправленный текст'
+        post.save()
+
+        response = client.get(path)
+        assert response.json()['text'] != post.text and not response.has_header('ETag'), (
+            'Проверьте, что ответ с отстающей реплики не получает ETag'
+        )
+        status, headers, content = asgi_request(application, path)
+        assert 'etag' not in headers, 'Проверьте, что ASGI-приложение не кэширует ответ с отстающей реплики'
+
+        replicate(replica)
+        assert client.get(path).json()['text'] == post.text, (
+            'Проверьте, что после репликации отдаётся свежая публикация'
+        )
+        status, headers, content = asgi_request(application, path)
+        assert json.loads(content)['text'] == post.text, (
+            'Проверьте, что после репликации ASGI-приложение отдаёт свежую публикацию'
+        )
+
+    def test_replica_not_migrated(self, replica):
+        from api.replicas import ReplicaRouter
+
+        assert ReplicaRouter().allow_migrate(replica, 'posts') is False, (
+            'Проверьте, что миграции не выполняются на репликах'
+        )
+        assert ReplicaRouter().db_for_write(Post) == 'default', 'Проверьте, что запись идёт в основную базу'
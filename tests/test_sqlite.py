@@ -0,0 +1,42 @@
+import sqlite3
+from types import SimpleNamespace
+
+import pytest
+from django.db import connection
+
+
+class TestSqliteProfile:
+
+    @pytest.mark.django_db
+    def test_pragmas_applied_on_connect(self, settings):
+        with connection.cursor() as cursor:
+            cursor.execute('PRAGMA busy_timeout')
+            assert cursor.fetchone()[0] == settings.SQLITE_PRAGMAS['busy_timeout'], (
+                'Проверьте, что PRAGMA из SQLITE_PRAGMAS выполняются для каждого нового соединения'
+            )
+
+    def test_file_database_uses_wal(self, settings, tmp_path):
+        from posts.sqlite import apply_pragmas
+
+        raw = sqlite3.connect(str(tmp_path / 'db.sqlite3'))
+        apply_pragmas(None, SimpleNamespace(vendor='sqlite', connection=raw))
+        assert raw.execute('PRAGMA journal_mode').fetchone()[0] == 'wal', (
+            'Проверьте, что файл базы SQLite переводится в режим WAL'
+        )
+        assert raw.execute('PRAGMA synchronous').fetchone()[0] == 1, (
+            'Проверьте, что для SQLite включён synchronous=NORMAL'
+        )
+        raw.close()
+
+    @pytest.mark.django_db(transaction=True)
+    def test_atomic_begins_immediate(self):
+        from django.db import transaction
+        from django.test.utils import CaptureQueriesContext
+
+        with CaptureQueriesContext(connection) as context:
+            with transaction.atomic():
+                pass
+        assert context.captured_queries[0]['sql'] == 'BEGIN IMMEDIATE', (
+            'Проверьте, что транзакции SQLite сразу берут блокировку на запись: '
+            'иначе запись после чтения получает «database is locked» без ожидания busy_timeout'
+        )
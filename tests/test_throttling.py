@@ -0,0 +1,83 @@
+import pytest
+
+
+class TestThrottling:
+    url = '/api/v1/posts/'
+
+    @pytest.fixture
+    def rates(self, settings):
+        settings.REST_FRAMEWORK = {
+            **settings.REST_FRAMEWORK,
+            'DEFAULT_THROTTLE_RATES': {'posts.create': '2/min', 'follow': '1/min'},
+        }
+
+    @pytest.mark.django_db(transaction=True)
+    def test_throttle_create(self, rates, user_client, another_user):
+        from rest_framework.test import APIClient
+
+        for _ in range(2):
+            response = user_client.post(self.url, data={'text': 'Текст'})
+            assert response.status_code == 201, 'Проверьте, что в пределах лимита публикации создаются'
+        response = user_client.post(self.url, data={'text': 'Текст'})
+        assert response.status_code == 429, (
+            'Проверьте, что при исчерпании лимита создание публикации возвращает статус 429'
+        )
+        assert 0 < int(response['Retry-After']) <= 30, (
+            'Проверьте, что ответ 429 содержит Retry-After со временем до следующего токена'
+        )
+        assert user_client.get(self.url).status_code == 200, (
+            'Проверьте, что лимит на создание не ограничивает чтение'
+        )
+
+        client = APIClient()
+        client.force_authenticate(another_user)
+        assert client.post(self.url, data={'text': 'Текст'}).status_code == 201, (
+            'Проверьте, что лимит считается отдельно для каждого пользователя'
+        )
+        assert client.post('/api/v1/follow/', data={'following': 'TestUser'}).status_code == 201
+        assert client.get('/api/v1/follow/').status_code == 429, (
+            'Проверьте, что лимит вьюсета без указания действия действует на все его действия'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_throttle_bulk_per_item(self, settings, user_client):
+        settings.REST_FRAMEWORK = {
+            **settings.REST_FRAMEWORK,
+            'DEFAULT_THROTTLE_RATES': {'posts.bulk': '5/min'},
+        }
+        url = '/api/v1/posts/bulk/'
+        response = user_client.post(url, data=[{'text': 'Текст'}] * 3, format='json')
+        assert response.status_code == 201
+        response = user_client.post(url, data=[{'text': 'Текст'}] * 3, format='json')
+        assert response.status_code == 429, (
+            'Проверьте, что массовое создание расходует лимит частоты по объекту, а не по запросу'
+        )
+        assert user_client.post(url, data=[{'text': 'Текст'}] * 2, format='json').status_code == 201, (
+            'Проверьте, что оставшийся лимит можно израсходовать меньшим пакетом'
+        )
+
+    @pytest.mark.parametrize('store_name', ['local', 'cache'])
+    def test_throttle_store_refill(self, settings, store_name):
+        from api.throttling import make_store
+
+        settings.THROTTLE_STORE = store_name
+        store = make_store()
+        assert [store.take('key', 2, 1, 100.0) for _ in range(3)] == [0, 0, 1], (
+            'Проверьте, что корзина вмещает `capacity` токенов, а затем требует ожидания'
+        )
+        assert store.take('key', 2, 1, 100.5) == 0.5, 'Проверьте, что время ожидания учитывает пополнение'
+        assert store.take('key', 2, 1, 101.0) == 0, 'Проверьте, что корзина пополняется со временем'
+        assert store.take('other', 2, 1, 101.0) == 0, 'Проверьте, что корзины разных ключей независимы'
+
+    def test_local_store_bounded(self):
+        from api.throttling import LocalBucketStore
+
+        store = LocalBucketStore(max_keys=2)
+        store.take('first', 1, 1, 100.0)
+        store.take('second', 1, 1, 100.0)
+        assert store.take('first', 1, 1, 100.0) == 1
+        store.take('third', 1, 1, 100.0)
+        assert list(store.buckets) == ['first', 'third'], (
+            'Проверьте, что локальное хранилище не больше max_keys и вытесняет давно не использованные корзины'
+        )
+        assert store.take('first', 1, 1, 100.0) == 1, 'Проверьте, что недавно использованная корзина не вытесняется'
@@ -0,0 +1,312 @@
+import asyncio
+import hashlib
+import json
+import re
+import sys
+from io import BytesIO
+from urllib.parse import parse_qsl
+
+from asgiref.sync import ThreadSensitiveContext, sync_to_async
+from asgiref.wsgi import WsgiToAsgi
+from django.conf import settings
+from django.core.handlers.wsgi import WSGIHandler
+from django.db import connections
+
+from .cache import get_response_cache, get_versions, if_none_match
+from .live import backfill, format_event, hub
+from .views import CommentViewSet, GroupViewSet, PostViewSet
+
+# Адреса чтения, которые обслуживаются асинхронно, и вьюсеты, по моделям
+# которых (cache_models) проверяется актуальность готовых ответов.
+READ_ROUTES = (
+    (re.compile(r'^/api/v1/posts/$'), PostViewSet),
+    (re.compile(r'^/api/v1/posts/\d+/$'), PostViewSet),
+    (re.compile(r'^/api/v1/posts/\d+/comments/$'), CommentViewSet),
+    (re.compile(r'^/api/v1/groups/$'), GroupViewSet),
+    (re.compile(r'^/api/v1/groups/[^/.]+/$'), GroupViewSet),
+)
+
+# Long-poll адреса: запрос ждёт событий до десятков секунд и не должен
+# занимать общий поток WsgiToAsgi, поэтому выполняется в своём потоке.
+LONG_POLL_ROUTES = (
+    re.compile(r'^/api/v1/changes/$'),
+)
+
+# Поток новых комментариев публикации (Server-Sent Events).
+COMMENTS_STREAM_ROUTE = re.compile(
+    r'^/api/v1/posts/(?P<post_id>\d+)/comments/stream/$')
+
+# Заголовки, при которых ответ зависит от пользователя.
+PERSONAL_HEADERS = ('authorization', 'cookie')
+
+
+def build_environ(scope, body):
+    """WSGI environ из ASGI scope для обработчика Django."""
+    environ = {
+        'REQUEST_METHOD': scope['method'],
+        'SCRIPT_NAME': scope.get('root_path', ''),
+        'PATH_INFO': scope['path'].encode().decode('latin-1'),
+        'QUERY_STRING': scope['query_string'].decode('latin-1'),
+        'SERVER_PROTOCOL': f'HTTP/{scope.get("http_version", "1.1")}',
+        'wsgi.version': (1, 0),
+        'wsgi.url_scheme': scope.get('scheme', 'http'),
+        'wsgi.input': BytesIO(body),
+        'wsgi.errors': sys.stderr,
+        'wsgi.multithread': True,
+        'wsgi.multiprocess': True,
+        'wsgi.run_once': False,
+    }
+    server = scope.get('server') or ('localhost', 80)
+    environ['SERVER_NAME'], environ['SERVER_PORT'] = server[0], str(server[1])
+    if scope.get('client'):
+        environ['REMOTE_ADDR'] = scope['client'][0]
+    for name, value in scope.get('headers', ()):
+        name = name.decode('latin-1').upper().replace('-', '_')
+        if name not in ('CONTENT_LENGTH', 'CONTENT_TYPE'):
+            name = f'HTTP_{name}'
+        value = value.decode('latin-1')
+        if name in environ:
+            value = f'{environ[name]},{value}'
+        environ[name] = value
+    return environ
+
+
+async def send_json(send, status, data):
+    await send({
+        'type': 'http.response.start',
+        'status': status,
+        'headers': [(b'content-type', b'application/json')],
+    })
+    await send({'type': 'http.response.body',
+                'body': json.dumps(data, ensure_ascii=False).encode()})
+
+
+async def wait_disconnect(receive):
+    while (await receive())['type'] != 'http.disconnect':
+        pass
+
+
+async def read_body(receive):
+    body = []
+    while True:
+        message = await receive()
+        body.append(message.get('body', b''))
+        if not message.get('more_body'):
+            return b''.join(body)
+
+
+class AsyncReadApplication:
+    """ASGI-приложение с асинхронным чтением публикаций, групп и комментариев.
+
+    GET на адреса из READ_ROUTES обрабатывается так: готовый ответ для
+    анонимного запроса и 304 по If-None-Match отдаются из кэша прямо в
+    цикле событий, без потока. Иначе весь запрос — аутентификация,
+    запросы к БД и сериализация — выполняется одним вызовом
+    sync_to_async(thread_sensitive=True) в отдельном для запроса потоке,
+    так что запросы идут параллельно, а все обращения запроса к ORM
+    используют одно соединение; после запроса оно закрывается. Так же, но
+    без кэша, обслуживаются адреса из LONG_POLL_ROUTES. Остальные
+    запросы передаются обработчику Django через WsgiToAsgi.
+    """
+
+    def __init__(self, wsgi_application=None):
+        self.wsgi_application = wsgi_application or WSGIHandler()
+        self.fallback = WsgiToAsgi(self.wsgi_application)
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] == 'lifespan':
+            return await self.lifespan(receive, send)
+        stream = (scope['type'] == 'http' and scope['method'] == 'GET'
+                  and COMMENTS_STREAM_ROUTE.match(scope['path']))
+        if stream:
+            await read_body(receive)
+            return await self.stream_comments(
+                int(stream['post_id']), scope, receive, send)
+        if self.is_long_poll(scope):
+            body = await read_body(receive)
+            return await self.send_response(
+                send, *await self.render_in_thread(scope, body))
+        view = self.match(scope)
+        if view is None:
+            return await self.fallback(scope, receive, send)
+        body = await read_body(receive)
+        headers = dict(scope.get('headers', ()))
+        # Обращения к кэшу блокирующие и выполняются вне цикла событий.
+        key, cached = await sync_to_async(
+            self.cached_response, thread_sensitive=False,
+        )(scope, headers, view)
+        if cached is None:
+            status, response_headers, content = await self.render_in_thread(
+                scope, body)
+            # Ответ без ETag не кэшируется и самим вьюсетом (например,
+            # прочитанный с отстающей реплики).
+            if key and status == 200 and 'ETag' in dict(response_headers):
+                await sync_to_async(
+                    get_response_cache().set, thread_sensitive=False,
+                )(key, (response_headers, content),
+                  getattr(settings, 'RESPONSE_CACHE_TIMEOUT', 300))
+        else:
+            status, (response_headers, content) = 200, cached
+            etag = dict(response_headers).get('ETag')
+            if etag and if_none_match(
+                    headers.get(b'if-none-match', b'').decode(), etag):
+                status, response_headers, content = (
+                    304, [('ETag', etag)], b'')
+        await self.send_response(send, status, response_headers, content)
+
+    async def render_in_thread(self, scope, body):
+        async with ThreadSensitiveContext():
+            return await sync_to_async(
+                self.render_request, thread_sensitive=True,
+            )(build_environ(scope, body))
+
+    @staticmethod
+    async def send_response(send, status, headers, content):
+        await send({
+            'type': 'http.response.start',
+            'status': status,
+            'headers': [(name.lower().encode('latin-1'),
+                         value.encode('latin-1'))
+                        for name, value in headers],
+        })
+        await send({'type': 'http.response.body', 'body': content})
+
+    async def stream_comments(self, post_id, scope, receive, send):
+        """Новые комментарии публикации в формате Server-Sent Events.
+
+        Продолжить с места обрыва можно заголовком Last-Event-ID или
+        параметром last_id: пропущенные комментарии дочитываются из БД.
+        """
+        headers = dict(scope.get('headers', ()))
+        query = dict(parse_qsl(scope['query_string'].decode('latin-1')))
+        last_id = headers.get(b'last-event-id', b'').decode('latin-1') or (
+            query.get('last_id'))
+        if last_id is not None and not last_id.isdigit():
+            return await send_json(send, 400, {
+                'last_id': 'Ожидается целое неотрицательное число.'})
+        # Подписка раньше чтения из БД, чтобы не потерять комментарии,
+        # созданные между ними.
+        subscription = hub.subscribe(post_id)
+        try:
+            async with ThreadSensitiveContext():
+                events = await sync_to_async(
+                    backfill, thread_sensitive=True,
+                )(post_id, last_id and int(last_id), getattr(
+                    settings, 'LIVE_COMMENTS_BACKFILL_LIMIT', 1000))
+            if events is None:
+                return await send_json(
+                    send, 404, {'detail': 'Страница не найдена.'})
+            await send({
+                'type': 'http.response.start',
+                'status': 200,
+                'headers': [(b'content-type', b'text/event-stream'),
+                            (b'cache-control', b'no-cache'),
+                            (b'x-accel-buffering', b'no')],
+            })
+            await self.send_events(subscription, events, receive, send)
+        finally:
+            hub.unsubscribe(subscription)
+
+    @staticmethod
+    async def send_events(subscription, events, receive, send):
+        last_id = None
+        for last_id, data in events:
+            await send({'type': 'http.response.body', 'more_body': True,
+                        'body': format_event(last_id, data)})
+        heartbeat = getattr(settings, 'LIVE_COMMENTS_HEARTBEAT', 15)
+        disconnect = asyncio.ensure_future(wait_disconnect(receive))
+        try:
+            while not subscription.overflowed:
+                get = asyncio.ensure_future(subscription.queue.get())
+                done, _ = await asyncio.wait(
+                    {get, disconnect}, timeout=heartbeat,
+                    return_when=asyncio.FIRST_COMPLETED)
+                if get not in done:
+                    get.cancel()
+                    if disconnect in done:
+                        return
+                    body = b': keep-alive\n\n'
+                else:
+                    event_id, data = get.result()
+                    if last_id is not None and event_id <= last_id:
+                        continue
+                    last_id, body = event_id, format_event(event_id, data)
+                await send({'type': 'http.response.body', 'body': body,
+                            'more_body': True})
+            await send({'type': 'http.response.body', 'body': b''})
+        finally:
+            disconnect.cancel()
+
+    @staticmethod
+    def match(scope):
+        if scope['type'] != 'http' or scope['method'] != 'GET':
+            return None
+        for pattern, view in READ_ROUTES:
+            if pattern.match(scope['path']):
+                return view
+        return None
+
+    @staticmethod
+    def is_long_poll(scope):
+        return (scope['type'] == 'http' and scope['method'] == 'GET'
+                and any(pattern.match(scope['path'])
+                        for pattern in LONG_POLL_ROUTES))
+
+    @staticmethod
+    def cache_key(scope, headers, view):
+        if any(name.encode() in headers for name in PERSONAL_HEADERS):
+            return None
+        # Ответ содержит абсолютные адреса изображений, поэтому зависит
+        # от схемы и хоста.
+        parts = [
+            scope.get('scheme', 'http'),
+            headers.get(b'host', b'').decode('latin-1'),
+            scope['path'],
+            sorted(parse_qsl(scope['query_string'].decode('latin-1'),
+                             keep_blank_values=True)),
+            headers.get(b'accept', b'').decode('latin-1'),
+            get_versions(view.cache_models),
+        ]
+        digest = hashlib.md5(repr(parts).encode()).hexdigest()
+        return f'asgi-response:{digest}'
+
+    def cached_response(self, scope, headers, view):
+        """Ключ кэша и готовый ответ из него (или None)."""
+        key = self.cache_key(scope, headers, view)
+        return key, get_response_cache().get(key) if key else None
+
+    def render_request(self, environ):
+        """render в потоке, который завершится вместе с запросом.
+
+        Соединения с БД этого потока закрываются сразу: переиспользовать
+        их некому, и CONN_MAX_AGE здесь не действует.
+        """
+        try:
+            return self.render(environ)
+        finally:
+            connections.close_all()
+
+    def render(self, environ):
+        started = {}
+
+        def start_response(status, headers, exc_info=None):
+            started['status'], started['headers'] = status, headers
+
+        result = self.wsgi_application(environ, start_response)
+        try:
+            content = b''.join(result)
+        finally:
+            if hasattr(result, 'close'):
+                result.close()
+        return (int(started['status'].split()[0]), started['headers'],
+                content)
+
+    @staticmethod
+    async def lifespan(receive, send):
+        while True:
+            message = await receive()
+            if message['type'] == 'lifespan.startup':
+                await send({'type': 'lifespan.startup.complete'})
+            elif message['type'] == 'lifespan.shutdown':
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
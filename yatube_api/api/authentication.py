@@ -0,0 +1,112 @@
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import router
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import (
+    AuthenticationFailed, InvalidToken,
+)
+from rest_framework_simplejwt.settings import api_settings
+
+from .revocation import revocation_list
+
+User = get_user_model()
+
+# Поля пользователя, которые кладутся в токен и по которым без обращения
+# к базе собирается request.user.
+USER_CLAIMS = ('username', 'is_active', 'is_staff', 'is_superuser')
+
+
+class UserRowCache:
+    """Потокобезопасный LRU-кэш строк пользователей с временем жизни."""
+
+    def __init__(self, maxsize, ttl):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.rows = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, user_id):
+        now = time.monotonic()
+        with self.lock:
+            entry = self.rows.get(user_id)
+            if entry is not None and entry[0] > now:
+                self.rows.move_to_end(user_id)
+                return entry[1]
+        row = (
+            User.objects.filter(pk=user_id).values(*USER_CLAIMS).first()
+        )
+        if row is not None:
+            with self.lock:
+                self.rows[user_id] = (now + self.ttl, row)
+                self.rows.move_to_end(user_id)
+                while len(self.rows) > self.maxsize:
+                    self.rows.popitem(last=False)
+        return row
+
+    def discard(self, user_id):
+        with self.lock:
+            self.rows.pop(user_id, None)
+
+    def clear(self):
+        with self.lock:
+            self.rows.clear()
+
+
+user_cache = UserRowCache(
+    maxsize=getattr(settings, 'JWT_USER_CACHE_SIZE', 1024),
+    ttl=getattr(settings, 'JWT_USER_CACHE_TTL', 60),
+)
+
+
+def make_user(user_id, values):
+    """Пользователь из известных полей; остальные поля отложены.
+
+    Обращение к отложенному полю (например, email) загрузит его из базы.
+    """
+    loaded = {User._meta.pk.attname: user_id, **values}
+    field_names = [field.attname for field in User._meta.concrete_fields
+                   if field.attname in loaded]
+    return User.from_db(
+        router.db_for_read(User), field_names,
+        [loaded[name] for name in field_names],
+    )
+
+
+class StatelessJWTAuthentication(JWTAuthentication):
+    """JWT-аутентификация без запроса пользователя к базе.
+
+    Поля пользователя берутся из подписанных claims токена; для токенов
+    без них — из in-process LRU-кэша строк пользователей. Чтобы claims не
+    устаревали, деактивация, смена прав или пароля отзывает все токены
+    пользователя (api.signals.revoke_tokens).
+    """
+
+    def get_validated_token(self, raw_token):
+        validated_token = super().get_validated_token(raw_token)
+        if revocation_list.is_revoked(validated_token):
+            raise InvalidToken(_('Token is revoked'))
+        return validated_token
+
+    def get_user(self, validated_token):
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken(
+                _('Token contained no recognizable user identification'))
+
+        if all(claim in validated_token for claim in USER_CLAIMS):
+            values = {claim: validated_token[claim] for claim in USER_CLAIMS}
+        else:
+            values = user_cache.get(user_id)
+        if values is None:
+            raise AuthenticationFailed(
+                _('User not found'), code='user_not_found')
+        if not values['is_active']:
+            raise AuthenticationFailed(
+                _('User is inactive'), code='user_inactive')
+        return make_user(user_id, values)
@@ -0,0 +1,151 @@
+import hashlib
+import json
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from rest_framework import status
+from rest_framework.response import Response
+from rest_framework.utils.encoders import JSONEncoder
+
+
+def get_response_cache():
+    return caches[getattr(settings, 'RESPONSE_CACHE_ALIAS', 'default')]
+
+
+def version_key(model):
+    return f'response-version:{model._meta.label_lower}'
+
+
+def changed_key(model):
+    return f'response-changed:{model._meta.label_lower}'
+
+
+def initial_version():
+    # Версия после вытеснения из кэша не должна совпасть с прежней,
+    # иначе снова станут видны устаревшие ответы.
+    return int(time.time() * 1000)
+
+
+def get_versions(models):
+    cache = get_response_cache()
+    keys = [version_key(model) for model in models]
+    versions = cache.get_many(keys)
+    for key in keys:
+        if key not in versions:
+            cache.add(key, initial_version(), None)
+            versions[key] = cache.get(key)
+    return [versions[key] for key in keys]
+
+
+def get_last_changed(models):
+    """Время последнего изменения моделей (unix time)."""
+    cache = get_response_cache()
+    keys = [changed_key(model) for model in models]
+    changed = cache.get_many(keys)
+    for key in keys:
+        if key not in changed:
+            # Время изменения неизвестно (например, после перезапуска):
+            # считаем, что модель изменилась только что.
+            cache.add(key, time.time(), None)
+            changed[key] = cache.get(key)
+    return max(changed.values(), default=None)
+
+
+def bump_version(model):
+    cache = get_response_cache()
+    try:
+        cache.incr(version_key(model))
+    except ValueError:
+        cache.add(version_key(model), initial_version(), None)
+    cache.set(changed_key(model), time.time(), None)
+
+
+def make_etag(content):
+    return '"{}"'.format(hashlib.md5(content.encode()).hexdigest())
+
+
+def if_none_match(header, etag):
+    """Совпадает ли ETag с заголовком If-None-Match (слабое сравнение)."""
+    if not header:
+        return False
+    etag = etag.replace('W/', '', 1)
+    candidates = [value.strip() for value in header.split(',')]
+    return '*' in candidates or any(
+        candidate.replace('W/', '', 1) == etag for candidate in candidates
+    )
+
+
+def etag_matches(request, etag):
+    return if_none_match(request.META.get('HTTP_IF_NONE_MATCH'), etag)
+
+
+class ResponseVariantMixin:
+    """Общие точки расширения кэша ответов и условных запросов."""
+
+    def get_response_variant(self, request):
+        """Часть ключа и ETag для ответов, зависящих от пользователя."""
+        return None
+
+    def response_is_cacheable(self):
+        """Можно ли сохранить ответ в кэше и выдать для него валидаторы."""
+        return True
+
+
+class CachedResponseMixin(ResponseVariantMixin):
+    """Кэширует ответы list/retrieve.
+
+    Ключ строится по схеме, хосту, пути, параметрам запроса, классу
+    аутентификации и версиям моделей из `cache_models`; версии
+    увеличиваются сигналами при изменении моделей, поэтому устаревшие
+    записи просто перестают читаться.
+    Ответ несёт ETag, и при совпадении If-None-Match возвращается 304.
+    """
+    cache_models = ()
+
+    def list(self, request, *args, **kwargs):
+        return self.cached_response(super().list, request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.cached_response(
+            super().retrieve, request, *args, **kwargs)
+
+    def get_cache_key(self, request):
+        authenticator = request.successful_authenticator
+        # Ответ содержит абсолютные адреса изображений, поэтому зависит
+        # от схемы и хоста.
+        parts = [
+            request.scheme,
+            request.get_host(),
+            request.path,
+            sorted(request.query_params.lists()),
+            type(authenticator).__name__ if authenticator else 'anonymous',
+            request.accepted_renderer.format,
+            get_versions(self.cache_models),
+            self.get_response_variant(request),
+        ]
+        digest = hashlib.md5(repr(parts).encode()).hexdigest()
+        return f'response:{digest}'
+
+    def cached_response(self, handler, request, *args, **kwargs):
+        cache = get_response_cache()
+        key = self.get_cache_key(request)
+        entry = cache.get(key)
+        if entry is None:
+            response = handler(request, *args, **kwargs)
+            if (response.status_code != status.HTTP_200_OK
+                    or not self.response_is_cacheable()):
+                return response
+            content = json.dumps(response.data, cls=JSONEncoder)
+            entry = {
+                'etag': make_etag(content),
+                'data': json.loads(content),
+                'headers': dict(response.items()),
+            }
+            cache.set(key, entry, getattr(
+                settings, 'RESPONSE_CACHE_TIMEOUT', 300))
+        if etag_matches(request, entry['etag']):
+            return Response(status=status.HTTP_304_NOT_MODIFIED,
+                            headers={'ETag': entry['etag']})
+        return Response(entry['data'], headers={
+            **entry['headers'], 'ETag': entry['etag']})
@@ -0,0 +1,62 @@
+import hashlib
+
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+
+from .cache import ResponseVariantMixin, get_last_changed, get_versions
+
+
+def make_weak_etag(*parts):
+    digest = hashlib.md5(repr(parts).encode()).hexdigest()
+    return f'W/"{digest}"'
+
+
+class ConditionalGetMixin(ResponseVariantMixin):
+    """ETag и Last-Modified для list/retrieve без сериализации ответа.
+
+    Для объекта валидаторы берутся одним запросом из колонок
+    `validator_fields` (первая — время изменения записи, `version` меняется
+    при каждой записи), для списка — из версий и времени изменения моделей
+    `cache_models`.
+    """
+    validator_fields = ('updated', 'version')
+    cache_models = ()
+
+    def list(self, request, *args, **kwargs):
+        if not self.response_is_cacheable():
+            return super().list(request, *args, **kwargs)
+        etag = make_weak_etag(
+            request.build_absolute_uri(), get_versions(self.cache_models),
+            self.get_response_variant(request))
+        last_modified = get_last_changed(self.cache_models)
+        return self.conditional_response(
+            etag, last_modified, super().list, request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        if not self.response_is_cacheable():
+            return super().retrieve(request, *args, **kwargs)
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        values = (
+            self.filter_queryset(self.get_queryset())
+            .filter(**{self.lookup_field: kwargs[lookup_url_kwarg]})
+            .values_list(*self.validator_fields).first()
+        )
+        if values is None:
+            return super().retrieve(request, *args, **kwargs)
+        etag = make_weak_etag(
+            request.build_absolute_uri(request.path), values)
+        last_modified = values[0].timestamp()
+        return self.conditional_response(
+            etag, last_modified, super().retrieve, request, *args, **kwargs)
+
+    def conditional_response(self, etag, last_modified, handler, request,
+                             *args, **kwargs):
+        last_modified = int(last_modified) if last_modified else None
+        not_modified = get_conditional_response(
+            request, etag=etag, last_modified=last_modified)
+        response = not_modified or handler(request, *args, **kwargs)
+        if response.status_code in (200, 304):
+            response['ETag'] = etag
+            if last_modified:
+                response['Last-Modified'] = http_date(last_modified)
+        return response
@@ -0,0 +1,45 @@
+import hashlib
+
+from django.conf import settings
+from django.core.cache import cache
+
+
+def table_count_key(model):
+    return f'count:{model._meta.label_lower}'
+
+
+def query_count_key(queryset):
+    sql, params = queryset.query.sql_with_params()
+    digest = hashlib.md5(f'{sql}:{params!r}'.encode()).hexdigest()
+    return f'{table_count_key(queryset.model)}:{digest}'
+
+
+def cached_count(queryset):
+    """Количество строк из кэша.
+
+    Счётчик всей таблицы поддерживается сигналами при создании и удалении
+    записей, счётчики отфильтрованных выборок живут недолго.
+    """
+    if queryset.query.where:
+        key = query_count_key(queryset)
+        timeout = getattr(settings, 'COUNT_CACHE_TIMEOUT', 30)
+    else:
+        key = table_count_key(queryset.model)
+        timeout = getattr(settings, 'TABLE_COUNT_CACHE_TIMEOUT', 60 * 60)
+    count = cache.get(key)
+    if count is None:
+        count = queryset.count()
+        cache.set(key, count, timeout)
+    return count
+
+
+def adjust_table_count(model, delta):
+    key = table_count_key(model)
+    try:
+        if delta > 0:
+            cache.incr(key, delta)
+        else:
+            cache.decr(key, -delta)
+    except ValueError:
+        # Счётчика ещё нет в кэше: его посчитает первый запрос.
+        pass
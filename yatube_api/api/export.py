@@ -0,0 +1,54 @@
+import json
+
+from posts.models import Comment, Follow, Group, Post
+from rest_framework.renderers import BaseRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+from .mixins import derive_query_shape
+from .serializers import (
+    CommentSerializer, FollowSerializer, GroupSerializer, PostSerializer,
+)
+
+EXPORT_CHUNK_SIZE = 2000
+
+EXPORTS = {
+    'posts': (Post, PostSerializer),
+    'comments': (Comment, CommentSerializer),
+    'groups': (Group, GroupSerializer),
+    'follow': (Follow, FollowSerializer),
+}
+
+
+def to_ndjson_line(data):
+    return json.dumps(data, cls=JSONEncoder, ensure_ascii=False) + '\n'
+
+
+def export_queryset(name):
+    model, serializer_class = EXPORTS[name]
+    select_related, _, only = derive_query_shape(serializer_class(), model)
+    queryset = model.objects.select_related(*select_related).order_by('pk')
+    if only is not None:
+        queryset = queryset.only(*only)
+    return queryset
+
+
+def export_ndjson(name, context=None, chunk_size=EXPORT_CHUNK_SIZE):
+    """Построчно сериализует таблицу в NDJSON.
+
+    Строки читаются через iterator(), поэтому в памяти одновременно
+    находится не больше chunk_size объектов.
+    """
+    serializer = EXPORTS[name][1](context=context or {})
+    for instance in export_queryset(name).iterator(chunk_size=chunk_size):
+        yield to_ndjson_line(serializer.to_representation(instance))
+
+
+class NDJSONRenderer(BaseRenderer):
+    media_type = 'application/x-ndjson'
+    format = 'ndjson'
+    charset = 'utf-8'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        return to_ndjson_line(data).encode(self.charset)
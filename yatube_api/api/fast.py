@@ -0,0 +1,145 @@
+from django.conf import settings
+from django.core.exceptions import FieldDoesNotExist
+from django.core.files.storage import FileSystemStorage
+from django.utils.encoding import filepath_to_uri
+from rest_framework import serializers
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+
+
+def resolve_model_field(model, attrs):
+    """Поле модели по пути source или None, если путь не ведёт к колонке."""
+    model_field = None
+    for attr in attrs:
+        if model_field is not None:
+            if not model_field.is_relation:
+                return None
+            model = model_field.related_model
+        try:
+            model_field = model._meta.get_field(attr)
+        except FieldDoesNotExist:
+            return None
+        if model_field.many_to_many or model_field.one_to_many:
+            return None
+    return model_field
+
+
+def file_url_converter(field, model_field, request):
+    if not getattr(field, 'use_url', api_settings.UPLOADED_FILES_USE_URL):
+        return lambda name: name or None
+    storage = model_field.storage
+    prefix = None
+    if (request is not None and isinstance(storage, FileSystemStorage)
+            and storage.base_url.startswith('/')):
+        # Абсолютный адрес каталога строится один раз на запрос.
+        prefix = request.build_absolute_uri(storage.base_url)
+
+    def convert(name):
+        if not name:
+            return None
+        if prefix is not None:
+            return prefix + filepath_to_uri(name).lstrip('/')
+        url = storage.url(name)
+        return request.build_absolute_uri(url) if request else url
+    return convert
+
+
+def value_converter(field):
+    def convert(value):
+        return None if value is None else field.to_representation(value)
+    return convert
+
+
+def field_plan(field, model, request, annotations=()):
+    """Колонка для values() и функция, превращающая её значение в ответ."""
+    if field.source == '*' or isinstance(
+            field, (serializers.ManyRelatedField, serializers.Serializer)):
+        return None
+    if field.source in annotations:
+        return field.source, value_converter(field)
+    attrs = list(field.source_attrs)
+    if isinstance(field, serializers.SlugRelatedField):
+        attrs.append(field.slug_field)
+    model_field = resolve_model_field(model, attrs)
+    if model_field is None:
+        return None
+    lookup = '__'.join(attrs)
+    if isinstance(field, serializers.RelatedField):
+        if not isinstance(field, (serializers.SlugRelatedField,
+                                  serializers.PrimaryKeyRelatedField)):
+            return None
+        return lookup, None
+    if model_field.is_relation:
+        return None
+    if isinstance(field, serializers.FileField):
+        return lookup, file_url_converter(field, model_field, request)
+    return lookup, value_converter(field)
+
+
+class FastListPlan:
+    """Сериализация строк values() с тем же результатом, что у сериализатора.
+
+    Каждое поле сериализатора сводится к одной колонке (имя автора
+    берётся JOIN-ом в том же запросе) и функции преобразования значения.
+    Поля с source из annotations берутся из одноимённых аннотаций.
+    """
+
+    def __init__(self, serializer, model, request=None, annotations=()):
+        self.names, self.lookups, self.converters = [], [], []
+        for name, field in serializer.fields.items():
+            if field.write_only:
+                continue
+            plan = field_plan(field, model, request, annotations)
+            if plan is None:
+                raise ValueError(f'Поле {name} не поддерживается.')
+            self.names.append(name)
+            self.lookups.append(plan[0])
+            self.converters.append(plan[1])
+
+    @classmethod
+    def build(cls, serializer, model, request=None, annotations=()):
+        try:
+            return cls(serializer, model, request, annotations)
+        except ValueError:
+            return None
+
+    def represent(self, rows):
+        fields = list(zip(self.names, self.lookups, self.converters))
+        return [
+            {name: convert(row[lookup]) if convert else row[lookup]
+             for name, lookup, convert in fields}
+            for row in rows
+        ]
+
+
+class FastListMixin:
+    """Быстрая сериализация списков через values() для ListModelMixin.
+
+    Если какое-то поле сериализатора нельзя получить колонкой, список
+    отдаётся обычным сериализатором.
+    """
+
+    def get_fast_list_plan(self):
+        if not getattr(settings, 'FAST_LIST_SERIALIZATION', True):
+            return None
+        serializer = self.get_serializer()
+        return FastListPlan.build(
+            serializer, serializer.Meta.model, self.request,
+            self.get_list_annotations())
+
+    def get_list_annotations(self):
+        """Имена аннотаций списка, которые сериализатор отдаёт как поля."""
+        return ()
+
+    def list(self, request, *args, **kwargs):
+        plan = self.get_fast_list_plan()
+        if plan is None:
+            return super().list(request, *args, **kwargs)
+        ordering = getattr(self.paginator, 'ordering', ())
+        lookups = set(plan.lookups) | {
+            name.lstrip('-') for name in ordering}
+        rows = self.filter_queryset(self.get_queryset()).values(*lookups)
+        page = self.paginate_queryset(rows)
+        if page is not None:
+            return self.get_paginated_response(plan.represent(page))
+        return Response(plan.represent(rows))
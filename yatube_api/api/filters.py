@@ -0,0 +1,55 @@
+from django.utils.dateparse import parse_date, parse_datetime
+from django.utils.timezone import is_naive, make_aware
+from posts.search import search, search_supported
+from rest_framework.exceptions import ValidationError
+from rest_framework.filters import BaseFilterBackend
+
+
+def parse_since(value):
+    moment = parse_datetime(value)
+    if moment is None:
+        day = parse_date(value)
+        if day is not None:
+            moment = parse_datetime(f'{day.isoformat()}T00:00:00')
+    if moment is None:
+        raise ValidationError(
+            {'since': 'Ожидается дата или дата и время в формате ISO 8601.'})
+    return make_aware(moment) if is_naive(moment) else moment
+
+
+class PostFilterBackend(BaseFilterBackend):
+    """Фильтры списка публикаций: ?group=<slug>&author=<username>&since=<ts>.
+
+    Каждому фильтру соответствует составной индекс, начинающийся
+    с этой колонки и продолжающийся датой публикации.
+    """
+
+    def filter_queryset(self, request, queryset, view):
+        params = request.query_params
+        if params.get('group'):
+            queryset = queryset.filter(group__slug=params['group'])
+        if params.get('author'):
+            queryset = queryset.filter(author__username=params['author'])
+        if params.get('since'):
+            queryset = queryset.filter(
+                pub_date__gte=parse_since(params['since']))
+        return queryset
+
+
+class FullTextSearchFilter(BaseFilterBackend):
+    """?search= по полнотекстовому индексу, от более релевантных."""
+
+    search_param = 'search'
+
+    @classmethod
+    def get_search_term(cls, request):
+        return request.query_params.get(cls.search_param, '').strip()
+
+    def filter_queryset(self, request, queryset, view):
+        term = self.get_search_term(request)
+        if not term:
+            return queryset
+        if not search_supported(queryset):
+            raise ValidationError(
+                {self.search_param: 'Полнотекстовый поиск недоступен.'})
+        return search(queryset, term)
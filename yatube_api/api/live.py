@@ -0,0 +1,109 @@
+import asyncio
+import json
+import threading
+from collections import defaultdict
+
+from django.conf import settings
+from django.db import connections, transaction
+from posts.models import Comment, Post
+
+from .serializers import CommentSerializer
+
+
+class Subscription:
+
+    def __init__(self, post_id, loop, maxsize):
+        self.post_id = post_id
+        self.loop = loop
+        self.queue = asyncio.Queue(maxsize)
+        self.overflowed = False
+
+    def deliver(self, event):
+        # Вызывается в цикле событий подписчика.
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            # Клиент не успевает читать: поток закрывается, и клиент
+            # переподключится с Last-Event-ID, дочитав пропущенное из БД.
+            self.overflowed = True
+
+
+class CommentHub:
+    """In-process pub/sub новых комментариев по публикациям.
+
+    Публикация вызывается из любого потока после фиксации транзакции;
+    события передаются в цикл событий каждого подписчика. Подписчики
+    видят комментарии, созданные в этом же процессе.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.subscriptions = defaultdict(set)
+
+    def subscribe(self, post_id):
+        subscription = Subscription(
+            post_id, asyncio.get_running_loop(),
+            getattr(settings, 'LIVE_COMMENTS_QUEUE_SIZE', 1000))
+        with self.lock:
+            self.subscriptions[post_id].add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self.lock:
+            subscribers = self.subscriptions.get(subscription.post_id)
+            if subscribers is not None:
+                subscribers.discard(subscription)
+                if not subscribers:
+                    del self.subscriptions[subscription.post_id]
+
+    def has_subscribers(self, post_id):
+        return post_id in self.subscriptions
+
+    def publish(self, post_id, event):
+        with self.lock:
+            subscribers = list(self.subscriptions.get(post_id, ()))
+        for subscription in subscribers:
+            try:
+                subscription.loop.call_soon_threadsafe(
+                    subscription.deliver, event)
+            except RuntimeError:
+                # Цикл событий подписчика уже закрыт.
+                self.unsubscribe(subscription)
+
+
+hub = CommentHub()
+
+
+def comment_event(data):
+    return data['id'], json.dumps(data, ensure_ascii=False)
+
+
+def publish_on_commit(comments):
+    """Отправляет подписчикам новые комментарии после фиксации транзакции."""
+    for comment in comments:
+        if hub.has_subscribers(comment.post_id):
+            event = comment_event(CommentSerializer(comment).data)
+            transaction.on_commit(
+                lambda post_id=comment.post_id, event=event:
+                hub.publish(post_id, event))
+
+
+def backfill(post_id, last_id, limit):
+    """Комментарии после last_id; None, если публикации нет."""
+    try:
+        if not Post.objects.filter(pk=post_id).exists():
+            return None
+        if last_id is None:
+            return []
+        comments = (
+            Comment.objects.filter(post_id=post_id, id__gt=last_id)
+            .select_related('author').order_by('id')[:limit]
+        )
+        return [comment_event(data) for data in
+                CommentSerializer(comments, many=True).data]
+    finally:
+        connections.close_all()
+
+
+def format_event(event_id, data):
+    return f'id: {event_id}\nevent: comment\ndata: {data}\n\n'.encode()
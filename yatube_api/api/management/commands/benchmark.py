@@ -0,0 +1,322 @@
+import asyncio
+import os
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from api.asgi import AsyncReadApplication, build_environ
+from api.fast import FastListPlan
+from api.serializers import PostSerializer
+from api.throttling import TokenBucketThrottle, make_store
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import AnonymousUser
+from django.core.management.base import BaseCommand
+from django.db import (
+    DEFAULT_DB_ALIAS, OperationalError, connections, transaction,
+)
+from django.db.models import F
+from django.test import override_settings
+from posts.models import Group, Post
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+User = get_user_model()
+
+
+def best_of(func, repeat):
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - started)
+    return min(timings)
+
+
+def bench_serializers(command, options):
+    """PostSerializer(many=True) против FastListPlan на страницах постов."""
+    sizes = options['sizes'] or [100, 1000]
+    author = User.objects.create_user(username='benchmark-author')
+    group = Group.objects.create(
+        title='Benchmark', slug='benchmark', description='')
+    Post.objects.bulk_create(
+        Post(text=f'Публикация {number}', author=author, group=group,
+             image=f'posts/{number}.jpg' if number % 2 else None)
+        for number in range(max(sizes))
+    )
+    request = APIRequestFactory().get(
+        '/api/v1/posts/', HTTP_HOST='localhost')
+    context = {'request': request}
+    plan = FastListPlan(PostSerializer(context=context), Post, request)
+    queryset = Post.objects.select_related(
+        'author', 'author__stats').order_by('id')
+
+    command.stdout.write(f'{"size":>6} {"serializer":>12} {"fast":>10} '
+                         f'{"speedup":>8}')
+    for size in sizes:
+        def regular():
+            return PostSerializer(
+                queryset[:size], many=True, context=context).data
+
+        def fast():
+            return plan.represent(
+                queryset.values(*plan.lookups)[:size])
+
+        assert list(map(dict, regular())) == fast()
+        regular_time = best_of(regular, options['repeat'])
+        fast_time = best_of(fast, options['repeat'])
+        command.stdout.write(
+            f'{size:>6} {regular_time * 1000:>10.2f}ms '
+            f'{fast_time * 1000:>8.2f}ms {regular_time / fast_time:>7.1f}x')
+
+
+def http_scope(path):
+    path, _, query = path.partition('?')
+    return {
+        'type': 'http', 'method': 'GET', 'path': path,
+        'query_string': query.encode(), 'headers': [(b'host', b'localhost')],
+    }
+
+
+def asgi_get(application, path):
+    async def receive():
+        return {'type': 'http.request', 'body': b''}
+
+    async def send(message):
+        pass
+
+    return application(http_scope(path), receive, send)
+
+
+def bench_asgi(command, options):
+    """Чтение через WSGI в пуле потоков против AsyncReadApplication.
+
+    Данные создаются вне транзакции (иначе потоки обработчиков их не
+    увидят) и удаляются после замера.
+    """
+    concurrency, total = options['concurrency'], options['requests']
+    author = User.objects.create_user(username='benchmark-author')
+    group = Group.objects.create(
+        title='Benchmark', slug='benchmark', description='')
+    try:
+        posts = [Post.objects.create(text=f'Публикация {number}',
+                                     author=author, group=group)
+                 for number in range(100)]
+        application = AsyncReadApplication()
+        paths = ['/api/v1/posts/?limit=20', f'/api/v1/posts/{posts[0].id}/',
+                 f'/api/v1/posts/{posts[0].id}/comments/', '/api/v1/groups/']
+
+        def wsgi_run(path):
+            with ThreadPoolExecutor(concurrency) as executor:
+                list(executor.map(
+                    lambda _: application.render(
+                        build_environ(http_scope(path), b'')),
+                    range(total)))
+
+        def asgi_run(path):
+            async def run():
+                semaphore = asyncio.Semaphore(concurrency)
+
+                async def one():
+                    async with semaphore:
+                        await asgi_get(application, path)
+                await asyncio.gather(*(one() for _ in range(total)))
+            asyncio.run(run())
+
+        command.stdout.write(f'{"path":<40} {"wsgi":>10} {"asgi":>10}')
+        for path in paths:
+            wsgi_time = best_of(lambda: wsgi_run(path), options['repeat'])
+            asgi_time = best_of(lambda: asgi_run(path), options['repeat'])
+            command.stdout.write(
+                f'{path:<40} {total / wsgi_time:>6.0f} r/s '
+                f'{total / asgi_time:>6.0f} r/s')
+    finally:
+        author.delete()
+        group.delete()
+
+
+bench_asgi.transactional = False
+
+
+def bench_throttle(command, options):
+    """Накладные расходы TokenBucketThrottle на запрос для каждого хранилища.
+
+    Частота выбрана так, чтобы запросы не упирались в лимит: замеряется
+    только проверка.
+    """
+    total = options['requests']
+
+    class View:
+        throttle_scope, action = 'benchmark', 'create'
+
+    request = Request(APIRequestFactory().post(
+        '/api/v1/posts/', REMOTE_ADDR='127.0.0.1'))
+    request.user = AnonymousUser()
+    with override_settings(REST_FRAMEWORK={
+            'DEFAULT_THROTTLE_RATES': {'benchmark': f'{total * 100}/s'}}):
+        command.stdout.write(f'{"store":<8} {"per request":>12}')
+        for name in ('local', 'cache'):
+            with override_settings(THROTTLE_STORE=name):
+                TokenBucketThrottle.store = make_store()
+                throttle, view = TokenBucketThrottle(), View()
+
+                def run():
+                    for _ in range(total):
+                        assert throttle.allow_request(request, view)
+                elapsed = best_of(run, options['repeat'])
+                command.stdout.write(
+                    f'{name:<8} {elapsed / total * 1e6:>10.2f}us')
+    TokenBucketThrottle.store = None
+
+
+bench_throttle.transactional = False
+
+
+class SqliteWriteLoad:
+    """Параллельные записи через ORM в файл SQLite при постоянном чтении.
+
+    Каждая запись, как создание публикации в приложении, — transaction.atomic
+    с чтением перед записью: SELECT счётчика группы, INSERT публикации и
+    UPDATE счётчика. Со стандартным движком транзакция начинается как
+    читающая, и при переходе к записи SQLite может сразу вернуть
+    «database is locked», не дожидаясь busy_timeout.
+    """
+    readers = 2
+
+    def __init__(self, alias, reconnect):
+        self.alias, self.reconnect = alias, reconnect
+        self.counts = {'ok': 0, 'locked': 0}
+        self.lock = threading.Lock()
+        self.done = threading.Event()
+
+    def setup(self):
+        with connections[self.alias].schema_editor() as editor:
+            for model in (User, Group, Post):
+                editor.create_model(model)
+        # bulk_create не отправляет сигналы: их обработчики писали бы
+        # в основную базу.
+        User.objects.using(self.alias).bulk_create(
+            [User(username='benchmark-author')])
+        Group.objects.using(self.alias).bulk_create(
+            [Group(title='Benchmark', slug='benchmark', description='')])
+        self.author_id = User.objects.using(self.alias).get().pk
+        self.group_id = Group.objects.using(self.alias).get().pk
+
+    def write_one(self, number):
+        groups = Group.objects.using(self.alias).filter(pk=self.group_id)
+        try:
+            with transaction.atomic(using=self.alias):
+                groups.values_list('posts_count', flat=True).get()
+                Post.objects.using(self.alias).bulk_create([Post(
+                    text=f'Публикация {number}', author_id=self.author_id,
+                    group_id=self.group_id)])
+                groups.update(posts_count=F('posts_count') + 1)
+            return 'ok'
+        except OperationalError:
+            return 'locked'
+
+    def write(self, count):
+        try:
+            for number in range(count):
+                if self.reconnect:
+                    connections[self.alias].close()
+                result = self.write_one(number)
+                with self.lock:
+                    self.counts[result] += 1
+        finally:
+            connections[self.alias].close()
+
+    def read(self):
+        try:
+            while not self.done.is_set():
+                try:
+                    list(Post.objects.using(self.alias).order_by('-id')[:20])
+                except OperationalError:
+                    pass
+        finally:
+            connections[self.alias].close()
+
+    def run(self, writers, total):
+        """(Успешных записей в секунду, доля ошибок блокировки)."""
+        self.setup()
+        readers = [threading.Thread(target=self.read)
+                   for _ in range(self.readers)]
+        for reader in readers:
+            reader.start()
+        started = time.perf_counter()
+        with ThreadPoolExecutor(writers) as executor:
+            list(executor.map(self.write, [total // writers] * writers))
+        elapsed = time.perf_counter() - started
+        self.done.set()
+        for reader in readers:
+            reader.join()
+        attempts = self.counts['ok'] + self.counts['locked']
+        return self.counts['ok'] / elapsed, self.counts['locked'] / attempts
+
+
+def bench_sqlite(command, options):
+    """Запись в SQLite с настройками по умолчанию и с настройками проекта.
+
+    По умолчанию: стандартный движок Django, журнал DELETE,
+    synchronous=FULL, ожидание блокировки 5 с (как у sqlite3) и новое
+    соединение на каждый запрос. Настройки проекта: движок из DATABASES
+    (BEGIN IMMEDIATE) и SQLITE_PRAGMAS. Каждый профиль пишет в свою
+    временную базу под отдельным псевдонимом.
+    """
+    profiles = (
+        ('default', 'django.db.backends.sqlite3', {}, True),
+        ('tuned', connections.databases[DEFAULT_DB_ALIAS]['ENGINE'],
+         getattr(settings, 'SQLITE_PRAGMAS', {}), False),
+    )
+    alias = 'benchmark-sqlite'
+    command.stdout.write(f'{"profile":<8} {"writes":>10} {"locked":>8}')
+    for name, engine, pragmas, reconnect in profiles:
+        with tempfile.TemporaryDirectory() as directory, \
+                override_settings(SQLITE_PRAGMAS=pragmas):
+            connections.databases[alias] = {
+                **connections.databases[DEFAULT_DB_ALIAS],
+                'ENGINE': engine,
+                'NAME': os.path.join(directory, 'benchmark.sqlite3')}
+            try:
+                load = SqliteWriteLoad(alias, reconnect)
+                rate, errors = load.run(
+                    options['concurrency'], options['requests'])
+            finally:
+                connections[alias].close()
+                del connections[alias]
+                del connections.databases[alias]
+        command.stdout.write(
+            f'{name:<8} {rate:>6.0f} w/s {errors * 100:>7.2f}%')
+
+
+bench_sqlite.transactional = False
+
+
+SUITES = {
+    'asgi': bench_asgi,
+    'serializers': bench_serializers,
+    'sqlite': bench_sqlite,
+    'throttle': bench_throttle,
+}
+
+
+class Command(BaseCommand):
+    help = ('Замеры производительности. Тестовые данные создаются '
+            'в транзакции, которая затем откатывается (кроме asgi, '
+            'sqlite и throttle).')
+
+    def add_arguments(self, parser):
+        parser.add_argument('suite', choices=sorted(SUITES))
+        parser.add_argument('--sizes', type=int, nargs='*')
+        parser.add_argument('--repeat', type=int, default=5)
+        parser.add_argument('--concurrency', type=int, default=16)
+        parser.add_argument('--requests', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        suite = SUITES[options['suite']]
+        if not getattr(suite, 'transactional', True):
+            return suite(self, options)
+        with transaction.atomic():
+            suite(self, options)
+            transaction.set_rollback(True)
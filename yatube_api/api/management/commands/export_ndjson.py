@@ -0,0 +1,23 @@
+from api.export import EXPORT_CHUNK_SIZE, EXPORTS, export_ndjson
+from django.core.management.base import BaseCommand
+
+
+class Command(BaseCommand):
+    help = 'Выгружает публикации или комментарии в формате NDJSON'
+
+    def add_arguments(self, parser):
+        parser.add_argument('name', choices=sorted(EXPORTS))
+        parser.add_argument(
+            '--output', help='Файл для выгрузки (по умолчанию stdout)')
+        parser.add_argument(
+            '--chunk-size', type=int, default=EXPORT_CHUNK_SIZE)
+
+    def handle(self, *args, **options):
+        lines = export_ndjson(
+            options['name'], chunk_size=options['chunk_size'])
+        if not options['output']:
+            for line in lines:
+                self.stdout.write(line, ending='')
+            return
+        with open(options['output'], 'w', encoding='utf-8') as output:
+            output.writelines(lines)
@@ -0,0 +1,22 @@
+import time
+
+from api.replicas import get_replicas, replicate
+from django.core.management.base import BaseCommand
+
+
+class Command(BaseCommand):
+    help = ('Имитация репликации для локальной проверки: раз в --lag секунд '
+            'копирует базу default в реплики SQLite из DATABASE_REPLICAS.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--lag', type=float, default=2.0)
+        parser.add_argument('--once', action='store_true',
+                            help='Скопировать один раз и выйти.')
+
+    def handle(self, *args, **options):
+        while True:
+            for alias in get_replicas():
+                replicate(alias)
+            if options['once']:
+                return
+            time.sleep(options['lag'])
@@ -0,0 +1,247 @@
+from django.core.exceptions import FieldDoesNotExist
+from django.db.models import BooleanField, Case, Value, When
+from rest_framework import serializers, status
+from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
+from rest_framework.generics import get_object_or_404
+from rest_framework.response import Response
+
+from .filters import FullTextSearchFilter
+
+
+def _source_path(field):
+    attrs = list(field.source_attrs)
+    if isinstance(field, serializers.SlugRelatedField):
+        attrs.append(field.slug_field)
+    elif isinstance(field, serializers.RelatedField):
+        attrs.append('pk')
+    return attrs
+
+
+def _resolve_path(model, attrs, shape):
+    """Раскладывает путь source по select_related/prefetch_related/only.
+
+    Возвращает False, если путь не удалось сопоставить с колонкой.
+    """
+    select_related, prefetch_related, only = shape
+    path, current = [], model
+    for position, attr in enumerate(attrs):
+        if attr == 'pk':
+            return True
+        try:
+            model_field = current._meta.get_field(attr)
+        except FieldDoesNotExist:
+            return False
+        if model_field.many_to_many or model_field.one_to_many:
+            prefetch_related.add('__'.join(path + [attr]))
+            return True
+        if not model_field.is_relation:
+            only.add('__'.join(path + [attr]))
+            continue
+        following = attrs[position + 1:]
+        if not following:
+            return False
+        if following[0] == 'pk':
+            only.add('__'.join(path + [attr]))
+            return True
+        path.append(attr)
+        select_related.add('__'.join(path))
+        current = model_field.related_model
+    return True
+
+
+def derive_query_shape(serializer, model):
+    """Собирает select_related/prefetch_related/only по полям сериализатора.
+
+    Если какое-то поле нельзя сопоставить с колонкой модели
+    (source='*', свойство, аннотация), only не применяется.
+    """
+    shape = (set(), set(), set())
+    restrict = True
+    for field in serializer.fields.values():
+        if field.source == '*':
+            restrict = False
+        elif isinstance(field, serializers.ManyRelatedField):
+            shape[1].add('__'.join(field.source_attrs))
+        elif not _resolve_path(model, _source_path(field), shape):
+            restrict = False
+    select_related, prefetch_related, only = shape
+    return (
+        tuple(sorted(select_related)),
+        tuple(sorted(prefetch_related)),
+        tuple(sorted(only)) if restrict else None,
+    )
+
+
+class QueryShapingMixin:
+    """Подгружает связанные объекты, нужные сериализатору, одним запросом.
+
+    По умолчанию форма запроса выводится из полей сериализатора;
+    вьюсет может задать её явно через атрибуты ниже.
+    """
+    select_related_fields = None
+    prefetch_related_fields = None
+    only_fields = None
+
+    _query_shapes = {}
+
+    def get_query_shape(self):
+        serializer_class = self.get_serializer_class()
+        key = (type(self), serializer_class)
+        if key not in self._query_shapes:
+            model = serializer_class.Meta.model
+            derived = derive_query_shape(serializer_class(), model)
+            declared = (
+                self.select_related_fields,
+                self.prefetch_related_fields,
+                self.only_fields,
+            )
+            self._query_shapes[key] = tuple(
+                derived_value if declared_value is None else declared_value
+                for derived_value, declared_value in zip(derived, declared)
+            )
+        return self._query_shapes[key]
+
+    def shape_queryset(self, queryset):
+        select_related, prefetch_related, only = self.get_query_shape()
+        if select_related:
+            queryset = queryset.select_related(*select_related)
+        if prefetch_related:
+            queryset = queryset.prefetch_related(*prefetch_related)
+        if only is not None:
+            queryset = queryset.only(*only)
+        return queryset
+
+    def filter_queryset(self, queryset):
+        return super().filter_queryset(self.shape_queryset(queryset))
+
+
+class BulkModelMixin:
+    """Массовое создание (POST) и изменение (PATCH) объектов по `bulk/`.
+
+    Тело запроса — список объектов; для изменения у каждого указывается
+    `id`. Список проверяется целиком, и при ошибках возвращаются ошибки
+    по каждому элементу, а сохранение идёт одной транзакцией. Лимит
+    частоты расходуется по токену на объект.
+    """
+    bulk_max_items = 1000
+
+    def get_throttle_cost(self, request):
+        if self.action == 'bulk' and isinstance(request.data, list):
+            return max(len(request.data), 1)
+        return 1
+
+    @action(detail=False, methods=['post', 'patch'], url_path='bulk')
+    def bulk(self, request, *args, **kwargs):
+        if not isinstance(request.data, list):
+            raise ValidationError('Ожидается список объектов.')
+        if len(request.data) > self.bulk_max_items:
+            raise ValidationError(
+                f'Не больше {self.bulk_max_items} объектов за запрос.')
+        if request.method == 'POST':
+            return self.bulk_create(request)
+        return self.bulk_update(request)
+
+    def bulk_create(self, request):
+        serializer = self.get_serializer(data=request.data, many=True)
+        serializer.is_valid(raise_exception=True)
+        self.perform_create(serializer)
+        return Response(serializer.data, status=status.HTTP_201_CREATED)
+
+    def bulk_update(self, request):
+        # bool — подкласс int, но true не должно означать объект с id=1.
+        ids = [item.get('id') if isinstance(item, dict) else None
+               for item in request.data]
+        ids = [pk if isinstance(pk, int) and not isinstance(pk, bool)
+               else None for pk in ids]
+        found = self.get_bulk_queryset().in_bulk(
+            [pk for pk in ids if pk is not None])
+        errors = [{} if pk in found else {'id': ['Объект не найден.']}
+                  for pk in ids]
+        if any(errors):
+            raise ValidationError(errors)
+        instances = [found[pk] for pk in ids]
+        for instance in instances:
+            self.check_object_permissions(request, instance)
+        serializer = self.get_serializer(
+            instances, data=request.data, many=True, partial=True)
+        serializer.is_valid(raise_exception=True)
+        self.perform_update(serializer)
+        return Response(serializer.data)
+
+    def get_bulk_queryset(self):
+        return self.shape_queryset(self.get_queryset())
+
+
+class SearchResultsMixin:
+    """Для списка с ?search= отдаёт релевантность и подсветку совпадений."""
+    search_serializer_class = None
+
+    def get_serializer_class(self):
+        if (self.action == 'list' and self.search_serializer_class
+                and FullTextSearchFilter.get_search_term(self.request)):
+            return self.search_serializer_class
+        return super().get_serializer_class()
+
+
+class NestedParentMixin:
+    """Родительский объект вложенного маршрута, один раз за запрос.
+
+    parent_model ищется по полю parent_lookup_field со значением из
+    параметра URL parent_lookup_kwarg; если его нет — 404. Загружается
+    только первичный ключ, остальные поля подгрузятся при обращении.
+    """
+    parent_model = None
+    parent_lookup_kwarg = None
+    parent_lookup_field = 'pk'
+
+    def get_parent(self):
+        if not hasattr(self, '_parent'):
+            self._parent = get_object_or_404(
+                self.parent_model.objects.only('pk'),
+                **{self.parent_lookup_field:
+                   self.kwargs.get(self.parent_lookup_kwarg)})
+        return self._parent
+
+
+class CanEditMixin:
+    """Поле can_edit в элементах списка по запросу `?can_edit=1`.
+
+    Может ли текущий пользователь изменять объект, вычисляется для всей
+    страницы аннотацией в том же запросе — по author_id, как в
+    IsAuthorOrReadOnly.
+    """
+    can_edit_query_param = 'can_edit'
+
+    def can_edit_requested(self):
+        return self.action == 'list' and self.request.query_params.get(
+            self.can_edit_query_param) in ('1', 'true')
+
+    def get_serializer(self, *args, **kwargs):
+        serializer = super().get_serializer(*args, **kwargs)
+        if self.can_edit_requested():
+            child = getattr(serializer, 'child', serializer)
+            child.fields['can_edit'] = serializers.BooleanField(
+                read_only=True)
+        return serializer
+
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+        if not self.can_edit_requested():
+            return queryset
+        user = self.request.user
+        if not user.is_authenticated:
+            return queryset.annotate(can_edit=Value(False, BooleanField()))
+        return queryset.annotate(can_edit=Case(
+            When(author_id=user.pk, then=Value(True)),
+            default=Value(False), output_field=BooleanField()))
+
+    def get_list_annotations(self):
+        if self.can_edit_requested():
+            return (*super().get_list_annotations(), 'can_edit')
+        return super().get_list_annotations()
+
+    def get_response_variant(self, request):
+        if self.can_edit_requested():
+            return request.user.pk
+        return super().get_response_variant(request)
@@ -0,0 +1,35 @@
+from django.contrib.auth import get_user_model
+from django.db import models
+
+User = get_user_model()
+
+
+class RevokedToken(models.Model):
+
+    jti = models.CharField('Идентификатор токена', max_length=255,
+                           unique=True)
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='revoked_tokens',
+        verbose_name='Пользователь'
+    )
+    expires_at = models.DateTimeField('Истекает', db_index=True)
+    revoked_at = models.DateTimeField('Дата отзыва', auto_now_add=True)
+
+
+class TokenVersion(models.Model):
+
+    # Строка переживает удаление пользователя: по ней отзываются
+    # выданные ему токены, поэтому внешнего ключа в базе нет.
+    user = models.OneToOneField(
+        User,
+        on_delete=models.DO_NOTHING,
+        db_constraint=False,
+        primary_key=True,
+        related_name='token_version',
+        verbose_name='Пользователь'
+    )
+    version = models.PositiveIntegerField('Версия токенов', default=0)
+    updated = models.DateTimeField(
+        'Дата изменения', auto_now=True, db_index=True)
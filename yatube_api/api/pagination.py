@@ -0,0 +1,212 @@
+import base64
+import binascii
+import json
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+from posts.models import FeedEntry
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import LimitOffsetPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+from .counts import cached_count
+
+
+class BoundedPagination(LimitOffsetPagination):
+    """Пагинация по умолчанию для всех списков: ответ всегда ограничен.
+
+    `limit` не больше PAGINATION_MAX_LIMIT. Запрос без `limit` по-прежнему
+    получает список без обёртки, но не длиннее PAGINATION_LIST_LIMIT
+    записей; если записи остались, заголовок Link указывает на следующую
+    страницу. Полные выгрузки для администраторов — через /export/.
+    """
+
+    @property
+    def max_limit(self):
+        return getattr(settings, 'PAGINATION_MAX_LIMIT', 1000)
+
+    @property
+    def default_limit(self):
+        return getattr(settings, 'PAGINATION_LIST_LIMIT', 100)
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.bounded_list = self.limit_query_param not in request.query_params
+        if not self.bounded_list:
+            return super().paginate_queryset(queryset, request, view)
+        self.request = request
+        self.limit, self.offset = self.default_limit, 0
+        page = list(queryset[:self.limit + 1])
+        self.has_more = len(page) > self.limit
+        return page[:self.limit]
+
+    def get_paginated_response(self, data):
+        if not self.bounded_list:
+            return super().get_paginated_response(data)
+        headers = {}
+        if self.has_more:
+            url = replace_query_param(self.request.build_absolute_uri(),
+                                      self.limit_query_param, self.limit)
+            url = replace_query_param(url, self.offset_query_param,
+                                      self.limit)
+            headers['Link'] = f'<{url}>; rel="next"'
+        return Response(data, headers=headers)
+
+
+class ApproximateCountPagination(BoundedPagination):
+    """LimitOffsetPagination с количеством из кэша.
+
+    Точный COUNT(*) выполняется только по запросу `?exact_count=1`,
+    приблизительное количество помечается заголовком X-Count-Approximate.
+    """
+    exact_count_query_param = 'exact_count'
+    approximate_count_header = 'X-Count-Approximate'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.count_is_exact = request.query_params.get(
+            self.exact_count_query_param) in ('1', 'true')
+        return super().paginate_queryset(queryset, request, view)
+
+    def get_count(self, queryset):
+        if self.count_is_exact:
+            return super().get_count(queryset)
+        return cached_count(queryset)
+
+    def get_paginated_response(self, data):
+        response = super().get_paginated_response(data)
+        if not (self.count_is_exact or self.bounded_list):
+            response[self.approximate_count_header] = 'true'
+        return response
+
+
+class KeysetPagination(ApproximateCountPagination):
+    """Пагинация по ключу поверх limit/offset.
+
+    Клиенты, передающие `cursor` (для первой страницы — пустой),
+    получают страницы по составному ключу `ordering` с непрозрачным
+    курсором на следующую страницу (без `limit` — по keyset_page_size
+    записей); без `cursor` пагинация работает как LimitOffsetPagination.
+    """
+    cursor_query_param = 'cursor'
+    keyset_page_size = 10
+    ordering = ('-id',)
+    invalid_cursor_message = 'Неверный курсор.'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.keyset = self.cursor_query_param in request.query_params
+        if not self.keyset:
+            return super().paginate_queryset(queryset, request, view)
+
+        self.request = request
+        self.display_page_controls = False
+        self.limit = (
+            self.get_limit(request)
+            if self.limit_query_param in request.query_params
+            else self.keyset_page_size
+        )
+        fields = [self.get_field(queryset.model, name)
+                  for name in self.ordering]
+        position = self.decode_cursor(
+            request.query_params[self.cursor_query_param], fields)
+
+        queryset = queryset.order_by(*self.ordering)
+        if position is not None:
+            queryset = queryset.filter(self.build_filter(position))
+        page = list(queryset[:self.limit + 1])
+        self.next_position = None
+        if len(page) > self.limit:
+            page = page[:self.limit]
+            self.next_position = [
+                self.get_position_value(page[-1], name, field)
+                for name, field in zip(self.ordering, fields)
+            ]
+        return page
+
+    def get_paginated_response(self, data):
+        if not self.keyset:
+            return super().get_paginated_response(data)
+        return Response(OrderedDict([
+            ('next', self.get_next_cursor_link()),
+            ('results', data),
+        ]))
+
+    @staticmethod
+    def get_position_value(item, name, field):
+        # Строки values() приходят словарями; ключом могут быть и аннотации.
+        if isinstance(item, dict):
+            return item[name.lstrip('-')]
+        return getattr(item, name.lstrip('-'))
+
+    @staticmethod
+    def get_field(model, name):
+        field_name = name.lstrip('-')
+        if field_name == 'pk':
+            return model._meta.pk
+        return model._meta.get_field(field_name)
+
+    def build_filter(self, position):
+        """Условие «строго после позиции» для составного ключа."""
+        condition = Q()
+        equal = Q()
+        for name, value in zip(self.ordering, position):
+            field_name = name.lstrip('-')
+            lookup = 'lt' if name.startswith('-') else 'gt'
+            condition |= equal & Q(**{f'{field_name}__{lookup}': value})
+            equal &= Q(**{field_name: value})
+        return condition
+
+    def encode_cursor(self, position):
+        # isoformat без округления: DjangoJSONEncoder отбрасывает
+        # микросекунды, и записи в пределах одной миллисекунды терялись бы.
+        raw = json.dumps([
+            value.isoformat() if hasattr(value, 'isoformat') else value
+            for value in position
+        ])
+        return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+    def decode_cursor(self, cursor, fields):
+        if not cursor:
+            return None
+        try:
+            padded = cursor + '=' * (-len(cursor) % 4)
+            raw = json.loads(base64.urlsafe_b64decode(padded.encode()))
+            if not isinstance(raw, list) or len(raw) != len(fields):
+                raise ValueError
+            position = [field.to_python(value)
+                        for field, value in zip(fields, raw)]
+            # None в позиции нельзя сравнить в build_filter.
+            if None in position:
+                raise ValueError
+            return position
+        except (binascii.Error, UnicodeDecodeError, TypeError, ValueError,
+                ValidationError):
+            raise NotFound(self.invalid_cursor_message)
+
+    def get_next_cursor_link(self):
+        if self.next_position is None:
+            return None
+        url = self.request.build_absolute_uri()
+        url = replace_query_param(url, self.limit_query_param, self.limit)
+        return replace_query_param(
+            url, self.cursor_query_param,
+            self.encode_cursor(self.next_position))
+
+
+class PostPagination(KeysetPagination):
+    ordering = ('-pub_date', '-id')
+
+
+class CommentPagination(KeysetPagination):
+    ordering = ('created', 'id')
+
+
+class FeedPagination(KeysetPagination):
+    """Ключ ленты — колонки FeedEntry (см. posts.feed.feed_queryset)."""
+    ordering = ('-feed_pub_date', '-feed_post_id')
+
+    @staticmethod
+    def get_field(model, name):
+        return FeedEntry._meta.get_field(
+            name.lstrip('-').replace('feed_', '', 1))
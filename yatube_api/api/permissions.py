@@ -1,10 +1,15 @@
 from rest_framework import permissions
 
 
+def is_author(user, obj):
+    # Сравнение по author_id не загружает автора из БД.
+    return user.is_authenticated and obj.author_id == user.pk
+
+
 class IsAuthorOrReadOnly(permissions.BasePermission):
 
     def has_object_permission(self, request, view, obj):
         return (
             request.method in permissions.SAFE_METHODS
-            or obj.author == request.user
+            or is_author(request.user, obj)
         )
@@ -0,0 +1,123 @@
+import random
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, connections
+from rest_framework.permissions import SAFE_METHODS
+
+from .cache import get_last_changed
+
+# Реплика, с которой читает текущий запрос; None — основная база.
+state = threading.local()
+
+
+def get_replicas():
+    return getattr(settings, 'DATABASE_REPLICAS', ())
+
+
+def sticky_seconds():
+    return getattr(settings, 'REPLICA_STICKY_SECONDS', 10)
+
+
+def sticky_cookie():
+    return getattr(settings, 'REPLICA_STICKY_COOKIE', 'replica_pin')
+
+
+def pin_key(user_id):
+    return f'replica-pin:{user_id}'
+
+
+def current_replica():
+    return getattr(state, 'database', None)
+
+
+def is_pinned(request):
+    """Писал ли клиент недавно: тогда он читает с основной базы.
+
+    Клиент узнаётся по cookie или по пользователю из токена.
+    """
+    if sticky_cookie() in request.COOKIES:
+        return True
+    user = request.user
+    return bool(user and user.is_authenticated
+                and cache.get(pin_key(user.pk)))
+
+
+class ReplicaRouter:
+    """Чтение в запросах ReplicaReadMixin — с реплик, всё остальное —
+    с основной базы. Миграции выполняются только на основной базе.
+    """
+
+    def db_for_read(self, model, **hints):
+        return current_replica()
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        databases = {DEFAULT_DB_ALIAS, *get_replicas()}
+        if {obj1._state.db, obj2._state.db} <= databases:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, **hints):
+        if db in get_replicas():
+            return False
+        return None
+
+
+class ReplicaReadMixin:
+    """GET-запросы вьюсета читают со случайной реплики из DATABASE_REPLICAS.
+
+    Клиенты, которые писали меньше REPLICA_STICKY_SECONDS назад, читают с
+    основной базы и сразу видят свои изменения. Ответы с реплики, которая
+    могла ещё не получить последние изменения cache_models, не кэшируются.
+    """
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        replicas = get_replicas()
+        if (request.method in SAFE_METHODS and replicas
+                and not is_pinned(request)):
+            state.database = random.choice(replicas)
+
+    def dispatch(self, request, *args, **kwargs):
+        try:
+            return super().dispatch(request, *args, **kwargs)
+        finally:
+            state.database = None
+
+    def response_is_cacheable(self):
+        if current_replica() is not None and (
+                time.time() - get_last_changed(self.cache_models)
+                < sticky_seconds()):
+            return False
+        return super().response_is_cacheable()
+
+
+class ReplicaStickinessMiddleware:
+    """После успешной записи закрепляет клиента за основной базой."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        user = getattr(request, 'user', None)
+        if (request.method not in SAFE_METHODS
+                and response.status_code < 400
+                and user is not None and user.is_authenticated):
+            seconds = sticky_seconds()
+            cache.set(pin_key(user.pk), True, seconds)
+            response.set_cookie(sticky_cookie(), '1', max_age=seconds,
+                                httponly=True, samesite='Lax')
+        return response
+
+
+def replicate(target, source=DEFAULT_DB_ALIAS):
+    """Копирует базу SQLite source в target (имитация репликации)."""
+    for alias in (source, target):
+        connections[alias].ensure_connection()
+    connections[source].connection.backup(connections[target].connection)
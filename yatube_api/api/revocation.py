@@ -0,0 +1,155 @@
+import hashlib
+import math
+import threading
+import time
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.utils import datetime_from_epoch
+
+from .models import RevokedToken, TokenVersion
+
+VERSION_CLAIM = 'ver'
+
+
+class BloomFilter:
+
+    def __init__(self, capacity, error_rate):
+        self.capacity = capacity
+        self.size = math.ceil(
+            -capacity * math.log(error_rate) / math.log(2) ** 2)
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray(self.size // 8 + 1)
+        self.count = 0
+
+    def positions(self, key):
+        digest = hashlib.blake2b(key.encode(), digest_size=16).digest()
+        first = int.from_bytes(digest[:8], 'little')
+        second = int.from_bytes(digest[8:], 'little')
+        return [(first + number * second) % self.size
+                for number in range(self.hashes)]
+
+    def add(self, key):
+        for position in self.positions(key):
+            self.bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def __contains__(self, key):
+        return all(self.bits[position >> 3] & (1 << (position & 7))
+                   for position in self.positions(key))
+
+
+def jti_key(jti):
+    return f'jti:{jti}'
+
+
+def user_key(user_id):
+    return f'user:{user_id}'
+
+
+class RevocationList:
+    """Список отозванных токенов с блум-фильтром в памяти процесса.
+
+    Фильтр дочитывает новые записи из базы не чаще раза в
+    refresh_interval секунд. К базе за точным ответом обращаемся, только
+    если фильтр говорит «возможно отозван», поэтому для обычных токенов
+    проверка не делает запросов. Версии токенов пользователей, прочитанные
+    вместе с фильтром, хранятся в versions: в базу за версией идём только
+    при ложном срабатывании фильтра.
+    """
+
+    def __init__(self, capacity, error_rate, refresh_interval):
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.refresh_interval = refresh_interval
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self.lock:
+            self.bloom = BloomFilter(self.capacity, self.error_rate)
+            self.versions = {}
+            self.last_token_id = 0
+            self.versions_since = None
+            self.refreshed_at = None
+
+    def refresh(self):
+        now = time.monotonic()
+        if (self.refreshed_at is not None
+                and now - self.refreshed_at < self.refresh_interval):
+            return
+        with self.lock:
+            if self.bloom.count > self.capacity:
+                self.bloom = BloomFilter(self.capacity, self.error_rate)
+                self.versions = {}
+                self.last_token_id = 0
+                self.versions_since = None
+            tokens = RevokedToken.objects.filter(
+                id__gt=self.last_token_id, expires_at__gt=timezone.now(),
+            ).order_by('id').values_list('id', 'jti')
+            for token_id, jti in tokens:
+                self.bloom.add(jti_key(jti))
+                self.last_token_id = token_id
+            versions = TokenVersion.objects.filter(version__gt=0)
+            if self.versions_since is not None:
+                versions = versions.filter(updated__gte=self.versions_since)
+            for user_id, version, updated in versions.values_list(
+                    'user_id', 'version', 'updated'):
+                self.bloom.add(user_key(user_id))
+                self.versions[user_id] = version
+                self.versions_since = max(
+                    self.versions_since or updated, updated)
+            self.refreshed_at = now
+
+    def is_revoked(self, token):
+        self.refresh()
+        jti = token.get(api_settings.JTI_CLAIM)
+        if jti_key(jti) in self.bloom and RevokedToken.objects.filter(
+                jti=jti).exists():
+            return True
+        user_id = token.get(api_settings.USER_ID_CLAIM)
+        if user_key(user_id) not in self.bloom:
+            return False
+        version = self.versions.get(user_id)
+        if version is None:
+            version = current_version(user_id)
+        return token.get(VERSION_CLAIM, 0) < version
+
+    def revoke_token(self, token):
+        jti = token[api_settings.JTI_CLAIM]
+        RevokedToken.objects.get_or_create(jti=jti, defaults={
+            'user_id': token[api_settings.USER_ID_CLAIM],
+            'expires_at': datetime_from_epoch(token['exp']),
+        })
+        self.bloom.add(jti_key(jti))
+
+    def revoke_user(self, user_id):
+        """Отзывает все выданные пользователю токены."""
+        version, created = TokenVersion.objects.get_or_create(
+            user_id=user_id, defaults={'version': 1})
+        if not created:
+            TokenVersion.objects.filter(user_id=user_id).update(
+                version=F('version') + 1, updated=timezone.now())
+        # Версию в памяти обновляем только после фиксации: при откате
+        # в базе осталась бы прежняя, и новые токены считались бы отозванными.
+        transaction.on_commit(lambda: self.remember_version(user_id))
+        self.bloom.add(user_key(user_id))
+
+    def remember_version(self, user_id):
+        self.versions[user_id] = current_version(user_id)
+
+
+def current_version(user_id):
+    return TokenVersion.objects.filter(user_id=user_id).values_list(
+        'version', flat=True).first() or 0
+
+
+revocation_list = RevocationList(
+    capacity=getattr(settings, 'TOKEN_REVOCATION_CAPACITY', 100000),
+    error_rate=getattr(settings, 'TOKEN_REVOCATION_ERROR_RATE', 0.001),
+    refresh_interval=getattr(
+        settings, 'TOKEN_REVOCATION_REFRESH_INTERVAL', 5),
+)
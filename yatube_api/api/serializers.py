@@ -1,8 +1,31 @@
+import json
+
+from django.core.files.storage import default_storage
+from django.core.validators import validate_image_file_extension
+from posts import bulk
 from posts.models import Comment, Follow, Group, Post, User
+from posts.search import highlight_html
 from rest_framework import serializers
 from rest_framework.validators import UniqueTogetherValidator
 
 
+class BulkListSerializer(serializers.ListSerializer):
+    """Сохраняет список объектов одним bulk_create/bulk_update."""
+
+    def create(self, validated_data):
+        model = self.child.Meta.model
+        return bulk.bulk_create(
+            model, [model(**attrs) for attrs in validated_data])
+
+    def update(self, instances, validated_data):
+        fields = set()
+        for instance, attrs in zip(instances, validated_data):
+            for attr, value in attrs.items():
+                setattr(instance, attr, value)
+            fields.update(attrs)
+        return bulk.bulk_update(self.child.Meta.model, instances, fields)
+
+
 class CommentSerializer(serializers.ModelSerializer):
 
     author = serializers.SlugRelatedField(
@@ -12,7 +35,8 @@ class CommentSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = Comment
-        fields = '__all__'
+        exclude = ('updated', 'version')
+        list_serializer_class = BulkListSerializer
 
 
 class GroupSerializer(serializers.ModelSerializer):
@@ -22,14 +46,85 @@ class GroupSerializer(serializers.ModelSerializer):
         fields = '__all__'
 
 
+class ImageSrcsetField(serializers.Field):
+    """Копии изображения из posts.images как значения srcset по форматам.
+
+    {'webp': '<url> 320w, <url> 640w', 'jpeg': '<url> 320w, <url> 1600w'}
+    """
+
+    def __init__(self, **kwargs):
+        kwargs['read_only'] = True
+        super().__init__(**kwargs)
+
+    def url(self, name):
+        url = default_storage.url(name)
+        request = self.context.get('request')
+        return request.build_absolute_uri(url) if request else url
+
+    def to_representation(self, value):
+        if not value:
+            return {}
+        return {
+            image_format: ', '.join(
+                f'{self.url(name)} {width}w' for width, name in sizes)
+            for image_format, sizes in json.loads(value).items()
+        }
+
+
+class UploadedImageField(serializers.ImageField):
+    """Изображение с ошибкой из api.uploads.HashingUploadHandler.
+
+    Размер и число пикселей проверяются ещё при получении файла; после
+    этого выполняется обычная проверка ImageField через Pillow и
+    проверка расширения, как у поля модели.
+    """
+
+    def __init__(self, **kwargs):
+        kwargs.setdefault('validators', [validate_image_file_extension])
+        super().__init__(**kwargs)
+
+    def to_internal_value(self, data):
+        error = getattr(data, 'upload_error', None)
+        if error:
+            raise serializers.ValidationError(error)
+        return super().to_internal_value(data)
+
+
 class PostSerializer(serializers.ModelSerializer):
 
     author = serializers.SlugRelatedField(
         slug_field='username', read_only=True)
+    author_followers_count = serializers.IntegerField(
+        source='author.stats.followers_count', read_only=True)
+    image = UploadedImageField(required=False, allow_null=True)
+    image_srcset = ImageSrcsetField(source='image_variants')
 
     class Meta:
         model = Post
-        fields = '__all__'
+        exclude = ('updated', 'version', 'image_variants')
+        list_serializer_class = BulkListSerializer
+
+
+class HighlightField(serializers.CharField):
+    """Подсветка совпадений: текст экранирован, совпадения — в <mark>."""
+
+    def to_representation(self, value):
+        return highlight_html(super().to_representation(value))
+
+
+class SearchResultSerializer(serializers.Serializer):
+    """Поля результата полнотекстового поиска (см. posts.search)."""
+
+    rank = serializers.FloatField(source='search_rank', read_only=True)
+    highlight = HighlightField(source='search_highlight', read_only=True)
+
+
+class PostSearchSerializer(SearchResultSerializer, PostSerializer):
+    pass
+
+
+class CommentSearchSerializer(SearchResultSerializer, CommentSerializer):
+    pass
 
 
 class FollowSerializer(serializers.ModelSerializer):
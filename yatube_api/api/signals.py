@@ -0,0 +1,92 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+from posts.models import Comment, Follow, Group, Post, User
+from posts.signals import post_bulk_create, post_bulk_update
+
+from . import live
+from .authentication import user_cache
+from .cache import bump_version
+from .counts import adjust_table_count
+from .revocation import revocation_list
+
+# Поля пользователя, после изменения которых выданные токены перестают
+# действовать: в claims токена остались бы прежние права.
+TOKEN_FIELDS = ('is_active', 'is_staff', 'is_superuser', 'password')
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_save, sender=Comment)
+def count_created(sender, instance, created, **kwargs):
+    if created:
+        adjust_table_count(sender, 1)
+
+
+@receiver(post_delete, sender=Post)
+@receiver(post_delete, sender=Comment)
+def count_deleted(sender, instance, **kwargs):
+    adjust_table_count(sender, -1)
+
+
+@receiver(post_bulk_create, sender=Post)
+@receiver(post_bulk_create, sender=Comment)
+def count_bulk_created(sender, instances, **kwargs):
+    adjust_table_count(sender, len(instances))
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_save, sender=Comment)
+@receiver(post_save, sender=Group)
+@receiver(post_save, sender=Follow)
+@receiver(post_delete, sender=Post)
+@receiver(post_delete, sender=Comment)
+@receiver(post_delete, sender=Group)
+@receiver(post_delete, sender=Follow)
+@receiver(post_bulk_create, sender=Post)
+@receiver(post_bulk_create, sender=Comment)
+@receiver(post_bulk_update, sender=Post)
+@receiver(post_bulk_update, sender=Comment)
+def invalidate_responses(sender, **kwargs):
+    # Версия меняется после фиксации: иначе параллельный запрос успел бы
+    # закэшировать прежние строки уже под новой версией.
+    transaction.on_commit(lambda: bump_version(sender))
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def forget_user(sender, instance, **kwargs):
+    user_cache.discard(instance.pk)
+
+
+@receiver(pre_save, sender=User)
+def check_token_fields(sender, instance, update_fields=None, **kwargs):
+    fields = [field for field in TOKEN_FIELDS
+              if update_fields is None or field in update_fields]
+    instance._revoke_tokens = False
+    if instance._state.adding or not fields:
+        return
+    stored = User.objects.filter(pk=instance.pk).values(*fields).first()
+    instance._revoke_tokens = stored is not None and any(
+        stored[field] != getattr(instance, field) for field in fields)
+
+
+@receiver(post_save, sender=User)
+def revoke_tokens(sender, instance, **kwargs):
+    if getattr(instance, '_revoke_tokens', False):
+        revocation_list.revoke_user(instance.pk)
+
+
+@receiver(post_delete, sender=User)
+def revoke_deleted_user_tokens(sender, instance, **kwargs):
+    revocation_list.revoke_user(instance.pk)
+
+
+@receiver(post_save, sender=Comment)
+def publish_comment(sender, instance, created, **kwargs):
+    if created:
+        live.publish_on_commit([instance])
+
+
+@receiver(post_bulk_create, sender=Comment)
+def publish_bulk_comments(sender, instances, **kwargs):
+    live.publish_on_commit(instances)
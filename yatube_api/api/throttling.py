@@ -0,0 +1,126 @@
+import math
+import time
+from collections import OrderedDict
+from functools import lru_cache
+
+from django.conf import settings
+from django.core.cache import caches
+from rest_framework.settings import api_settings
+from rest_framework.throttling import BaseThrottle
+
+# Длительность периода в частоте вида '30/min'.
+DURATIONS = {'s': 1, 'm': 60, 'h': 60 * 60, 'd': 24 * 60 * 60}
+
+
+@lru_cache(maxsize=None)
+def parse_rate(rate):
+    """'30/min' -> (вместимость корзины, пополнение в токенах за секунду)."""
+    number, period = rate.split('/')
+    capacity = int(number)
+    return capacity, capacity / DURATIONS[period[0]]
+
+
+def take_token(state, now, capacity, refill, cost=1):
+    """Новое состояние корзины и сколько ждать, если токенов не хватает.
+
+    Состояние — (токены, время последнего обращения); корзина без
+    состояния считается полной. Запрос расходует cost токенов.
+    """
+    tokens, stamp = state or (capacity, now)
+    tokens = min(capacity, tokens + (now - stamp) * refill)
+    if tokens >= cost:
+        return (tokens - cost, now), 0
+    return (tokens, now), (cost - tokens) / refill
+
+
+class LocalBucketStore:
+    """Корзины в словаре процесса, без блокировок.
+
+    Чтение и запись ключа словаря атомарны, поэтому гонка параллельных
+    запросов одного клиента приводит лишь к тому, что токен может быть
+    потрачен дважды — не больше одного лишнего запроса на поток.
+    Словарь хранит не больше max_keys корзин в порядке обращений.
+    """
+
+    def __init__(self, max_keys=100_000):
+        self.max_keys = max_keys
+        self.buckets = OrderedDict()
+
+    def take(self, key, capacity, refill, now, cost=1):
+        state, wait = take_token(
+            self.buckets.pop(key, None), now, capacity, refill, cost)
+        self.buckets[key] = state
+        # Вытесняется корзина, к которой дольше всех не обращались:
+        # забытая корзина снова полна, как и пополнившаяся за время простоя.
+        while len(self.buckets) > self.max_keys:
+            try:
+                self.buckets.popitem(last=False)
+            except KeyError:
+                break
+        return wait
+
+
+class CacheBucketStore:
+    """Корзины в общем кэше Django: лимит действует на все процессы.
+
+    Обновление не атомарно, поэтому при одновременных запросах
+    одного клиента возможен небольшой перерасход.
+    """
+
+    def __init__(self, alias='default'):
+        self.alias = alias
+
+    def take(self, key, capacity, refill, now, cost=1):
+        cache = caches[self.alias]
+        state, wait = take_token(
+            cache.get(key), now, capacity, refill, cost)
+        cache.set(key, state, math.ceil(capacity / refill))
+        return wait
+
+
+def make_store():
+    if getattr(settings, 'THROTTLE_STORE', 'local') == 'cache':
+        return CacheBucketStore(
+            getattr(settings, 'THROTTLE_CACHE_ALIAS', 'default'))
+    return LocalBucketStore(getattr(settings, 'THROTTLE_MAX_KEYS', 100_000))
+
+
+class TokenBucketThrottle(BaseThrottle):
+    """Ограничение частоты запросов по алгоритму token bucket.
+
+    Частота берётся из DEFAULT_THROTTLE_RATES по ключу
+    '<throttle_scope вьюсета>.<action>', а если его нет — по
+    '<throttle_scope>'. Корзина своя у каждого пользователя, для
+    анонимных запросов — у каждого IP. Вьюсеты без throttle_scope и
+    действия без частоты не ограничиваются. Запрос расходует
+    view.get_throttle_cost(request) токенов (по умолчанию один), но не
+    больше вместимости корзины.
+    """
+    store = None
+
+    def allow_request(self, request, view):
+        scope = getattr(view, 'throttle_scope', None)
+        if scope is None:
+            return True
+        rates = api_settings.DEFAULT_THROTTLE_RATES
+        key = f'{scope}.{getattr(view, "action", None)}'
+        if key not in rates:
+            key = scope
+        rate = rates.get(key)
+        if rate is None:
+            return True
+        if TokenBucketThrottle.store is None:
+            TokenBucketThrottle.store = make_store()
+        user = request.user
+        ident = (f'user:{user.pk}' if user and user.is_authenticated
+                 else f'ip:{self.get_ident(request)}')
+        capacity, refill = parse_rate(rate)
+        cost = (view.get_throttle_cost(request)
+                if hasattr(view, 'get_throttle_cost') else 1)
+        self.wait_time = self.store.take(
+            f'throttle:{key}:{ident}', capacity, refill, time.time(),
+            min(cost, capacity))
+        return not self.wait_time
+
+    def wait(self):
+        return self.wait_time
@@ -0,0 +1,86 @@
+from django.utils.translation import gettext_lazy as _
+from rest_framework import serializers, status
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from rest_framework.views import APIView
+from rest_framework_simplejwt.exceptions import InvalidToken, TokenError
+from rest_framework_simplejwt.serializers import (
+    TokenObtainPairSerializer, TokenRefreshSerializer,
+)
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import RefreshToken
+from rest_framework_simplejwt.views import (
+    TokenObtainPairView, TokenRefreshView,
+)
+
+from .authentication import USER_CLAIMS
+from .revocation import VERSION_CLAIM, current_version, revocation_list
+
+
+class ClaimsRefreshToken(RefreshToken):
+
+    @classmethod
+    def for_user(cls, user):
+        token = super().for_user(user)
+        for claim in USER_CLAIMS:
+            token[claim] = getattr(user, claim)
+        token[VERSION_CLAIM] = current_version(user.pk)
+        return token
+
+
+class ClaimsTokenObtainPairSerializer(TokenObtainPairSerializer):
+
+    @classmethod
+    def get_token(cls, user):
+        return ClaimsRefreshToken.for_user(user)
+
+
+class ClaimsTokenObtainPairView(TokenObtainPairView):
+    serializer_class = ClaimsTokenObtainPairSerializer
+
+
+class RevocationAwareRefreshSerializer(TokenRefreshSerializer):
+
+    def validate(self, attrs):
+        if revocation_list.is_revoked(RefreshToken(attrs['refresh'])):
+            raise InvalidToken(_('Token is revoked'))
+        return super().validate(attrs)
+
+
+class RevocationAwareRefreshView(TokenRefreshView):
+    serializer_class = RevocationAwareRefreshSerializer
+
+
+class RevokeSerializer(serializers.Serializer):
+    refresh = serializers.CharField(required=False)
+    all = serializers.BooleanField(default=False)
+
+    def validate_refresh(self, value):
+        try:
+            token = RefreshToken(value)
+        except TokenError as error:
+            raise serializers.ValidationError(error.args[0])
+        user_id = token[api_settings.USER_ID_CLAIM]
+        if user_id != self.context['request'].user.pk:
+            raise serializers.ValidationError(
+                'Токен выдан другому пользователю.')
+        return token
+
+
+class RevokeTokenView(APIView):
+    """Отзывает текущий access-токен, переданный refresh или все токены."""
+
+    permission_classes = (IsAuthenticated,)
+
+    def post(self, request):
+        serializer = RevokeSerializer(
+            data=request.data, context={'request': request})
+        serializer.is_valid(raise_exception=True)
+        if serializer.validated_data['all']:
+            revocation_list.revoke_user(request.user.pk)
+        else:
+            revocation_list.revoke_token(request.auth)
+            refresh = serializer.validated_data.get('refresh')
+            if refresh is not None:
+                revocation_list.revoke_token(refresh)
+        return Response(status=status.HTTP_204_NO_CONTENT)
@@ -0,0 +1,91 @@
+import hashlib
+from io import BytesIO
+
+from django.conf import settings
+from django.core.files.uploadhandler import TemporaryFileUploadHandler
+from PIL import Image
+
+# Сколько первых байт файла читается, чтобы узнать формат и размер
+# изображения по заголовку.
+HEADER_LIMIT = 256 * 1024
+
+
+def max_upload_size():
+    return getattr(settings, 'IMAGE_UPLOAD_MAX_SIZE', 10 * 1024 * 1024)
+
+
+def max_upload_pixels():
+    return getattr(settings, 'IMAGE_UPLOAD_MAX_PIXELS', 40_000_000)
+
+
+class HashingUploadHandler(TemporaryFileUploadHandler):
+    """Пишет загрузку во временный файл по частям и считает sha256.
+
+    Размер проверяется по мере получения данных, формат и размеры
+    изображения — по заголовку, без декодирования. Если проверка не
+    прошла, остаток файла не сохраняется, а у файла выставляется
+    upload_error — его сообщает поле сериализатора.
+    """
+
+    def new_file(self, *args, **kwargs):
+        super().new_file(*args, **kwargs)
+        self.digest = hashlib.sha256()
+        self.received = 0
+        self.header = b''
+        self.image_format = self.image_size = self.error = None
+
+    def receive_data_chunk(self, raw_data, start):
+        if self.error is not None:
+            return None
+        self.received += len(raw_data)
+        if self.received > max_upload_size():
+            return self.reject(
+                f'Размер файла превышает {max_upload_size()} байт.')
+        if self.image_size is None and len(self.header) < HEADER_LIMIT:
+            self.header += raw_data[:HEADER_LIMIT - len(self.header)]
+            self.probe()
+            if self.error is not None:
+                return None
+        self.digest.update(raw_data)
+        return super().receive_data_chunk(raw_data, start)
+
+    def probe(self):
+        try:
+            with Image.open(BytesIO(self.header)) as image:
+                self.image_format, self.image_size = image.format, image.size
+        except Image.DecompressionBombError:
+            # Pillow отказывается открывать слишком большие изображения.
+            return self.reject(
+                f'Изображение больше {max_upload_pixels()} пикселей.')
+        except (OSError, SyntaxError, ValueError):
+            # Заголовок ещё не получен целиком или это не изображение.
+            return
+        width, height = self.image_size
+        if width * height > max_upload_pixels():
+            self.reject(
+                f'Изображение больше {max_upload_pixels()} пикселей.')
+
+    def reject(self, message):
+        self.error = message
+        self.file.seek(0)
+        self.file.truncate()
+
+    def file_complete(self, file_size):
+        file = super().file_complete(file_size)
+        file.upload_error = self.error
+        file.content_hash = self.digest.hexdigest()
+        file.image_format = self.image_format
+        file.image_size = self.image_size
+        return file
+
+
+class HashingUploadMixin:
+    """Загрузки вьюсета принимаются через HashingUploadHandler.
+
+    Обработчик подключается только к API: для остальных адресов
+    (например, админки) действуют обработчики Django по умолчанию.
+    """
+
+    def initialize_request(self, request, *args, **kwargs):
+        request.upload_handlers = [HashingUploadHandler(request)]
+        return super().initialize_request(request, *args, **kwargs)
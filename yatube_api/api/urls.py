@@ -1,7 +1,13 @@
 from django.urls import include, path
 from rest_framework.routers import DefaultRouter
 
-from .views import CommentViewSet, FollowViewSet, GroupViewSet, PostViewSet
+from .tokens import (
+    ClaimsTokenObtainPairView, RevocationAwareRefreshView, RevokeTokenView,
+)
+from .views import (
+    ChangesView, CommentViewSet, ExportView, FeedViewSet, FollowViewSet,
+    GroupPostViewSet, GroupViewSet, PostViewSet,
+)
 
 router = DefaultRouter()
 
@@ -10,11 +16,22 @@ router.register(r'posts', PostViewSet, basename='posts')
 router.register(
     'posts/(?P<post_id>\\d+)/comments', CommentViewSet, basename='comments')
 router.register(r'groups', GroupViewSet, basename='groups')
+router.register(
+    r'groups/(?P<group_slug>[-\w]+)/posts', GroupPostViewSet,
+    basename='group-posts')
 router.register(r'follow', FollowViewSet, basename='follow')
+router.register(r'feed', FeedViewSet, basename='feed')
 
 
 urlpatterns = [
     path('v1/', include(router.urls)),
+    path('v1/export/<str:name>/', ExportView.as_view(), name='export'),
+    path('v1/changes/', ChangesView.as_view(), name='changes'),
+    path('v1/jwt/create/', ClaimsTokenObtainPairView.as_view(),
+         name='jwt-create'),
+    path('v1/jwt/refresh/', RevocationAwareRefreshView.as_view(),
+         name='jwt-refresh'),
+    path('v1/jwt/revoke/', RevokeTokenView.as_view(), name='jwt-revoke'),
     path('v1/', include('djoser.urls')),
     path('v1/', include('djoser.urls.jwt')),
 ]
@@ -1,44 +1,122 @@
-from django.shortcuts import get_object_or_404
-from posts.models import Group, Post
-from rest_framework import filters, mixins, permissions, viewsets
-from rest_framework.pagination import LimitOffsetPagination
-
+import time
+
+from django.conf import settings
+from django.http import StreamingHttpResponse
+from posts.feed import feed_queryset
+from posts.models import Comment, Follow, Group, Post
+from posts.outbox import changes_since, notifier
+from rest_framework import filters, mixins, permissions, views, viewsets
+from rest_framework.exceptions import NotFound, ValidationError
+from rest_framework.response import Response
+
+from .cache import CachedResponseMixin
+from .conditional import ConditionalGetMixin
+from .export import EXPORTS, NDJSONRenderer, export_ndjson
+from .fast import FastListMixin
+from .filters import FullTextSearchFilter, PostFilterBackend
+from .mixins import (
+    BulkModelMixin, CanEditMixin, NestedParentMixin, QueryShapingMixin,
+    SearchResultsMixin,
+)
+from .pagination import CommentPagination, FeedPagination, PostPagination
 from .permissions import IsAuthorOrReadOnly
+from .replicas import ReplicaReadMixin
+from .uploads import HashingUploadMixin
 from .serializers import (
-    CommentSerializer, FollowSerializer, GroupSerializer, PostSerializer,
+    CommentSearchSerializer, CommentSerializer, FollowSerializer,
+    GroupSerializer, PostSearchSerializer, PostSerializer,
 )
 
 
-class PostViewSet(viewsets.ModelViewSet):
-    queryset = Post.objects.all()
+class PostViewSet(HashingUploadMixin,
+                  ReplicaReadMixin,
+                  BulkModelMixin,
+                  CanEditMixin,
+                  ConditionalGetMixin,
+                  CachedResponseMixin,
+                  SearchResultsMixin,
+                  QueryShapingMixin,
+                  FastListMixin,
+                  viewsets.ModelViewSet):
+    queryset = Post.objects.order_by('pub_date', 'id')
     serializer_class = PostSerializer
-    pagination_class = LimitOffsetPagination
+    search_serializer_class = PostSearchSerializer
+    pagination_class = PostPagination
     permission_classes = (IsAuthorOrReadOnly,)
+    filter_backends = (PostFilterBackend, FullTextSearchFilter)
+    cache_models = (Post, Comment, Follow)
+    throttle_scope = 'posts'
+    validator_fields = ('updated', 'version',
+                        'author__stats__followers_count')
 
     def perform_create(self, serializer):
         serializer.save(author=self.request.user)
 
 
-class GroupViewSet(viewsets.ReadOnlyModelViewSet):
-    queryset = Group.objects.all()
+class GroupViewSet(ReplicaReadMixin,
+                   CachedResponseMixin,
+                   viewsets.ReadOnlyModelViewSet):
+    queryset = Group.objects.order_by('id')
     serializer_class = GroupSerializer
+    cache_models = (Group, Post)
+
+
+class GroupPostViewSet(ReplicaReadMixin,
+                       NestedParentMixin,
+                       CanEditMixin,
+                       ConditionalGetMixin,
+                       CachedResponseMixin,
+                       SearchResultsMixin,
+                       QueryShapingMixin,
+                       FastListMixin,
+                       mixins.ListModelMixin,
+                       viewsets.GenericViewSet):
+
+    serializer_class = PostSerializer
+    search_serializer_class = PostSearchSerializer
+    pagination_class = PostPagination
+    filter_backends = (PostFilterBackend, FullTextSearchFilter)
+    cache_models = (Group, Post, Comment, Follow)
+    parent_model = Group
+    parent_lookup_kwarg = 'group_slug'
+    parent_lookup_field = 'slug'
+
+    def get_queryset(self):
+        return Post.objects.filter(group=self.get_parent()).order_by(
+            'pub_date', 'id')
 
 
-class CommentViewSet(viewsets.ModelViewSet):
+class CommentViewSet(ReplicaReadMixin,
+                     NestedParentMixin,
+                     BulkModelMixin,
+                     CanEditMixin,
+                     ConditionalGetMixin,
+                     CachedResponseMixin,
+                     SearchResultsMixin,
+                     QueryShapingMixin,
+                     FastListMixin,
+                     viewsets.ModelViewSet):
 
     serializer_class = CommentSerializer
+    search_serializer_class = CommentSearchSerializer
+    pagination_class = CommentPagination
     permission_classes = (IsAuthorOrReadOnly,)
+    filter_backends = (FullTextSearchFilter,)
+    cache_models = (Post, Comment)
+    throttle_scope = 'comments'
+    parent_model = Post
+    parent_lookup_kwarg = 'post_id'
 
     def get_queryset(self):
-        post = get_object_or_404(Post, pk=self.kwargs.get('post_id'))
-        return post.comments.all()
+        return Comment.objects.filter(post=self.get_parent()).order_by(
+            'created', 'id')
 
     def perform_create(self, serializer):
-        post = get_object_or_404(Post, pk=self.kwargs.get('post_id'))
-        serializer.save(author=self.request.user, post=post)
+        serializer.save(author=self.request.user, post=self.get_parent())
 
 
-class FollowViewSet(mixins.CreateModelMixin,
+class FollowViewSet(QueryShapingMixin,
+                    mixins.CreateModelMixin,
                     mixins.ListModelMixin,
                     viewsets.GenericViewSet):
 
@@ -46,11 +124,82 @@ class FollowViewSet(mixins.CreateModelMixin,
     permission_classes = (permissions.IsAuthenticated,)
     filter_backends = (filters.SearchFilter,)
     search_fields = ('=following__username',)
+    throttle_scope = 'follow'
 
     def get_queryset(self):
-        return self.request.user.follower.all()
+        return self.request.user.follower.order_by('id')
 
     def perform_create(self, serializer):
         user = self.request.user
         if serializer.is_valid():
             serializer.save(user=user)
+
+
+class FeedViewSet(CanEditMixin,
+                  QueryShapingMixin,
+                  FastListMixin,
+                  mixins.ListModelMixin,
+                  viewsets.GenericViewSet):
+
+    serializer_class = PostSerializer
+    pagination_class = FeedPagination
+    permission_classes = (permissions.IsAuthenticated,)
+
+    def get_queryset(self):
+        return feed_queryset(self.request.user).order_by(
+            *self.pagination_class.ordering)
+
+
+class ExportView(views.APIView):
+
+    permission_classes = (permissions.IsAdminUser,)
+    renderer_classes = (NDJSONRenderer,)
+
+    def get(self, request, name):
+        if name not in EXPORTS:
+            raise NotFound
+        return StreamingHttpResponse(
+            export_ndjson(name, context={'request': request}),
+            content_type=NDJSONRenderer.media_type,
+        )
+
+
+class ChangesView(views.APIView):
+    """Лента событий outbox после номера since с long-poll ожиданием.
+
+    Если новых событий нет, запрос ждёт их до timeout секунд. События за
+    недавним пропуском в номерах придерживаются, пока пропуск не заполнится
+    (см. posts.outbox.committed_prefix).
+    """
+
+    permission_classes = (permissions.IsAdminUser,)
+    max_limit = 1000
+    max_timeout = 30
+
+    def get_param(self, name, default, maximum=None):
+        try:
+            value = int(self.request.query_params.get(name, default))
+        except ValueError:
+            value = -1
+        if value < 0:
+            raise ValidationError(
+                {name: 'Ожидается целое неотрицательное число.'})
+        return value if maximum is None else min(value, maximum)
+
+    def get(self, request):
+        since = self.get_param('since', 0)
+        limit = self.get_param('limit', 100, self.max_limit) or 1
+        timeout = self.get_param('timeout', 25, self.max_timeout)
+        poll_interval = getattr(settings, 'CHANGES_POLL_INTERVAL', 1)
+        deadline = time.monotonic() + timeout
+        while True:
+            generation = notifier.generation
+            events = changes_since(since, limit)
+            remaining = deadline - time.monotonic()
+            if events or remaining <= 0:
+                break
+            notifier.wait(generation, min(remaining, poll_interval))
+        return Response({
+            'events': events,
+            'next': events[-1]['id'] if events else since,
+        })
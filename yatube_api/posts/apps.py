@@ -1,5 +1,14 @@
 from django.apps import AppConfig
+from django.db.backends.signals import connection_created
+from django.db.models.signals import post_migrate
 
 
 class PostsConfig(AppConfig):
     name = 'posts'
+
+    def ready(self):
+        from . import signals  # noqa: F401
+        from .search import install_search_index
+        from .sqlite import apply_pragmas
+        post_migrate.connect(install_search_index, sender=self)
+        connection_created.connect(apply_pragmas)
@@ -0,0 +1,15 @@
+from django.db.backends.sqlite3 import base
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    """SQLite, в котором transaction.atomic начинается с BEGIN IMMEDIATE.
+
+    Обычный BEGIN берёт блокировку на запись только при первой записи.
+    Если к этому моменту базу уже пишет другое соединение, SQLite сразу
+    возвращает «database is locked», не дожидаясь busy_timeout: иначе
+    транзакция читала бы устаревшие данные. BEGIN IMMEDIATE берёт
+    блокировку в начале транзакции и при занятой базе ждёт busy_timeout.
+    """
+
+    def _start_transaction_under_autocommit(self):
+        self.cursor().execute('BEGIN IMMEDIATE')
@@ -0,0 +1,52 @@
+from django.db import transaction
+
+from .fields import VersionField
+from .signals import post_bulk_create, post_bulk_update
+
+
+def bulk_create(model, instances, batch_size=None):
+    """bulk_create с заполнением первичных ключей и сигналом post_bulk_create.
+
+    Сигналы post_save при массовой вставке не отправляются, поэтому
+    счётчики, ленты и кэши обновляются обработчиками post_bulk_create
+    в той же транзакции.
+    """
+    with transaction.atomic():
+        instances = model.objects.bulk_create(instances, batch_size)
+        if instances and instances[0].pk is None:
+            # SQLite не возвращает ключи вставленных строк. До конца
+            # транзакции запись в базу заблокирована, поэтому наши строки —
+            # последние по первичному ключу.
+            pks = model.objects.order_by('-pk').values_list(
+                'pk', flat=True)[:len(instances)]
+            for instance, pk in zip(instances, reversed(list(pks))):
+                instance.pk = pk
+        post_bulk_create.send(sender=model, instances=instances)
+    return instances
+
+
+def bulk_update(model, instances, fields, batch_size=None):
+    """bulk_update с проставлением auto_now полей, увеличением версий и
+    сигналом post_bulk_update.
+
+    Обработчики получают прежние значения изменённых полей в `previous`.
+    """
+    fields = set(fields)
+    columns = [model._meta.get_field(name).attname for name in fields]
+    for field in model._meta.concrete_fields:
+        if getattr(field, 'auto_now', False) or isinstance(
+                field, VersionField):
+            fields.add(field.name)
+            for instance in instances:
+                setattr(instance, field.attname,
+                        field.pre_save(instance, False))
+    with transaction.atomic():
+        previous = {
+            row['pk']: row for row in model.objects.filter(
+                pk__in=[instance.pk for instance in instances]
+            ).values('pk', *columns)
+        }
+        model.objects.bulk_update(instances, sorted(fields), batch_size)
+        post_bulk_update.send(sender=model, instances=instances,
+                              fields=fields, previous=previous)
+    return instances
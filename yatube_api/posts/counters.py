@@ -0,0 +1,77 @@
+from collections import Counter
+
+from django.db.models import Count, F, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce, Now
+
+from .models import Comment, Follow, Group, Post, User, UserStats
+
+
+def adjust(queryset, field, delta, **changes):
+    return queryset.update(**{field: F(field) + delta}, **changes)
+
+
+def adjust_post_comments(post_id, delta):
+    adjust(Post.objects.filter(pk=post_id), 'comments_count', delta,
+           updated=Now(), version=F('version') + 1)
+
+
+def adjust_group_posts(group_id, delta):
+    if group_id is not None:
+        adjust(Group.objects.filter(pk=group_id), 'posts_count', delta)
+
+
+def posts_created(posts):
+    for group_id, total in Counter(post.group_id for post in posts).items():
+        adjust_group_posts(group_id, total)
+
+
+def comments_created(comments):
+    for post_id, total in Counter(
+            comment.post_id for comment in comments).items():
+        adjust_post_comments(post_id, total)
+
+
+def recount_groups(group_ids):
+    Group.objects.filter(pk__in=group_ids).update(
+        posts_count=count_of(Post.objects, 'group'))
+
+
+def adjust_user_stats(user_id, field, delta):
+    # При удалении пользователя его UserStats удаляются каскадом раньше
+    # подписок: уменьшать уже нечего, а созданная заново строка с нулём
+    # нарушила бы ограничение на неотрицательность.
+    if adjust(UserStats.objects.filter(pk=user_id), field, delta) or (
+            delta < 0):
+        return
+    UserStats.objects.get_or_create(user_id=user_id)
+    adjust(UserStats.objects.filter(pk=user_id), field, delta)
+
+
+def adjust_follow(follow, delta):
+    adjust_user_stats(follow.following_id, 'followers_count', delta)
+    adjust_user_stats(follow.user_id, 'following_count', delta)
+
+
+def count_of(queryset, field):
+    """Подзапрос количества строк queryset, связанных с OuterRef('pk')."""
+    return Coalesce(Subquery(
+        queryset.filter(**{field: OuterRef('pk')})
+        .order_by().values(field)
+        .annotate(total=Count('pk')).values('total')
+    ), Value(0))
+
+
+def recount_all():
+    """Пересчитывает все счётчики по данным таблиц."""
+    missing = User.objects.filter(stats__isnull=True).values_list(
+        'pk', flat=True)
+    UserStats.objects.bulk_create(
+        [UserStats(user_id=user_id) for user_id in missing],
+        ignore_conflicts=True,
+    )
+    Post.objects.update(comments_count=count_of(Comment.objects, 'post'))
+    Group.objects.update(posts_count=count_of(Post.objects, 'group'))
+    UserStats.objects.update(
+        followers_count=count_of(Follow.objects, 'following'),
+        following_count=count_of(Follow.objects, 'user'),
+    )
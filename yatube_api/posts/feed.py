@@ -0,0 +1,118 @@
+from django.conf import settings
+from django.db.models import F, Q
+
+from .models import FeedEntry, Follow, Post, UserStats
+
+
+def fanout_limit():
+    # Авторам с большим числом подписчиков ленты не рассылаются:
+    # их публикации подмешиваются в ленту при чтении.
+    return getattr(settings, 'FEED_FANOUT_LIMIT', 1000)
+
+
+def backfill_size():
+    # Сколько последних публикаций автора попадает в ленту при подписке.
+    return getattr(settings, 'FEED_BACKFILL_SIZE', 100)
+
+
+def followers_for_fanout(author_id):
+    """Подписчики автора или None, если их больше FEED_FANOUT_LIMIT."""
+    limit = fanout_limit()
+    followers = list(
+        Follow.objects.filter(following_id=author_id)
+        .values_list('user_id', flat=True)[:limit + 1]
+    )
+    if len(followers) > limit:
+        return None
+    return followers
+
+
+def fan_out_posts(posts):
+    entries = []
+    followers_by_author = {}
+    for post in posts:
+        if post.author_id not in followers_by_author:
+            followers_by_author[post.author_id] = (
+                followers_for_fanout(post.author_id) or ())
+        entries.extend(
+            FeedEntry(user_id=user_id, post_id=post.id,
+                      pub_date=post.pub_date)
+            for user_id in followers_by_author[post.author_id]
+        )
+    FeedEntry.objects.bulk_create(entries, ignore_conflicts=True)
+
+
+def fan_out_post(post):
+    fan_out_posts([post])
+
+
+def latest_posts(author_id):
+    return (
+        Post.objects.filter(author_id=author_id)
+        .order_by('-pub_date').values_list('id', 'pub_date')
+        [:backfill_size()]
+    )
+
+
+def backfill_follow(follow):
+    if followers_for_fanout(follow.following_id) is None:
+        return
+    FeedEntry.objects.bulk_create(
+        [FeedEntry(user_id=follow.user_id, post_id=post_id, pub_date=pub_date)
+         for post_id, pub_date in latest_posts(follow.following_id)],
+        ignore_conflicts=True,
+    )
+
+
+def backfill_author(author_id):
+    """Рассылает последние публикации автора по лентам всех подписчиков.
+
+    Нужна, когда подписчиков стало не больше FEED_FANOUT_LIMIT: публикации
+    автора больше не подмешиваются при чтении, а созданные до этого не
+    были разосланы.
+    """
+    followers = followers_for_fanout(author_id)
+    if not followers:
+        return
+    posts = list(latest_posts(author_id))
+    FeedEntry.objects.bulk_create(
+        [FeedEntry(user_id=user_id, post_id=post_id, pub_date=pub_date)
+         for user_id in followers for post_id, pub_date in posts],
+        ignore_conflicts=True,
+    )
+
+
+def remove_follow(follow):
+    FeedEntry.objects.filter(
+        user_id=follow.user_id, post__author_id=follow.following_id
+    ).delete()
+    followers = UserStats.objects.filter(
+        pk=follow.following_id).values_list('followers_count', flat=True)
+    if followers.first() == fanout_limit():
+        backfill_author(follow.following_id)
+
+
+def heavy_followings(user):
+    """Авторы из подписок пользователя, которым лента не рассылается."""
+    return Follow.objects.filter(
+        user=user, following__stats__followers_count__gt=fanout_limit(),
+    ).values_list('following_id', flat=True)
+
+
+def feed_queryset(user):
+    """Публикации ленты с ключом сортировки feed_pub_date, feed_post_id.
+
+    Без «тяжёлых» авторов лента читается по индексу FeedEntry
+    (user, pub_date, post) и сортируется по его колонкам, без сортировки
+    во временном B-дереве.
+    """
+    heavy = list(heavy_followings(user))
+    if not heavy:
+        return Post.objects.filter(feed_entries__user=user).annotate(
+            feed_pub_date=F('feed_entries__pub_date'),
+            feed_post_id=F('feed_entries__post_id'),
+        )
+    return Post.objects.filter(
+        Q(id__in=FeedEntry.objects.filter(user=user).values('post_id'))
+        | Q(author_id__in=heavy)
+    ).annotate(feed_pub_date=F('pub_date'), feed_post_id=F('id'))
@@ -0,0 +1,88 @@
+import hashlib
+import os
+
+from django.db import models
+from django.db.models import F
+from PIL import Image
+
+# Расширения для распространённых форматов; для остальных берётся первое
+# зарегистрированное в Pillow.
+FORMAT_EXTENSIONS = {'JPEG': '.jpg', 'PNG': '.png', 'GIF': '.gif',
+                     'WEBP': '.webp', 'BMP': '.bmp', 'TIFF': '.tiff'}
+
+
+def content_hash(file):
+    """sha256 содержимого; для загрузок он уже посчитан при получении."""
+    digest = getattr(file, 'content_hash', None)
+    if digest:
+        return digest
+    hasher = hashlib.sha256()
+    file.seek(0)
+    for chunk in file.chunks():
+        hasher.update(chunk)
+    file.seek(0)
+    return hasher.hexdigest()
+
+
+def image_extension(file):
+    """Расширение по формату, который определил Pillow, а не по имени.
+
+    Имя файла задаёт клиент, и по нему файл мог бы отдаваться, например,
+    как HTML.
+    """
+    image_format = getattr(file, 'image_format', None) or getattr(
+        getattr(file, 'image', None), 'format', None)
+    if image_format is None:
+        file.seek(0)
+        with Image.open(file) as image:
+            image_format = image.format
+        file.seek(0)
+    if image_format in FORMAT_EXTENSIONS:
+        return FORMAT_EXTENSIONS[image_format]
+    return next(extension for extension, name
+                in Image.registered_extensions().items()
+                if name == image_format)
+
+
+class ContentAddressedImageField(models.ImageField):
+    """ImageField, который хранит файлы под именем из хэша содержимого.
+
+    Одинаковые изображения сохраняются один раз, и на файл ссылаются
+    все строки с этим изображением.
+    """
+
+    def content_name(self, file):
+        digest = content_hash(file.file)
+        extension = image_extension(file.file)
+        return os.path.join(digest[:2], f'{digest}{extension}')
+
+    def pre_save(self, model_instance, add):
+        file = getattr(model_instance, self.attname)
+        if file and not file._committed:
+            relative_name = self.content_name(file)
+            name = self.generate_filename(model_instance, relative_name)
+            if file.storage.exists(name):
+                file.name = name
+                file._committed = True
+            else:
+                file.save(relative_name, file.file, save=False)
+        return file
+
+
+class VersionField(models.PositiveIntegerField):
+    """Номер версии записи: увеличивается в базе при каждом сохранении.
+
+    Время изменения для этого не годится: Last-Modified точен до секунды,
+    а posts.counters ставит его через Now(), которое в SQLite отбрасывает
+    доли секунды. Номер меняется при любой записи.
+    """
+
+    def __init__(self, *args, **kwargs):
+        kwargs.setdefault('default', 0)
+        kwargs.setdefault('editable', False)
+        super().__init__(*args, **kwargs)
+
+    def pre_save(self, model_instance, add):
+        if add:
+            return super().pre_save(model_instance, add)
+        return F(self.attname) + 1
@@ -0,0 +1,104 @@
+import hashlib
+import json
+import os
+from io import BytesIO
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.db import transaction
+from PIL import Image, ImageOps
+
+from .models import Post
+from .worker import WorkerQueue
+
+WEBP = 'webp'
+
+# Форматы, в которых сохраняются уменьшенные копии для браузеров без WebP.
+FALLBACK_FORMATS = {'JPEG': 'jpeg', 'PNG': 'png'}
+
+image_queue = WorkerQueue(
+    'image-variants', workers=getattr(settings, 'IMAGE_WORKERS', 1))
+
+
+def variant_widths(width):
+    """Ширины копий: заданные в настройках, но не больше оригинала."""
+    widths = getattr(settings, 'IMAGE_VARIANT_WIDTHS', (320, 640, 1280))
+    return sorted({min(target, width) for target in widths})
+
+
+def content_digest(file):
+    digest = hashlib.sha256()
+    for chunk in file.chunks():
+        digest.update(chunk)
+    return digest.hexdigest()[:32]
+
+
+def encode(image, image_format):
+    buffer = BytesIO()
+    if image_format == 'JPEG' and image.mode not in ('RGB', 'L'):
+        image = image.convert('RGB')
+    options = {'quality': getattr(settings, 'IMAGE_VARIANT_QUALITY', 80)}
+    if image_format == 'PNG':
+        options = {'optimize': True}
+    image.save(buffer, image_format, **options)
+    return ContentFile(buffer.getvalue())
+
+
+def save_variant(storage, name, image, image_format):
+    # Имя зависит только от содержимого оригинала и параметров копии,
+    # поэтому уже созданная копия не пересчитывается.
+    if not storage.exists(name):
+        storage.save(name, encode(image, image_format))
+    return name
+
+
+def build_variants(field_file):
+    """Создаёт уменьшенные копии и WebP рядом с оригиналом.
+
+    Возвращает {'webp': [[ширина, имя], ...], 'jpeg' или 'png': [...]};
+    оригинал JPEG или PNG входит в список своего формата.
+    """
+    storage = field_file.storage
+    directory = os.path.dirname(field_file.name)
+    with field_file.open('rb') as file:
+        digest = content_digest(file)
+        file.seek(0)
+        with Image.open(file) as source:
+            source_format = source.format
+            image = ImageOps.exif_transpose(source)
+            image.load()
+    fallback = FALLBACK_FORMATS.get(source_format, 'jpeg')
+    variants = {WEBP: [], fallback: []}
+    for width in variant_widths(image.width):
+        height = max(1, round(image.height * width / image.width))
+        resized = image if width == image.width else image.resize(
+            (width, height), Image.LANCZOS)
+        variants[WEBP].append([width, save_variant(
+            storage, os.path.join(directory, f'{digest}-{width}w.webp'),
+            resized, 'WEBP')])
+        if width < image.width:
+            variants[fallback].append([width, save_variant(
+                storage,
+                os.path.join(directory, f'{digest}-{width}w.{fallback}'),
+                resized, fallback.upper())])
+    if source_format in FALLBACK_FORMATS:
+        variants[fallback].append([image.width, field_file.name])
+    return variants
+
+
+def generate_post_variants(post_id, image_name):
+    post = Post.objects.filter(pk=post_id).first()
+    if post is None or post.image.name != image_name:
+        # Публикацию удалили или сменили картинку, пока задача ждала.
+        return
+    post.image_variants = json.dumps(build_variants(post.image))
+    post.save(update_fields=('image_variants', 'updated'))
+
+
+def schedule_variants(posts):
+    """Ставит в очередь генерацию копий после фиксации транзакции."""
+    for post in posts:
+        if post.image:
+            transaction.on_commit(
+                lambda post=post: image_queue.submit(
+                    generate_post_variants, post.pk, post.image.name))
@@ -0,0 +1,47 @@
+import json
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.core.serializers.json import DjangoJSONEncoder
+from django.utils import timezone
+from django.utils.module_loading import import_string
+from posts.models import OutboxEvent
+from posts.outbox import relay_batch
+
+
+class Command(BaseCommand):
+    help = ('Передаёт события outbox потребителю пачками. Потребитель — '
+            'функция из настройки OUTBOX_RELAY_HANDLER, по умолчанию '
+            'события выводятся в NDJSON.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500)
+        parser.add_argument('--once', action='store_true',
+                            help='Передать накопившиеся события и выйти.')
+        parser.add_argument('--interval', type=float, default=1.0)
+        parser.add_argument(
+            '--purge-days', type=int,
+            help='Сначала удалить переданные события старше N дней.')
+
+    def write_ndjson(self, events):
+        for event in events:
+            self.stdout.write(json.dumps(event, cls=DjangoJSONEncoder,
+                                         ensure_ascii=False))
+
+    def handle(self, *args, **options):
+        handler_path = getattr(settings, 'OUTBOX_RELAY_HANDLER', None)
+        handler = (import_string(handler_path) if handler_path
+                   else self.write_ndjson)
+        if options['purge_days'] is not None:
+            OutboxEvent.objects.filter(
+                relayed=True, created__lt=timezone.now() - timedelta(
+                    days=options['purge_days']),
+            ).delete()
+        while True:
+            if relay_batch(handler, options['batch_size']):
+                continue
+            if options['once']:
+                return
+            time.sleep(options['interval'])
@@ -0,0 +1,19 @@
+# Generated by Django 2.2.16 on 2026-10-18 03:34
+
+from django.db import migrations
+import posts.fields
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0009_image_variants'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='post',
+            name='image',
+            field=posts.fields.ContentAddressedImageField(blank=True, null=True, upload_to='posts/'),
+        ),
+    ]
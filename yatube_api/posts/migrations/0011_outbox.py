@@ -0,0 +1,28 @@
+# Generated by Django 2.2.16 on 2026-10-18 03:39
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0010_content_addressed_images'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OutboxEvent',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('topic', models.CharField(max_length=50, verbose_name='Тема')),
+                ('object_id', models.PositiveIntegerField(verbose_name='Идентификатор объекта')),
+                ('payload', models.TextField(verbose_name='Данные (JSON)')),
+                ('created', models.DateTimeField(auto_now_add=True, verbose_name='Дата события')),
+                ('relayed', models.BooleanField(default=False, verbose_name='Передано')),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='outboxevent',
+            index=models.Index(condition=models.Q(relayed=False), fields=['id'], name='outbox_pending_idx'),
+        ),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 2.2.16 on 2026-10-18 04:12
+
+from django.db import migrations
+import posts.fields
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0011_outbox'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='comment',
+            name='version',
+            field=posts.fields.VersionField(default=0, editable=False, verbose_name='Версия'),
+        ),
+        migrations.AddField(
+            model_name='post',
+            name='version',
+            field=posts.fields.VersionField(default=0, editable=False, verbose_name='Версия'),
+        ),
+    ]
@@ -1,35 +1,96 @@
 from django.contrib.auth import get_user_model
-from django.db import models
+from django.db import models, transaction
+
+from .fields import ContentAddressedImageField, VersionField
 
 User = get_user_model()
 
 
+class AtomicSaveModel(models.Model):
+    """Модель, которая сохраняется в транзакции.
+
+    Обработчики post_save (счётчики, лента, outbox) выполняются в той же
+    транзакции, что и запись строки; delete() Django и так выполняет
+    в транзакции.
+    """
+
+    class Meta:
+        abstract = True
+
+    def save(self, *args, **kwargs):
+        if not self._state.adding:
+            kwargs['update_fields'] = self.with_versions(
+                kwargs.get('update_fields'))
+        with transaction.atomic(using=kwargs.get('using')):
+            super().save(*args, **kwargs)
+
+    def with_versions(self, update_fields):
+        """Добавляет поля версии и времени изменения к частичному сохранению.
+
+        Частичным считается и сохранение объекта, загруженного через
+        only()/defer(): Django записывает только загруженные поля.
+        """
+        deferred = self.get_deferred_fields()
+        fields = self._meta.concrete_fields
+        if update_fields is None:
+            if not deferred:
+                return None
+            update_fields = [field.attname for field in fields
+                             if field.attname not in deferred
+                             and not field.primary_key]
+        elif not update_fields:
+            return update_fields
+        return {*update_fields, *(
+            field.name for field in fields
+            if isinstance(field, VersionField)
+            or getattr(field, 'auto_now', False))}
+
+
 class Group(models.Model):
     title = models.CharField(max_length=200)
     slug = models.SlugField(unique=True)
     description = models.TextField()
+    posts_count = models.PositiveIntegerField(
+        'Количество публикаций', default=0, editable=False)
 
     def __str__(self):
         return self.title
 
 
-class Post(models.Model):
+class Post(AtomicSaveModel):
     text = models.TextField()
     pub_date = models.DateTimeField(
         'Дата публикации', auto_now_add=True)
     author = models.ForeignKey(
         User, on_delete=models.CASCADE, related_name='posts')
-    image = models.ImageField(
+    image = ContentAddressedImageField(
         upload_to='posts/', null=True, blank=True)
     group = models.ForeignKey(
         Group, on_delete=models.SET_NULL,
         blank=True, null=True, related_name='posts')
+    image_variants = models.TextField(
+        'Уменьшенные копии изображения', blank=True, default='',
+        editable=False)
+    comments_count = models.PositiveIntegerField(
+        'Количество комментариев', default=0, editable=False)
+    updated = models.DateTimeField('Дата изменения', auto_now=True)
+    version = VersionField('Версия')
+
+    class Meta:
+        indexes = [
+            models.Index(fields=('pub_date', 'id'),
+                         name='post_pub_date_id_idx'),
+            models.Index(fields=('group', 'pub_date', 'id'),
+                         name='post_group_pub_date_idx'),
+            models.Index(fields=('author', 'pub_date', 'id'),
+                         name='post_author_pub_date_idx'),
+        ]
 
     def __str__(self):
         return self.text
 
 
-class Comment(models.Model):
+class Comment(AtomicSaveModel):
 
     author = models.ForeignKey(
         User, on_delete=models.CASCADE, related_name='comments')
@@ -38,12 +99,20 @@ class Comment(models.Model):
     text = models.TextField()
     created = models.DateTimeField(
         'Дата добавления', auto_now_add=True, db_index=True)
+    updated = models.DateTimeField('Дата изменения', auto_now=True)
+    version = VersionField('Версия')
+
+    class Meta:
+        indexes = [
+            models.Index(fields=('post', 'created', 'id'),
+                         name='comment_post_created_id_idx'),
+        ]
 
     def __str__(self):
         return self.text
 
 
-class Follow(models.Model):
+class Follow(AtomicSaveModel):
 
     user = models.ForeignKey(
         User,
@@ -63,3 +132,64 @@ class Follow(models.Model):
             models.UniqueConstraint(fields=('user', 'following',),
                                     name='unique_follow')
         ]
+
+
+class FeedEntry(models.Model):
+
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='feed_entries',
+        verbose_name='Читатель'
+    )
+    post = models.ForeignKey(
+        Post,
+        on_delete=models.CASCADE,
+        related_name='feed_entries',
+        verbose_name='Публикация'
+    )
+    pub_date = models.DateTimeField('Дата публикации')
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=('user', 'post',),
+                                    name='unique_feed_entry')
+        ]
+        indexes = [
+            models.Index(fields=('user', 'pub_date', 'post'),
+                         name='feed_user_pub_date_idx'),
+        ]
+
+
+class UserStats(models.Model):
+
+    user = models.OneToOneField(
+        User,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='stats',
+        verbose_name='Пользователь'
+    )
+    followers_count = models.PositiveIntegerField(
+        'Количество подписчиков', default=0, editable=False)
+    following_count = models.PositiveIntegerField(
+        'Количество подписок', default=0, editable=False)
+
+
+class OutboxEvent(models.Model):
+    """Событие об изменении данных для внешних потребителей.
+
+    Порядковый номер события — первичный ключ.
+    """
+
+    topic = models.CharField('Тема', max_length=50)
+    object_id = models.PositiveIntegerField('Идентификатор объекта')
+    payload = models.TextField('Данные (JSON)')
+    created = models.DateTimeField('Дата события', auto_now_add=True)
+    relayed = models.BooleanField('Передано', default=False)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=('id',), name='outbox_pending_idx',
+                         condition=models.Q(relayed=False)),
+        ]
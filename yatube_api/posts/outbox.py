@@ -0,0 +1,119 @@
+import json
+import threading
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connections, transaction
+from django.utils import timezone
+
+from .models import Comment, Follow, OutboxEvent, Post
+
+# Поля, которые попадают в событие, по моделям.
+EVENT_FIELDS = {
+    Post: ('author_id', 'group_id', 'pub_date'),
+    Comment: ('post_id', 'author_id', 'created'),
+    Follow: ('user_id', 'following_id'),
+}
+
+
+class ChangeNotifier:
+    """Будит ожидающие long-poll запросы этого процесса после новых событий.
+
+    Запросы других процессов узнают о событиях, периодически перечитывая
+    таблицу.
+    """
+
+    def __init__(self):
+        self.condition = threading.Condition()
+        self.generation = 0
+
+    def notify(self):
+        with self.condition:
+            self.generation += 1
+            self.condition.notify_all()
+
+    def wait(self, generation, timeout):
+        """Ждёт событий новее generation не дольше timeout секунд."""
+        with self.condition:
+            return self.condition.wait_for(
+                lambda: self.generation != generation, timeout)
+
+
+notifier = ChangeNotifier()
+
+
+def make_event(instance, action):
+    model = type(instance)
+    payload = {'id': instance.pk, **{
+        field: getattr(instance, field) for field in EVENT_FIELDS[model]}}
+    return OutboxEvent(
+        topic=f'{model._meta.model_name}.{action}',
+        object_id=instance.pk,
+        payload=json.dumps(payload, cls=DjangoJSONEncoder),
+    )
+
+
+def record(instances, action):
+    """Записывает события в текущей транзакции вызывающего кода."""
+    events = [make_event(instance, action) for instance in instances]
+    if events:
+        OutboxEvent.objects.bulk_create(events)
+        transaction.on_commit(notifier.notify)
+
+
+def event_rows(queryset, limit):
+    return [
+        {**row, 'payload': json.loads(row['payload'])}
+        for row in queryset.order_by('id').values(
+            'id', 'topic', 'object_id', 'payload', 'created')[:limit]
+    ]
+
+
+def gap_timeout():
+    return timedelta(seconds=getattr(settings, 'CHANGES_GAP_TIMEOUT', 5))
+
+
+def committed_prefix(seq, events, now):
+    """События до первого недавнего пропуска в номерах.
+
+    Номер события выдаётся при вставке, а видно оно становится после
+    фиксации транзакции, поэтому при параллельных транзакциях (PostgreSQL)
+    событие с меньшим номером может появиться позже большего. Пока
+    пропуск моложе CHANGES_GAP_TIMEOUT, курсор за него не сдвигается;
+    более старый пропуск считается откатом или удалением. В SQLite запись
+    идёт по одной транзакции, и таких пропусков не бывает. Для seq=0
+    пропуск перед первым событием не проверяется: это начало истории.
+    """
+    expected = seq + 1 if seq else None
+    for index, event in enumerate(events):
+        if (expected is not None and event['id'] != expected
+                and now - event['created'] < gap_timeout()):
+            return events[:index]
+        expected = event['id'] + 1
+    return events
+
+
+def changes_since(seq, limit):
+    events = event_rows(OutboxEvent.objects.filter(id__gt=seq), limit)
+    return committed_prefix(seq, events, timezone.now())
+
+
+def relay_batch(handler, batch_size):
+    """Передаёт handler пачку непереданных событий и отмечает их.
+
+    Если handler упал, события остаются непереданными и уйдут в
+    следующий раз: доставка «хотя бы один раз».
+    """
+    pending = OutboxEvent.objects.filter(relayed=False)
+    if connections[pending.db].features.has_select_for_update_skip_locked:
+        # Несколько ретрансляторов не возьмут одни и те же события.
+        pending = pending.select_for_update(skip_locked=True)
+    with transaction.atomic(using=pending.db):
+        events = event_rows(pending, batch_size)
+        if events:
+            handler(events)
+            OutboxEvent.objects.filter(
+                id__in=[event['id'] for event in events],
+            ).update(relayed=True)
+    return len(events)
@@ -0,0 +1,170 @@
+import re
+from html import escape
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.db.models import FloatField, TextField
+from django.db.models.expressions import RawSQL
+
+from .models import Comment, Post
+
+# Модели с полнотекстовым индексом и индексируемое поле.
+SEARCH_FIELDS = {Post: 'text', Comment: 'text'}
+
+# Базы, для которых есть полнотекстовый индекс.
+SEARCH_VENDORS = ('sqlite', 'postgresql')
+
+HIGHLIGHT_START = '<mark>'
+HIGHLIGHT_STOP = '</mark>'
+# Границы совпадений в тексте из базы: символы из области для частного
+# использования, которых нет в HTML-разметке. Текст экранируется, и только
+# затем границы заменяются тегами (см. highlight_html).
+MATCH_START = '\ue000'
+MATCH_STOP = '\ue001'
+
+WORD_RE = re.compile(r'\w+')
+
+
+def search_config():
+    return getattr(settings, 'SEARCH_CONFIG', 'russian')
+
+
+def fts_table(model):
+    return f'{model._meta.db_table}_fts'
+
+
+def sqlite_statements(model, field):
+    table, fts = model._meta.db_table, fts_table(model)
+    column = model._meta.get_field(field).column
+    return [
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {fts} USING fts5("
+        f"{column}, content='{table}', content_rowid='id', "
+        f"tokenize='unicode61 remove_diacritics 2')",
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_insert AFTER INSERT ON {table} "
+        f"BEGIN INSERT INTO {fts}(rowid, {column}) "
+        f"VALUES (new.id, new.{column}); END",
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_delete AFTER DELETE ON {table} "
+        f"BEGIN INSERT INTO {fts}({fts}, rowid, {column}) "
+        f"VALUES ('delete', old.id, old.{column}); END",
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_update "
+        f"AFTER UPDATE OF {column} ON {table} "
+        f"BEGIN INSERT INTO {fts}({fts}, rowid, {column}) "
+        f"VALUES ('delete', old.id, old.{column}); "
+        f"INSERT INTO {fts}(rowid, {column}) "
+        f"VALUES (new.id, new.{column}); END",
+    ]
+
+
+def postgresql_statements(model, field):
+    table = model._meta.db_table
+    column = model._meta.get_field(field).column
+    return [
+        f"CREATE INDEX IF NOT EXISTS {table}_{column}_search_idx "
+        f"ON {table} USING GIN "
+        f"(to_tsvector('{search_config()}'::regconfig, {column}))",
+    ]
+
+
+def sqlite_triggers(cursor, model):
+    cursor.execute(
+        "SELECT count(*) FROM sqlite_master "
+        "WHERE type = 'trigger' AND name LIKE %s",
+        [f'{fts_table(model)}_%'],
+    )
+    return cursor.fetchone()[0]
+
+
+def install_search_index(using=DEFAULT_DB_ALIAS, **kwargs):
+    """Создаёт полнотекстовые индексы, если их ещё нет.
+
+    Вызывается после каждой миграции: SQLite при изменении таблицы
+    пересоздаёт её без триггеров, поэтому пропавшие триггеры создаются
+    заново, а индекс перестраивается по текущим данным.
+    """
+    connection = connections[using]
+    with connection.cursor() as cursor:
+        for model, field in SEARCH_FIELDS.items():
+            if connection.vendor == 'sqlite':
+                complete = sqlite_triggers(cursor, model) == 3
+                for statement in sqlite_statements(model, field):
+                    cursor.execute(statement)
+                if not complete:
+                    rebuild_search_index(model, cursor)
+            elif connection.vendor == 'postgresql':
+                for statement in postgresql_statements(model, field):
+                    cursor.execute(statement)
+
+
+def rebuild_search_index(model, cursor):
+    fts = fts_table(model)
+    cursor.execute(f"INSERT INTO {fts}({fts}) VALUES ('rebuild')")
+
+
+def fts5_query(term):
+    """Запрос FTS5 из слов строки поиска: все слова, каждое — как фраза."""
+    return ' '.join(f'"{word}"' for word in WORD_RE.findall(term))
+
+
+def sqlite_search(queryset, term):
+    # Таблица FTS присоединяется один раз: MATCH отбирает строки, а
+    # bm25() и highlight() считаются по той же строке индекса.
+    table, fts = queryset.model._meta.db_table, fts_table(queryset.model)
+    return queryset.extra(
+        tables=[fts],
+        where=[f'{fts}.rowid = {table}.id', f'{fts} MATCH %s'],
+        params=[fts5_query(term)],
+        select={
+            'search_rank': f'-bm25({fts})',
+            'search_highlight': (
+                f"highlight({fts}, 0, '{MATCH_START}', '{MATCH_STOP}')"),
+        },
+    )
+
+
+def postgresql_search(queryset, term, field):
+    model = queryset.model
+    column = f'{model._meta.db_table}.{model._meta.get_field(field).column}'
+    config = search_config()
+    vector = f"to_tsvector('{config}'::regconfig, {column})"
+    query = f"websearch_to_tsquery('{config}'::regconfig, %s)"
+    return queryset.extra(
+        where=[f'{vector} @@ {query}'], params=[term],
+    ).annotate(
+        search_rank=RawSQL(f'ts_rank({vector}, {query})', [term],
+                           output_field=FloatField()),
+        search_highlight=RawSQL(
+            f"ts_headline('{config}'::regconfig, {column}, {query}, "
+            f"'StartSel={MATCH_START}, StopSel={MATCH_STOP}')",
+            [term], output_field=TextField()),
+    )
+
+
+def highlight_html(value):
+    """Экранированный текст search_highlight с совпадениями в <mark>."""
+    return escape(value).replace(MATCH_START, HIGHLIGHT_START).replace(
+        MATCH_STOP, HIGHLIGHT_STOP)
+
+
+def search_supported(queryset):
+    return connections[queryset.db].vendor in SEARCH_VENDORS
+
+
+def search(queryset, term):
+    """Полнотекстовый поиск по индексу с релевантностью и подсветкой.
+
+    Добавляет к строкам search_rank (больше — релевантнее) и
+    search_highlight (текст с границами совпадений, для HTML — через
+    highlight_html).
+    """
+    if not WORD_RE.search(term):
+        return queryset.none()
+    field = SEARCH_FIELDS[queryset.model]
+    vendor = connections[queryset.db].vendor
+    if vendor == 'sqlite':
+        queryset = sqlite_search(queryset, term)
+    elif vendor == 'postgresql':
+        queryset = postgresql_search(queryset, term, field)
+    else:
+        raise NotImplementedError(
+            f'Полнотекстовый поиск не поддерживается для {vendor}.')
+    return queryset.order_by('-search_rank', '-pk')
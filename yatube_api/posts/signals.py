@@ -0,0 +1,101 @@
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import Signal, receiver
+
+from . import counters, feed, images, outbox
+from .models import Comment, Follow, Post, User, UserStats
+
+# Отправляются из posts.bulk вместо post_save для массовых операций.
+post_bulk_create = Signal(providing_args=['instances'])
+post_bulk_update = Signal(
+    providing_args=['instances', 'fields', 'previous'])
+
+
+@receiver(post_save, sender=User)
+def create_user_stats(sender, instance, created, **kwargs):
+    if created:
+        UserStats.objects.get_or_create(user=instance)
+
+
+@receiver(pre_save, sender=Post)
+def remember_previous(sender, instance, **kwargs):
+    if instance._state.adding:
+        return
+    instance._previous_group_id, instance._previous_image = (
+        Post.objects.filter(pk=instance.pk)
+        .values_list('group_id', 'image').first() or (None, None)
+    )
+    if instance._previous_image != instance.image.name:
+        instance.image_variants = ''
+
+
+@receiver(post_save, sender=Post)
+def post_saved(sender, instance, created, **kwargs):
+    previous_image = getattr(instance, '_previous_image', None)
+    if created or previous_image != instance.image.name:
+        images.schedule_variants([instance])
+    if created:
+        counters.adjust_group_posts(instance.group_id, 1)
+        feed.fan_out_post(instance)
+        outbox.record([instance], 'created')
+        return
+    previous_group_id = getattr(instance, '_previous_group_id', None)
+    if previous_group_id != instance.group_id:
+        counters.adjust_group_posts(previous_group_id, -1)
+        counters.adjust_group_posts(instance.group_id, 1)
+
+
+@receiver(post_delete, sender=Post)
+def post_deleted(sender, instance, **kwargs):
+    counters.adjust_group_posts(instance.group_id, -1)
+    outbox.record([instance], 'deleted')
+
+
+@receiver(post_bulk_create, sender=Post)
+def posts_bulk_created(sender, instances, **kwargs):
+    counters.posts_created(instances)
+    feed.fan_out_posts(instances)
+    images.schedule_variants(instances)
+    outbox.record(instances, 'created')
+
+
+@receiver(post_bulk_update, sender=Post)
+def posts_bulk_updated(sender, instances, fields, previous, **kwargs):
+    if 'group' in fields:
+        counters.recount_groups(
+            {row['group_id'] for row in previous.values()}
+            | {post.group_id for post in instances}
+        )
+
+
+@receiver(post_bulk_create, sender=Comment)
+def comments_bulk_created(sender, instances, **kwargs):
+    counters.comments_created(instances)
+    outbox.record(instances, 'created')
+
+
+@receiver(post_save, sender=Comment)
+def comment_saved(sender, instance, created, **kwargs):
+    if created:
+        counters.adjust_post_comments(instance.post_id, 1)
+        outbox.record([instance], 'created')
+
+
+@receiver(post_delete, sender=Comment)
+def comment_deleted(sender, instance, **kwargs):
+    counters.adjust_post_comments(instance.post_id, -1)
+    outbox.record([instance], 'deleted')
+
+
+@receiver(post_save, sender=Follow)
+def follow_saved(sender, instance, created, **kwargs):
+    if created:
+        counters.adjust_follow(instance, 1)
+        feed.backfill_follow(instance)
+        outbox.record([instance], 'created')
+
+
+@receiver(post_delete, sender=Follow)
+def follow_deleted(sender, instance, **kwargs):
+    counters.adjust_follow(instance, -1)
+    feed.remove_follow(instance)
+    outbox.record([instance], 'deleted')
@@ -0,0 +1,18 @@
+from django.conf import settings
+
+
+def pragma_statements(pragmas):
+    return [f'PRAGMA {name} = {value}' for name, value in pragmas.items()]
+
+
+def apply_pragmas(sender, connection, **kwargs):
+    """Настраивает каждое новое соединение SQLite по SQLITE_PRAGMAS.
+
+    PRAGMA выполняются на соединении DB-API напрямую, чтобы не попадать
+    в журнал запросов Django.
+    """
+    if connection.vendor != 'sqlite':
+        return
+    pragmas = getattr(settings, 'SQLITE_PRAGMAS', {})
+    for statement in pragma_statements(pragmas):
+        connection.connection.execute(statement)
@@ -0,0 +1,51 @@
+import logging
+import queue
+import threading
+
+from django.db import close_old_connections, connections
+
+logger = logging.getLogger(__name__)
+
+
+class WorkerQueue:
+    """Очередь задач, которые выполняются фоновыми потоками процесса.
+
+    Потоки запускаются при первой задаче; после каждой задачи соединения
+    с базой, открытые потоком, закрываются.
+    """
+
+    def __init__(self, name, workers=1):
+        self.name = name
+        self.workers = workers
+        self.tasks = queue.Queue()
+        self.threads = []
+        self.lock = threading.Lock()
+
+    def start(self):
+        with self.lock:
+            while len(self.threads) < self.workers:
+                thread = threading.Thread(
+                    target=self.run, daemon=True,
+                    name=f'{self.name}-{len(self.threads)}')
+                thread.start()
+                self.threads.append(thread)
+
+    def submit(self, func, *args):
+        self.start()
+        self.tasks.put((func, args))
+
+    def run(self):
+        while True:
+            func, args = self.tasks.get()
+            try:
+                func(*args)
+            except Exception:
+                logger.exception('Задача %s завершилась ошибкой', func)
+            finally:
+                close_old_connections()
+                connections.close_all()
+                self.tasks.task_done()
+
+    def join(self):
+        """Ждёт выполнения всех поставленных задач."""
+        self.tasks.join()
@@ -3,14 +3,17 @@ ASGI config for yatube_api project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
 
-For more information on this file, see
-https://docs.djangoproject.com/en/3.0/howto/deployment/asgi/
+Django 2.2 has no ASGI handler of its own: read endpoints are served by
+api.asgi.AsyncReadApplication, other requests go to the WSGI handler.
 """
 
 import os
 
-from django.core.asgi import get_asgi_application
+import django
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'yatube_api.settings')
+django.setup(set_prefix=False)
 
-application = get_asgi_application()
+from api.asgi import AsyncReadApplication  # noqa: E402
+
+application = AsyncReadApplication()
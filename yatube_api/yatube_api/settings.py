@@ -18,8 +18,8 @@ INSTALLED_APPS = [
     'django.contrib.staticfiles',
     'rest_framework',
     'djoser',
-    'api',
-    'posts',
+    'api.apps.ApiConfig',
+    'posts.apps.PostsConfig',
 ]
 
 MIDDLEWARE = [
@@ -30,6 +30,7 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'api.replicas.ReplicaStickinessMiddleware',
 ]
 
 ROOT_URLCONF = 'yatube_api.urls'
@@ -54,11 +55,49 @@ WSGI_APPLICATION = 'yatube_api.wsgi.application'
 
 DATABASES = {
     'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
+        'ENGINE': 'posts.backends.sqlite3',
         'NAME': os.path.join(BASE_DIR, 'db.sqlite3'),
+        # Соединение переиспользуется запросами потока до 10 минут. Под
+        # WSGI потоки сервера долгоживущие; в api.asgi.AsyncReadApplication
+        # у каждого запроса на чтение свой поток, и соединение закрывается
+        # после запроса (остальные запросы WsgiToAsgi выполняет в одном
+        # общем потоке, и там соединение переиспользуется).
+        'CONN_MAX_AGE': 600,
     }
 }
 
+DATABASE_ROUTERS = ['api.replicas.ReplicaRouter']
+
+# Псевдонимы реплик из DATABASES для GET-запросов к публикациям, группам и
+# комментариям. Клиент, который писал меньше REPLICA_STICKY_SECONDS назад,
+# читает с основной базы.
+DATABASE_REPLICAS = []
+REPLICA_STICKY_SECONDS = 10
+
+# PRAGMA для каждого нового соединения SQLite (posts.sqlite). WAL
+# позволяет читать во время записи, busy_timeout (мс) — ждать
+# освобождения блокировки вместо ошибки «database is locked».
+SQLITE_PRAGMAS = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'busy_timeout': 20000,
+    'cache_size': -64 * 1024,
+    'mmap_size': 256 * 1024 * 1024,
+    'temp_store': 'MEMORY',
+}
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    }
+}
+
+# Кэш ответов API можно вынести в отдельный бэкенд (например, Redis),
+# указав здесь его алиас из CACHES.
+RESPONSE_CACHE_ALIAS = 'default'
+
+RESPONSE_CACHE_TIMEOUT = 5 * 60
+
 AUTH_PASSWORD_VALIDATORS = [
     {
         'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator',
@@ -88,6 +127,21 @@ STATIC_URL = '/static/'
 
 STATICFILES_DIRS = (os.path.join(BASE_DIR, 'static/'),)
 
+MEDIA_URL = '/media/'
+
+MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
+
+# Ширины уменьшенных копий Post.image и число потоков, которые их создают.
+IMAGE_VARIANT_WIDTHS = (320, 640, 1280)
+
+IMAGE_WORKERS = 1
+
+# Изображения, загружаемые через API (api.uploads), пишутся на диск по
+# частям; размер и размеры изображения проверяются до конца загрузки.
+IMAGE_UPLOAD_MAX_SIZE = 10 * 1024 * 1024
+
+IMAGE_UPLOAD_MAX_PIXELS = 40_000_000
+
 REST_FRAMEWORK = {
 
     'DEFAULT_PERMISSION_CLASSES': [
@@ -95,11 +149,47 @@ REST_FRAMEWORK = {
     ],
 
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'api.authentication.StatelessJWTAuthentication',
+    ],
+
+    'DEFAULT_PAGINATION_CLASS': 'api.pagination.BoundedPagination',
+
+    'DEFAULT_THROTTLE_CLASSES': [
+        'api.throttling.TokenBucketThrottle',
     ],
+
+    # Для bulk — объектов в минуту, а не запросов.
+    'DEFAULT_THROTTLE_RATES': {
+        'posts.create': '30/min',
+        'posts.bulk': '1000/min',
+        'comments.create': '60/min',
+        'comments.bulk': '1000/min',
+        'follow.create': '30/min',
+    },
 }
 
+# Список без limit отдаётся не длиннее PAGINATION_LIST_LIMIT записей,
+# limit больше PAGINATION_MAX_LIMIT уменьшается до него.
+PAGINATION_LIST_LIMIT = 100
+PAGINATION_MAX_LIMIT = 1000
+
+# Хранилище корзин ограничения частоты: 'local' — в памяти процесса,
+# 'cache' — в кэше THROTTLE_CACHE_ALIAS, общем для всех процессов.
+THROTTLE_STORE = 'local'
+THROTTLE_CACHE_ALIAS = 'default'
+
 SIMPLE_JWT = {
     'ACCESS_TOKEN_LIFETIME': timedelta(days=1),
     'AUTH_HEADER_TYPES': ('Bearer',),
 }
+
+# LRU-кэш строк пользователей для токенов без claims пользователя.
+JWT_USER_CACHE_SIZE = 1024
+
+JWT_USER_CACHE_TTL = 60
+
+TOKEN_REVOCATION_CAPACITY = 100000
+
+TOKEN_REVOCATION_ERROR_RATE = 0.001
+
+TOKEN_REVOCATION_REFRESH_INTERVAL = 5